@@ -3,3 +3,5 @@ from django.contrib import admin
 from . import models
 
 admin.site.register(models.Antique)
+admin.site.register(models.SavedSearch)
+admin.site.register(models.Category)
@@ -0,0 +1,179 @@
+"""
+Saved-search alerts, percolator style.
+
+Instead of re-running every saved search against the catalog, each new
+listing is run against the saved searches:
+
+- Every saved search is indexed under the terms it requires (its query words,
+  "type:<type>" when it filters by type, or "*" when it has neither).
+- A listing offers its own terms (title, description and type words, its
+  type and "*"). One grouped query over the SavedSearchTerm index finds the
+  searches for which every required term is offered, then applies the price
+  range. Cost depends on the listing's terms and the searches that share
+  them, not on how many saved searches exist.
+
+Saving an antique only queues a PercolationJob; the matching and the digest
+emails happen in the `process_saved_searches` worker.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from .models import (
+    PercolationJob,
+    SavedSearchMatch,
+    SavedSearchTerm,
+    listing_terms,
+)
+
+
+def index_saved_search(saved_search):
+    """Replace the inverted-index terms of one saved search."""
+    with transaction.atomic():
+        SavedSearchTerm.objects.filter(saved_search=saved_search).delete()
+        SavedSearchTerm.objects.bulk_create(
+            [
+                SavedSearchTerm(saved_search=saved_search, term=term)
+                for term in saved_search.terms()
+            ]
+        )
+
+
+def matching_searches(antique):
+    """Ids of the active saved searches matching a listing."""
+    price_ok = (
+        Q(saved_search__min_price__isnull=True)
+        | Q(saved_search__min_price__lte=antique.price)
+    ) & (
+        Q(saved_search__max_price__isnull=True)
+        | Q(saved_search__max_price__gte=antique.price)
+    )
+    postings = SavedSearchTerm.objects.filter(
+        price_ok, term__in=listing_terms(antique), saved_search__is_active=True
+    )
+    if antique.seller_id:
+        # Don't alert sellers about their own listings
+        postings = postings.exclude(saved_search__user__seller=antique.seller_id)
+    matches = (
+        postings.values("saved_search", "saved_search__term_count")
+        .annotate(hits=Count("pk"))
+        .filter(hits=F("saved_search__term_count"))
+    )
+    return [row["saved_search"] for row in matches]
+
+
+def percolate(batch_size):
+    """
+    Match up to batch_size queued listings against saved searches.
+    Returns (listings processed, matches recorded).
+    """
+    with transaction.atomic():
+        jobs = list(
+            # Lock only the jobs: locking the joined antiques would block
+            # seller edits until the batch commits, and skip the jobs of
+            # antiques being edited
+            PercolationJob.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("antique")
+            .order_by("created_at")[:batch_size]
+        )
+        found = []
+        for job in jobs:
+            if job.antique.is_sold:
+                continue
+            found.extend(
+                SavedSearchMatch(saved_search_id=search_id, antique=job.antique)
+                for search_id in matching_searches(job.antique)
+            )
+        SavedSearchMatch.objects.bulk_create(found, ignore_conflicts=True)
+        PercolationJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+    return len(jobs), len(found)
+
+
+def send_digests(batch_size, connection=None):
+    """
+    Email every user whose oldest unsent match is at least
+    SAVED_SEARCH_DIGEST_INTERVAL old, one digest per user covering all of
+    their unsent matches. Returns the number of digests sent.
+    """
+    now = timezone.now()
+    due = now - timedelta(seconds=settings.SAVED_SEARCH_DIGEST_INTERVAL)
+    user_ids = list(
+        SavedSearchMatch.objects.filter(notified_at__isnull=True)
+        .values("saved_search__user")
+        .annotate(oldest=Min("created_at"))
+        .filter(oldest__lte=due)
+        .order_by("oldest")
+        .values_list("saved_search__user", flat=True)[:batch_size]
+    )
+    if not user_ids:
+        return 0
+
+    matches = (
+        SavedSearchMatch.objects.filter(
+            notified_at__isnull=True, saved_search__user__in=user_ids
+        )
+        .select_related("saved_search", "antique")
+        .order_by("saved_search__title", "-created_at")
+    )
+    by_user = defaultdict(lambda: defaultdict(list))
+    match_ids = []
+    for match in matches:
+        by_user[match.saved_search.user_id][match.saved_search].append(match.antique)
+        match_ids.append(match.pk)
+
+    base_url = f"https://{Site.objects.get_current().domain}"
+    users = get_user_model().objects.in_bulk(list(by_user))
+    messages = [
+        _digest_message(users[user_id], searches, base_url)
+        for user_id, searches in by_user.items()
+        if users.get(user_id) and users[user_id].email
+    ]
+
+    with transaction.atomic():
+        # Mark first: with the outbox backend both happen in one transaction
+        SavedSearchMatch.objects.filter(pk__in=match_ids).update(notified_at=now)
+        (connection or get_connection()).send_messages(messages)
+    return len(messages)
+
+
+def _digest_message(user, searches, base_url):
+    list_url = reverse("antiques:antique-list")
+    context = {
+        "user": user,
+        "searches": [
+            {
+                "search": search,
+                "antiques": antiques,
+                "url": f"{base_url}{list_url}?{urlencode(search.get_list_params())}",
+            }
+            for search, antiques in searches.items()
+        ],
+        "base_url": base_url,
+        "manage_url": f"{base_url}{reverse('antiques:saved-search-list')}",
+    }
+    count = sum(len(antiques) for antiques in searches.values())
+    if count == 1:
+        subject = "1 new listing matches your saved searches"
+    else:
+        subject = f"{count} new listings match your saved searches"
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=render_to_string("antiques/email/saved_search_digest.txt", context),
+        to=[user.email],
+    )
+    message.attach_alternative(
+        render_to_string("antiques/email/saved_search_digest.html", context),
+        "text/html",
+    )
+    return message
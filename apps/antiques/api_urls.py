@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import antique_changes
+
+app_name = "antiques_api"
+
+urlpatterns = [
+    path("antiques/changes/", antique_changes, name="antique-changes"),
+]
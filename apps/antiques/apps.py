@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AntiquesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.antiques"
+
+    def ready(self):
+        import apps.antiques.signals  # noqa: F401
@@ -0,0 +1,5 @@
+from apps.core.caching import TwoTierCache
+
+# Catalog-wide values (facets, counts) shared by every visitor.
+# Entries tagged "antiques" are invalidated by apps.antiques.signals.
+catalog_cache = TwoTierCache("catalog", timeout=600)
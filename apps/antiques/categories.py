@@ -0,0 +1,138 @@
+"""
+Category taxonomy helpers.
+
+- cluster_names() folds free-text type names that only differ by case,
+  spacing or a typo ("Furniture", "furniture ", "Furnture") into one
+  category; get_or_create_category() uses it, and migration 0007 keeps a
+  frozen copy.
+- category_tree() is the cached taxonomy with rolled-up counts, used for
+  the list filter dropdown and to expand a category filter to its
+  descendants, so neither needs to touch the antique table.
+- recount_categories() refreshes the maintained Category.antique_count.
+"""
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from fuzzywuzzy import fuzz
+
+from .caches import catalog_cache
+from .models import Antique, Category
+
+# Minimum fuzz.ratio between normalized names to treat them as one category
+SAME_CATEGORY_RATIO = 85
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a category name."""
+    return " ".join((name or "").split()).casefold()
+
+
+def find_cluster(name, canonical):
+    """The name in canonical (normalized -> name) that name belongs to, if any."""
+    key = normalize_name(name)
+    if key in canonical:
+        return canonical[key]
+    for other, canonical_name in canonical.items():
+        if fuzz.ratio(key, other) >= SAME_CATEGORY_RATIO:
+            return canonical_name
+    return None
+
+
+def cluster_names(counts):
+    """
+    Group free-text names into categories.
+
+    counts maps each distinct name to how many antiques use it. The most
+    used spelling of each cluster becomes its name. Returns
+    {name: canonical name}, skipping blank names.
+    """
+    canonical = {}
+    mapping = {}
+    for name, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        if not normalize_name(name):
+            continue
+        cluster = find_cluster(name, canonical)
+        if cluster is None:
+            cluster = " ".join(name.split())
+            canonical[normalize_name(cluster)] = cluster
+        mapping[name] = cluster
+    return mapping
+
+
+def get_or_create_category(name):
+    """The existing category name clusters with, or a new top-level one."""
+    canonical = {
+        normalize_name(existing): existing
+        for existing in Category.objects.values_list("name", flat=True)
+    }
+    match = find_cluster(name, canonical)
+    if match is not None:
+        return Category.objects.get(name=match)
+    return Category.objects.create(name=" ".join(name.split()))
+
+
+def recount_categories(pks):
+    """Refresh antique_count of the given categories with one UPDATE."""
+    pks = [pk for pk in pks if pk is not None]
+    if not pks:
+        return
+    unsold = (
+        Antique.objects.filter(category=OuterRef("pk"), is_sold=False)
+        .order_by()
+        .values("category")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Category.objects.filter(pk__in=pks).update(
+        antique_count=Coalesce(Subquery(unsold), 0)
+    )
+
+
+def _build_tree():
+    rows = list(
+        Category.objects.values_list("pk", "name", "parent_id", "antique_count")
+    )
+    children = {}
+    for pk, name, parent_id, _ in rows:
+        children.setdefault(parent_id, []).append(pk)
+    by_pk = {pk: (name, count) for pk, name, _, count in rows}
+
+    tree = []
+
+    def walk(pk, depth):
+        name, count = by_pk[pk]
+        node = {
+            "id": pk,
+            "name": name,
+            "label": f"{'— ' * depth}{name}",
+            "depth": depth,
+            "count": count,
+        }
+        tree.append(node)
+        descendants = [pk]
+        for child in sorted(children.get(pk, []), key=lambda c: by_pk[c][0]):
+            descendants.extend(walk(child, depth + 1))
+        node["count"] = sum(by_pk[d][1] for d in descendants)
+        node["ids"] = descendants
+        return descendants
+
+    for root in sorted(children.get(None, []), key=lambda c: by_pk[c][0]):
+        walk(root, 0)
+    return tree
+
+
+def category_tree():
+    """
+    Depth-first list of {"id", "name", "label", "depth", "count", "ids"}
+    dicts, where label is the name indented by depth, count includes
+    subcategories and ids is the category plus its descendants. Cached until an antique or category changes.
+    """
+    return catalog_cache.get_or_set("category_tree", _build_tree, tags=["antiques"])
+
+
+def descendant_ids(pk):
+    """Ids of a category and all of its subcategories ([] if unknown)."""
+    for node in category_tree():
+        if node["id"] == pk:
+            return node["ids"]
+    return []
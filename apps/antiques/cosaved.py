@@ -0,0 +1,214 @@
+"""
+"Collectors who saved this also saved" from wishlist co-occurrence.
+
+build_cosaved_antiques() (run by the build_cosaved_antiques command):
+
+1. Streams (user, antique) pairs out of the wishlist through table in
+   keyset-paginated chunks into a binary user x antique SciPy sparse matrix.
+   Users with more than WISHLIST_COSAVED_MAX_USER_ITEMS saved antiques
+   (dealers, bots) are dropped: they add many pairs and little signal.
+2. For blocks of antiques, one sparse product (antiques x users) @
+   (users x antiques) counts how many users saved each pair. Pairs seen
+   fewer than WISHLIST_COSAVED_MIN_COUNT times are dropped and the rest
+   scored by cosine similarity, count / sqrt(savers(a) * savers(b)), so
+   merely popular antiques don't top every list.
+3. The top WISHLIST_COSAVED_COUNT unsold neighbours per antique go into
+   CoSavedAntique.
+
+Without --full only antiques whose co-occurrences may have changed since the
+last run (BuildRun "cosaved") are recomputed: everything saved by users who
+changed a wishlist, plus the antiques they removed (WishlistRemoval). The
+matrix is still built whole, the products are not.
+
+cooccurrence_neighbours() works on plain integer arrays, so the
+bench_cosaved command can time it on synthetic data.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from scipy import sparse
+
+from .models import Antique, BuildRun, CoSavedAntique, Wishlist, WishlistRemoval
+
+WishlistAntique = Wishlist.antiques.through
+
+
+def stream_pairs(chunk_size):
+    """Yield (user keys, antique keys) lists, one chunk of the through table at a time."""
+    last = 0
+    while True:
+        chunk = list(
+            WishlistAntique.objects.filter(pk__gt=last)
+            .order_by("pk")
+            .values_list("pk", "wishlist__user_id", "antique_id")[:chunk_size]
+        )
+        if not chunk:
+            return
+        last = chunk[-1][0]
+        yield [row[1] for row in chunk], [row[2] for row in chunk]
+
+
+def build_matrix(pair_chunks, max_user_items):
+    """
+    (matrix, antique keys): the binary user x antique CSR matrix of the
+    pairs, and the antique key of each column.
+    """
+    user_index, antique_index = {}, {}
+    rows, cols = [], []
+    for users, antiques in pair_chunks:
+        rows.append(
+            np.fromiter(
+                (user_index.setdefault(u, len(user_index)) for u in users),
+                dtype=np.int32,
+                count=len(users),
+            )
+        )
+        cols.append(
+            np.fromiter(
+                (antique_index.setdefault(a, len(antique_index)) for a in antiques),
+                dtype=np.int32,
+                count=len(antiques),
+            )
+        )
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int32)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(user_index), len(antique_index)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1  # the same antique in two of a user's wishlists
+
+    # Drop the rows of users who saved too much to be informative
+    saved = np.diff(matrix.indptr)
+    matrix = sparse.diags((saved <= max_user_items).astype(np.float32)) @ matrix
+    matrix.eliminate_zeros()
+    return matrix.tocsr(), list(antique_index)
+
+
+def cooccurrence_neighbours(
+    matrix, rows=None, excluded=None, count=12, min_count=2, block_size=1024
+):
+    """
+    Yield (antique column, neighbour columns, scores, co-counts) for each
+    column in rows (default: all), best first. Columns flagged in the
+    boolean `excluded` array are never returned as neighbours.
+    """
+    savers = np.asarray(matrix.sum(axis=0)).ravel()
+    by_antique = matrix.T.tocsr()
+    if rows is None:
+        rows = np.arange(matrix.shape[1])
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        together = (by_antique[block] @ matrix).tocsr()
+        for offset, row in enumerate(block):
+            span = slice(together.indptr[offset], together.indptr[offset + 1])
+            columns, counts = together.indices[span], together.data[span]
+            keep = (counts >= min_count) & (columns != row)
+            if excluded is not None:
+                keep &= ~excluded[columns]
+            columns, counts = columns[keep], counts[keep]
+            scores = counts / np.sqrt(savers[row] * savers[columns])
+            if len(scores) > count:
+                best = np.argpartition(-scores, count)[:count]
+                columns, counts, scores = columns[best], counts[best], scores[best]
+            order = np.argsort(-scores, kind="stable")
+            yield row, columns[order], scores[order], counts[order]
+
+
+def changed_antiques(since):
+    """
+    Antiques whose co-occurrences may have changed since the given timestamp:
+    everything saved by a user who changed any of their wishlists (the
+    matrix rows are users, not wishlists), plus what was removed.
+    """
+    removals = WishlistRemoval.objects.filter(removed_at__gte=since)
+    changed_users = Wishlist.objects.filter(updated_at__gte=since).values("user_id")
+    return set(
+        WishlistAntique.objects.filter(
+            Q(wishlist__user__in=changed_users)
+            | Q(wishlist__user__in=removals.values("user_id"))
+        )
+        .values_list("antique_id", flat=True)
+        .distinct()
+    ) | set(removals.values_list("antique_id", flat=True))
+
+
+def build_cosaved_antiques(full=False):
+    """Bring CoSavedAntique up to date. Returns (antiques recomputed, total)."""
+    started = timezone.now()
+    last_run = (
+        BuildRun.objects.filter(name=BuildRun.COSAVED)
+        .values_list("started_at", flat=True)
+        .first()
+    )
+    full = full or last_run is None
+
+    matrix, keys = build_matrix(
+        stream_pairs(settings.WISHLIST_COSAVED_CHUNK_SIZE),
+        settings.WISHLIST_COSAVED_MAX_USER_ITEMS,
+    )
+    sold = set(Antique.objects.filter(is_sold=True).values_list("pk", flat=True))
+    excluded = np.fromiter((key in sold for key in keys), dtype=bool, count=len(keys))
+
+    if full:
+        rows = np.arange(len(keys))
+    else:
+        changed = changed_antiques(last_run)
+        rows = np.array(
+            [column for column, key in enumerate(keys) if key in changed],
+            dtype=np.int64,
+        )
+
+    neighbours = cooccurrence_neighbours(
+        matrix,
+        rows=rows,
+        excluded=excluded,
+        count=settings.WISHLIST_COSAVED_COUNT,
+        min_count=settings.WISHLIST_COSAVED_MIN_COUNT,
+        block_size=settings.WISHLIST_COSAVED_BLOCK_SIZE,
+    )
+    batch, batch_keys = [], []
+    for row, columns, scores, counts in neighbours:
+        batch_keys.append(keys[row])
+        batch.extend(
+            CoSavedAntique(
+                antique_id=keys[row],
+                other_id=keys[column],
+                rank=rank,
+                score=float(score),
+                together=int(together),
+            )
+            for rank, (column, score, together) in enumerate(
+                zip(columns, scores, counts)
+            )
+        )
+        if len(batch_keys) >= settings.WISHLIST_COSAVED_BLOCK_SIZE:
+            _replace(batch_keys, batch)
+            batch, batch_keys = [], []
+    _replace(batch_keys, batch)
+
+    # Antiques no longer in any wishlist
+    kept = set(keys)
+    if full:
+        stored = CoSavedAntique.objects.values_list("antique_id", flat=True)
+        stale = [pk for pk in stored.order_by().distinct() if pk not in kept]
+    else:
+        stale = [pk for pk in changed if pk not in kept]
+    for start in range(0, len(stale), 1000):
+        CoSavedAntique.objects.filter(
+            antique_id__in=stale[start : start + 1000]
+        ).delete()
+
+    WishlistRemoval.objects.filter(removed_at__lt=started).delete()
+    BuildRun.record(BuildRun.COSAVED, started)
+    return len(rows), len(keys)
+
+
+def _replace(antique_keys, entries):
+    with transaction.atomic():
+        CoSavedAntique.objects.filter(antique_id__in=antique_keys).delete()
+        CoSavedAntique.objects.bulk_create(entries)
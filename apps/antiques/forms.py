@@ -1,12 +1,28 @@
 from django import forms
 from django.forms import inlineformset_factory
 
-from .models import Antique, AntiqueImage, Wishlist
+from .categories import category_tree, get_or_create_category
+from .models import Antique, AntiqueImage, SavedSearch, Wishlist
 
 
 class AntiqueForm(forms.ModelForm):
     """Form for creating or editing an Antique object."""
 
+    new_category = forms.CharField(
+        max_length=100,
+        required=False,
+        label="Other category",
+        help_text="Not listed? Name it and it will be added.",
+    )
+    field_order = [
+        "title",
+        "description",
+        "content",
+        "price",
+        "category",
+        "new_category",
+    ]
+
     class Meta:
         model = Antique
         exclude = {
@@ -16,6 +32,7 @@ class AntiqueForm(forms.ModelForm):
             "slug",
             "updated_at",
             "is_sold",
+            "type_of_antique",
             "seller",
             "stripe_product_id",
             "stripe_price_id",
@@ -52,10 +69,17 @@ class AntiqueForm(forms.ModelForm):
                 "placeholder": "Enter price",
             }
         )
-        self.fields["type_of_antique"].widget.attrs.update(
+        # Indent subcategories under their parents
+        self.fields["category"].choices = [("", "Select a category")] + [
+            (node["id"], node["label"]) for node in category_tree()
+        ]
+        self.fields["category"].widget.attrs.update(
+            {"class": "select select-bordered w-full"}
+        )
+        self.fields["new_category"].widget.attrs.update(
             {
                 "class": "input input-bordered w-full",
-                "placeholder": "e.g., Furniture, Jewelry, Art",
+                "placeholder": "e.g., Clocks",
             }
         )
         self.fields["dimensions"].widget.attrs.update(
@@ -75,6 +99,33 @@ class AntiqueForm(forms.ModelForm):
             }
         )
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("category") and not cleaned_data.get("new_category"):
+            self.add_error("category", "Choose a category or name a new one.")
+        return cleaned_data
+
+    def save(self, commit=True):
+        name = self.cleaned_data.get("new_category")
+        if not name:
+            return super().save(commit=commit)
+        if commit:
+            # Reuses an existing category when the name is a near-duplicate
+            self.instance.category = get_or_create_category(name)
+            return super().save()
+        # Nothing is written before the caller saves: the category is created
+        # by save_m2m(), which runs after the antique has been saved
+        antique = super().save(commit=False)
+        save_m2m = self.save_m2m
+
+        def save_category_and_m2m():
+            antique.category = get_or_create_category(name)
+            antique.save(update_fields=["category", "type_of_antique", "updated_at"])
+            save_m2m()
+
+        self.save_m2m = save_category_and_m2m
+        return antique
+
 
 class AntiqueImageForm(forms.ModelForm):
     """Form for uploading an image related to an Antique."""
@@ -119,3 +170,46 @@ class WishlistForm(forms.ModelForm):
                 "placeholder": "e.g., My Favorite Antiques",
             }
         )
+
+
+class SavedSearchForm(forms.ModelForm):
+    """Form for saving the current catalog search as an alert."""
+
+    class Meta:
+        model = SavedSearch
+        fields = ["title", "query", "type_of_antique", "min_price", "max_price"]
+        labels = {
+            "title": "Name",
+            "query": "Keywords",
+            "type_of_antique": "Type",
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["title"].widget.attrs.update(
+            {
+                "class": "input input-bordered w-full",
+                "placeholder": "e.g., Chippendale chairs",
+            }
+        )
+        self.fields["query"].widget.attrs.update(
+            {
+                "class": "input input-bordered w-full",
+                "placeholder": "Every word must appear in the listing",
+            }
+        )
+        self.fields["type_of_antique"].widget.attrs.update(
+            {"class": "input input-bordered w-full", "placeholder": "Any type"}
+        )
+        for name in ("min_price", "max_price"):
+            self.fields[name].widget.attrs.update(
+                {"class": "input input-bordered w-full", "step": "0.01", "min": "0"}
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        min_price = cleaned_data.get("min_price")
+        max_price = cleaned_data.get("max_price")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            self.add_error("max_price", "Maximum price must be at least the minimum.")
+        return cleaned_data
@@ -0,0 +1,144 @@
+"""
+Recently viewed antiques per user.
+
+A detail page view appends the slug to this process's buffer (history_buffer),
+a deque capped at RECENTLY_VIEWED_MAX per user, so recording a view is O(1)
+and touches neither the cache nor the database. Every
+RECENTLY_VIEWED_FLUSH_INTERVAL seconds, or once RECENTLY_VIEWED_BUFFER_MAX
+users are pending, a background thread (see apps.core.buffers) merges the
+buffer into each user's list in the cache (one get_many, one set_many) and
+upserts the same lists into RecentlyViewed with one bulk statement per
+batch. However many pages a user opens in that window, their list is written
+once.
+
+Lists hold at most RECENTLY_VIEWED_MAX slugs, newest first, each antique
+once. Readers use the cached list; the table only restores it after the
+cache lost it. Two processes flushing the same user at once can drop each
+other's views, which is fine for browsing history.
+"""
+
+import logging
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.buffers import BufferedWriter
+
+from .models import RecentlyViewed
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(user_pk):
+    return f"recently_viewed:{user_pk}"
+
+
+def merge(newer, older, limit):
+    """newer then older, each slug once, cut to limit."""
+    return list(dict.fromkeys([*newer, *older]))[:limit]
+
+
+def load_lists(user_pks):
+    """{user_pk: [slug, ...]} from the cache, falling back to the table."""
+    keys = {cache_key(pk): pk for pk in user_pks}
+    lists = {keys[key]: slugs for key, slugs in cache.get_many(list(keys)).items()}
+    missing = [pk for pk in user_pks if pk not in lists]
+    if missing:
+        stored = dict(
+            RecentlyViewed.objects.filter(user__in=missing).values_list(
+                "user_id", "slugs"
+            )
+        )
+        # Users with no history are cached too, so they don't query again
+        stored = {pk: stored.get(pk, []) for pk in missing}
+        cache.set_many(
+            {cache_key(pk): slugs for pk, slugs in stored.items()},
+            timeout=settings.RECENTLY_VIEWED_CACHE_TIMEOUT,
+        )
+        lists.update(stored)
+    return lists
+
+
+def flush_history(pending, batch_size=500):
+    """
+    Merge buffered views (user pk -> slugs, oldest first) into the cached
+    lists and persist them.
+    """
+    limit = settings.RECENTLY_VIEWED_MAX
+    current = load_lists(list(pending))
+    merged = {
+        pk: merge(reversed(slugs), current.get(pk, []), limit)
+        for pk, slugs in pending.items()
+    }
+    cache.set_many(
+        {cache_key(pk): slugs for pk, slugs in merged.items()},
+        timeout=settings.RECENTLY_VIEWED_CACHE_TIMEOUT,
+    )
+    RecentlyViewed.objects.bulk_create(
+        [RecentlyViewed(user_id=pk, slugs=slugs) for pk, slugs in merged.items()],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["slugs", "updated_at"],
+    )
+
+
+class HistoryBuffer(BufferedWriter):
+    """Per-process recently viewed slugs waiting to be flushed."""
+
+    def __init__(self):
+        super().__init__()
+        self._pending = {}  # user pk -> deque of slugs, oldest first
+
+    @property
+    def interval(self):
+        return settings.RECENTLY_VIEWED_FLUSH_INTERVAL
+
+    @property
+    def max_size(self):
+        return settings.RECENTLY_VIEWED_BUFFER_MAX
+
+    def record(self, user_pk, slug):
+        with self._lock:
+            views = self._pending.get(user_pk)
+            if views is None:
+                views = self._pending[user_pk] = deque(
+                    maxlen=settings.RECENTLY_VIEWED_MAX
+                )
+            views.append(slug)
+            self._recorded()
+
+    def pending_for(self, user_pk):
+        """This process's unflushed views for a user, newest first."""
+        with self._lock:
+            return list(reversed(self._pending.get(user_pk, ())))
+
+    def size(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Write the pending views; on failure they go back in the buffer."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            flush_history(pending)
+        except Exception:
+            logger.exception("Could not flush recently viewed antiques")
+            with self._lock:
+                # Views recorded since go after the ones that failed
+                for user_pk, views in pending.items():
+                    views.extend(self._pending.get(user_pk, ()))
+                    self._pending[user_pk] = views
+
+
+history_buffer = HistoryBuffer()
+
+
+def recently_viewed(user, limit=None):
+    """Slugs the user viewed most recently, newest first."""
+    limit = limit or settings.RECENTLY_VIEWED_MAX
+    stored = load_lists([user.pk]).get(user.pk, [])
+    return merge(history_buffer.pending_for(user.pk), stored, limit)
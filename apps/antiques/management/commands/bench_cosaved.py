@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.antiques.cosaved import build_matrix, cooccurrence_neighbours
+
+
+class Command(BaseCommand):
+    """
+    Time the wishlist co-occurrence job on synthetic data, no database.
+
+    Users save a few antiques each, drawn from a Zipf-like popularity curve
+    so some antiques are in many wishlists, as in real catalogs. Pairs are
+    fed to build_matrix() in chunks the way stream_pairs() yields them.
+    """
+
+    help = "Benchmark wishlist co-occurrence on synthetic wishlist rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=200_000)
+        parser.add_argument("--antiques", type=int, default=100_000)
+        parser.add_argument("--chunk-size", type=int, default=50_000)
+        parser.add_argument("--count", type=int, default=12)
+        parser.add_argument("--block-size", type=int, default=1024)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        weights = 1 / np.arange(1, options["antiques"] + 1) ** 0.8
+        weights /= weights.sum()
+        users = rng.integers(0, options["users"], options["rows"])
+        antiques = rng.choice(options["antiques"], options["rows"], p=weights)
+
+        def chunks():
+            for start in range(0, options["rows"], options["chunk_size"]):
+                end = start + options["chunk_size"]
+                yield users[start:end].tolist(), antiques[start:end].tolist()
+
+        started = time.perf_counter()
+        matrix, keys = build_matrix(chunks(), max_user_items=500)
+        built = time.perf_counter()
+        entries = 0
+        for _, columns, _, _ in cooccurrence_neighbours(
+            matrix, count=options["count"], block_size=options["block_size"]
+        ):
+            entries += len(columns)
+        finished = time.perf_counter()
+
+        self.stdout.write(
+            f"{options['rows']:,} wishlist rows, {matrix.shape[0]:,} users, "
+            f"{len(keys):,} antiques"
+        )
+        self.stdout.write(f"matrix build   {built - started:8.2f}s")
+        self.stdout.write(
+            f"co-occurrence  {finished - built:8.2f}s  "
+            f"({entries:,} neighbours, {len(keys) / (finished - built):,.0f} antiques/s)"
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.antiques.cosaved import build_cosaved_antiques
+
+
+class Command(BaseCommand):
+    """
+    Recompute "collectors who saved this also saved" from wishlists.
+
+    Incremental runs only recompute antiques in wishlists changed since the
+    previous run; schedule those often and a --full run nightly (removals
+    and antiques leaving every wishlist are only picked up by --full).
+    """
+
+    help = "Precompute wishlist co-occurrence recommendations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every antique, not just those in changed wishlists.",
+        )
+
+    def handle(self, *args, **options):
+        recomputed, total = build_cosaved_antiques(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed {recomputed} of {total} saved antiques.")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.antiques.similarity import build_similar_antiques
+
+
+class Command(BaseCommand):
+    """
+    Recompute the "similar antiques" shown on detail pages.
+
+    Only antiques whose text changed since the last run (and those whose
+    neighbours they affect) are recomputed; schedule it every few minutes,
+    plus a nightly --full run to pick up document-frequency drift.
+    """
+
+    help = "Precompute TF-IDF similar antiques (incremental unless --full)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every antique, not just changed ones.",
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=None,
+            help="Rows per sparse matrix product (default SIMILAR_ANTIQUES_BLOCK_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        recomputed, total = build_similar_antiques(
+            full=options["full"], block_size=options["block_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed {recomputed} of {total} antiques.")
+        )
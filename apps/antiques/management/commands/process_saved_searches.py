@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.antiques.alerts import percolate, send_digests
+
+
+class Command(BaseCommand):
+    """
+    Match new listings against saved searches and send digest emails.
+
+    Antique saves only queue a PercolationJob, so this work never runs on a
+    request. Each digest covers everything a user matched during the last
+    SAVED_SEARCH_DIGEST_INTERVAL, so a burst of new listings is one email.
+    With EMAIL_OUTBOX_ENABLED the digests are queued for `send_outbox_email`.
+    """
+
+    help = "Match new antiques against saved searches and send digests (once, or with --loop)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Listings matched (and digests sent) per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new listings instead of exiting when idle.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.SAVED_SEARCH_POLL_INTERVAL,
+            help="Seconds to wait between polls when there is nothing to do.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        try:
+            while True:
+                listings, matches = percolate(batch_size)
+                digests = send_digests(batch_size)
+                if listings or digests:
+                    self.stdout.write(
+                        f"Matched {listings} listings ({matches} matches), "
+                        f"sent {digests} digests"
+                    )
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
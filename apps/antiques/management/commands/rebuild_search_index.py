@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.antiques.search import rebuild_trigram_index, uses_pg_trgm
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the AntiqueTrigram table used by typo-tolerant search.
+
+    Saves keep it current; run this after imports that bypass signals
+    (bulk_create, queryset.update, raw SQL). Not needed on PostgreSQL, where
+    pg_trgm indexes the antique columns directly.
+    """
+
+    help = "Rebuild the trigram index used by typo-tolerant antique search."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Trigram rows inserted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        if uses_pg_trgm():
+            self.stdout.write("PostgreSQL uses pg_trgm indexes; nothing to rebuild.")
+            return
+        count = rebuild_trigram_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} antiques."))
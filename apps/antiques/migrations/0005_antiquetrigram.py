@@ -0,0 +1,94 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:02
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text):
+    """Frozen copy of apps.antiques.models.trigram.trigrams as of this migration."""
+    found = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f" {word} "
+        found.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+PG_TRGM_INDEXES = [
+    ("antiques_antique_title_trgm", "title"),
+    ("antiques_antique_type_trgm", "type_of_antique"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN trigram indexes on PostgreSQL; fill AntiqueTrigram everywhere else."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, column in PG_TRGM_INDEXES:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON antiques_antique "
+                f"USING gin ({column} gin_trgm_ops)"
+            )
+        return
+
+    Antique = apps.get_model("antiques", "Antique")
+    AntiqueTrigram = apps.get_model("antiques", "AntiqueTrigram")
+    rows = Antique.objects.values_list("pk", "title", "type_of_antique")
+    AntiqueTrigram.objects.bulk_create(
+        [
+            AntiqueTrigram(antique_id=pk, trigram=trigram)
+            for pk, title, type_name in rows.iterator()
+            for trigram in trigrams(title) | trigrams(type_name)
+        ],
+        batch_size=1000,
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for name, _ in PG_TRGM_INDEXES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0004_remove_antique_antiques_an_short_i_df05a0_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AntiqueTrigram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("trigram", models.CharField(max_length=3)),
+                (
+                    "antique",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trigrams",
+                        to="antiques.antique",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("trigram", "antique"), name="unique_antique_trigram"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,171 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:10
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils.text import slugify
+from fuzzywuzzy import fuzz
+
+# Frozen copies of apps.antiques.categories.cluster_names and
+# apps.antiques.models.trigram.trigrams as of this migration
+
+SAME_CATEGORY_RATIO = 85
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_name(name):
+    return " ".join((name or "").split()).casefold()
+
+
+def find_cluster(name, canonical):
+    key = normalize_name(name)
+    if key in canonical:
+        return canonical[key]
+    for other, canonical_name in canonical.items():
+        if fuzz.ratio(key, other) >= SAME_CATEGORY_RATIO:
+            return canonical_name
+    return None
+
+
+def cluster_names(counts):
+    canonical = {}
+    mapping = {}
+    for name, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        if not normalize_name(name):
+            continue
+        cluster = find_cluster(name, canonical)
+        if cluster is None:
+            cluster = " ".join(name.split())
+            canonical[normalize_name(cluster)] = cluster
+        mapping[name] = cluster
+    return mapping
+
+
+def trigrams(text):
+    found = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f" {word} "
+        found.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+def unique_slug(name, taken):
+    base = slugify(name) or "category"
+    slug, n = base, 2
+    while slug in taken:
+        slug, n = f"{base}-{n}", n + 1
+    taken.add(slug)
+    return slug
+
+
+def cluster_types(apps, schema_editor):
+    """One category per cluster of free-text types, linked to its antiques."""
+    Antique = apps.get_model("antiques", "Antique")
+    AntiqueTrigram = apps.get_model("antiques", "AntiqueTrigram")
+    Category = apps.get_model("antiques", "Category")
+
+    counts = dict(
+        Antique.objects.values_list("type_of_antique")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    mapping = cluster_names(counts)
+    taken = set()
+    categories = {
+        name: Category.objects.create(name=name, slug=unique_slug(name, taken))
+        for name in sorted(set(mapping.values()))
+    }
+    for type_name, name in mapping.items():
+        category = categories[name]
+        Antique.objects.filter(type_of_antique=type_name).update(
+            category=category, type_of_antique=name
+        )
+        if name != type_name and schema_editor.connection.vendor != "postgresql":
+            # Antiques now carry the cluster's spelling; index it for search
+            AntiqueTrigram.objects.bulk_create(
+                [
+                    AntiqueTrigram(antique_id=pk, trigram=trigram)
+                    for pk in Antique.objects.filter(category=category).values_list(
+                        "pk", flat=True
+                    )
+                    for trigram in trigrams(name)
+                ],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+        category.antique_count = Antique.objects.filter(
+            category=category, is_sold=False
+        ).count()
+        category.save(update_fields=["antique_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0006_saved_searches"),
+        ("sellers", "0004_seller_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="antique",
+            name="type_of_antique",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("slug", models.SlugField(blank=True, max_length=120, unique=True)),
+                (
+                    "antique_count",
+                    models.PositiveIntegerField(default=0, editable=False),
+                ),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="children",
+                        to="antiques.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "categories",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="antique",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="antiques",
+                to="antiques.category",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["category", "is_sold"], name="antique_category_sold_idx"
+            ),
+        ),
+        migrations.RunPython(cluster_types, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0007_categories"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarityFingerprint",
+            fields=[
+                (
+                    "antique",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="similarity_fingerprint",
+                        serialize=False,
+                        to="antiques.antique",
+                    ),
+                ),
+                ("digest", models.CharField(max_length=32)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SimilarAntique",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "antique",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_entries",
+                        to="antiques.antique",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="antiques.antique",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["antique", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("antique", "rank"), name="unique_similar_antique_rank"
+                    )
+                ],
+            },
+        ),
+    ]
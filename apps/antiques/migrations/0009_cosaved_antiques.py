@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0008_similar_antiques"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CoSavedAntique",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                ("together", models.PositiveIntegerField()),
+                (
+                    "antique",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cosaved_entries",
+                        to="antiques.antique",
+                    ),
+                ),
+                (
+                    "other",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="antiques.antique",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["antique", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("antique", "rank"), name="unique_cosaved_antique_rank"
+                    )
+                ],
+            },
+        ),
+    ]
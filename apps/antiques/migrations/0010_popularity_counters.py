@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0009_cosaved_antiques"),
+        ("sellers", "0004_seller_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="antique",
+            name="trending_score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="antique",
+            name="view_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="antique",
+            name="wishlist_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "-view_count", "-created_at"],
+                name="antique_popular_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "-trending_score"], name="antique_trending_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0010_popularity_counters"),
+        ("sellers", "0004_seller_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="antique",
+            name="antique_popular_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="antique",
+            name="antique_trending_idx",
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "-created_at", "-id"], name="antique_newest_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "price", "id"], name="antique_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "-updated_at", "-id"], name="antique_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "-view_count", "-id"], name="antique_popular_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["is_sold", "-trending_score", "-id"],
+                name="antique_trending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0012_recentlyviewed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["seller", "-created_at", "-id"],
+                name="antique_seller_newest_idx",
+            ),
+        ),
+    ]
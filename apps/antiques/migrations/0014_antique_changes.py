@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0013_antique_seller_newest_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AntiqueTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("antique_id", models.UUIDField(unique=True)),
+                ("slug", models.SlugField(max_length=255)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["deleted_at", "antique_id"],
+                        name="tombstone_changes_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="antique",
+            index=models.Index(
+                fields=["updated_at", "id"], name="antique_changes_idx"
+            ),
+        ),
+    ]
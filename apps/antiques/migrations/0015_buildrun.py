@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("antiques", "0014_antique_changes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BuildRun",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,3 +1,15 @@
-from .antique import Antique, AntiqueImage
+from .antique import Antique, AntiqueImage, primary_images
 from .base import Base
-from .wishlist import Wishlist
+from .category import Category
+from .history import RecentlyViewed
+from .saved_search import (
+    PercolationJob,
+    SavedSearch,
+    SavedSearchMatch,
+    SavedSearchTerm,
+    listing_terms,
+)
+from .similar import BuildRun, CoSavedAntique, SimilarAntique, SimilarityFingerprint
+from .sync import AntiqueTombstone
+from .trigram import AntiqueTrigram
+from .wishlist import Wishlist, WishlistRemoval
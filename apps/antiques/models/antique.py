@@ -3,10 +3,12 @@ import uuid
 
 from django.conf import settings
 from django.db import models
-from django.db.models import Max
+from django.db.models import Max, Prefetch, Window
+from django.db.models.functions import RowNumber
 from django.utils.text import slugify
 from apps.sellers.models import Seller
 from .base import Base
+from .category import Category
 
 
 class Antique(Base):
@@ -14,7 +16,15 @@ class Antique(Base):
     content = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     is_sold = models.BooleanField(default=False)
-    type_of_antique = models.CharField(max_length=100)
+    # Denormalized category name, kept for display and text search
+    type_of_antique = models.CharField(max_length=100, blank=True)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="antiques",
+    )
 
     slug = models.SlugField(max_length=255, unique=True, blank=True)
 
@@ -22,6 +32,12 @@ class Antique(Base):
     quantity = models.PositiveIntegerField(default=1)
     additional_info = models.TextField(blank=True)
 
+    # Written in batches by apps.antiques.popularity, never by save()
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    wishlist_count = models.PositiveIntegerField(default=0, editable=False)
+    # Log of the time-decayed activity score; only meaningful for ordering
+    trending_score = models.FloatField(default=0, editable=False)
+
     seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="antiques", null=True)
     stripe_product_id = models.CharField(max_length=100, blank=True, null=True)
     stripe_price_id = models.CharField(max_length=100, blank=True, null=True)
@@ -29,6 +45,34 @@ class Antique(Base):
     class Meta:
         indexes = [
             models.Index(fields=["slug"]),
+            # Seller storefront pages (newest first, cursor paginated)
+            models.Index(
+                fields=["seller", "-created_at", "-id"],
+                name="antique_seller_newest_idx",
+            ),
+            # Covers category filters and per-category counts of unsold items
+            models.Index(
+                fields=["category", "is_sold"], name="antique_category_sold_idx"
+            ),
+            # One per AntiqueListView sort: the is_sold filter, the sort key
+            # and the id tiebreaker, so a page is an index range scan with no
+            # sort step. price_desc scans antique_price_idx backwards.
+            models.Index(
+                fields=["is_sold", "-created_at", "-id"], name="antique_newest_idx"
+            ),
+            models.Index(fields=["is_sold", "price", "id"], name="antique_price_idx"),
+            models.Index(
+                fields=["is_sold", "-updated_at", "-id"], name="antique_updated_idx"
+            ),
+            models.Index(
+                fields=["is_sold", "-view_count", "-id"], name="antique_popular_idx"
+            ),
+            models.Index(
+                fields=["is_sold", "-trending_score", "-id"],
+                name="antique_trending_idx",
+            ),
+            # Delta-sync API (apps.antiques.sync): changes since a watermark
+            models.Index(fields=["updated_at", "id"], name="antique_changes_idx"),
         ]
 
     def __str__(self):
@@ -45,6 +89,9 @@ class Antique(Base):
             self.slug = f"{base_slug}-{unique_id}"
             # Note: unique id has 16^8 = 4,294,967,296 combinations, low collision risk
 
+        if self.category_id:
+            self.type_of_antique = self.category.name
+
         # Auto-update sold status
         self.is_sold = self.quantity == 0
 
@@ -64,3 +111,17 @@ class AntiqueImage(models.Model):
 
     def __str__(self):
         return f"Image for {self.antique.title} ({self.id})"
+
+
+def primary_images(to_attr="primary_images"):
+    """
+    Prefetch only each antique's first image (the one get_primary_image()
+    returns) into a one-item list, for cards that show a single picture.
+    """
+    return Prefetch(
+        "images",
+        queryset=AntiqueImage.objects.annotate(
+            position=Window(RowNumber(), partition_by="antique", order_by="pk")
+        ).filter(position=1),
+        to_attr=to_attr,
+    )
@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils.text import slugify
+
+
+class Category(models.Model):
+    """
+    A node of the antique taxonomy, e.g. Furniture > Chairs.
+
+    antique_count is the number of unsold antiques filed directly under the
+    category. It is kept up to date from Antique saves and deletes (see
+    apps.antiques.categories.recount_categories), so facet counts never
+    need to scan the antique table.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=120, unique=True, blank=True)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="children",
+    )
+    antique_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "categories"
+
+    def __str__(self):
+        return f"{self.name}"
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            base = slugify(self.name) or "category"
+            self.slug, n = base, 2
+            while Category.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
+                self.slug, n = f"{base}-{n}", n + 1
+        super().save(*args, **kwargs)
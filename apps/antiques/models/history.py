@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import models
+
+
+class RecentlyViewed(models.Model):
+    """
+    A user's recently viewed antiques (slugs, newest first). Written in
+    batches by apps.antiques.history; readers use the cached copy and only
+    fall back to this row when the cache has lost it.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recently_viewed",
+    )
+    slugs = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "recently viewed"
+
+    def __str__(self):
+        return f"{self.user_id}: {len(self.slugs)} recently viewed"
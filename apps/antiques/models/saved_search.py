@@ -0,0 +1,135 @@
+from django.db import models
+
+from .antique import Antique
+from .base import Base
+from .trigram import WORD_RE
+
+# Term for searches with no words or type: matches every listing
+MATCH_ALL = "*"
+
+
+def words(text):
+    return set(WORD_RE.findall((text or "").lower()))
+
+
+class SavedSearch(Base):
+    """
+    A user's stored catalog search. New listings are matched against it by
+    the `process_saved_searches` worker (see apps.antiques.alerts) and sent
+    to the user in periodic digests.
+    """
+
+    query = models.CharField(max_length=200, blank=True)
+    type_of_antique = models.CharField(max_length=100, blank=True)
+    min_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    max_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    is_active = models.BooleanField(default=True)
+    # Number of SavedSearchTerm rows; a listing matches when it has all of them
+    term_count = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    class Meta:
+        verbose_name_plural = "saved searches"
+
+    def __str__(self):
+        return f"{self.title}"
+
+    def terms(self):
+        """Every term a listing must contain (see listing_terms)."""
+        terms = words(self.query)
+        if self.type_of_antique:
+            terms.add(f"type:{self.type_of_antique.lower()}")
+        return terms or {MATCH_ALL}
+
+    def save(self, *args, **kwargs):
+        self.term_count = len(self.terms())
+        super().save(*args, **kwargs)
+
+    def get_list_params(self):
+        """The matching antique list query string parameters."""
+        params = {}
+        if self.query:
+            params["search"] = self.query
+        if self.type_of_antique:
+            params["type"] = self.type_of_antique
+        if self.min_price is not None:
+            params["min_price"] = self.min_price
+        if self.max_price is not None:
+            params["max_price"] = self.max_price
+        return params
+
+
+def listing_terms(antique):
+    """The terms a listing offers to saved searches."""
+    terms = words(antique.title) | words(antique.description)
+    terms |= words(antique.type_of_antique)
+    terms.add(f"type:{antique.type_of_antique.lower()}")
+    # A search for a category also matches listings in its subcategories
+    category = antique.category
+    while category is not None:
+        terms.add(f"type:{category.name.lower()}")
+        category = category.parent
+    terms.add(MATCH_ALL)
+    return terms
+
+
+class SavedSearchTerm(models.Model):
+    """Inverted index: term -> saved searches requiring it."""
+
+    saved_search = models.ForeignKey(
+        SavedSearch, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    term = models.CharField(max_length=110)
+
+    class Meta:
+        constraints = [
+            # Also the lookup index: term -> saved searches
+            models.UniqueConstraint(
+                fields=["term", "saved_search"], name="unique_saved_search_term"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.term!r} in {self.saved_search_id}"
+
+
+class SavedSearchMatch(models.Model):
+    """A listing that matched a saved search, waiting for (or sent in) a digest."""
+
+    saved_search = models.ForeignKey(
+        SavedSearch, on_delete=models.CASCADE, related_name="matches"
+    )
+    antique = models.ForeignKey(
+        Antique, on_delete=models.CASCADE, related_name="saved_search_matches"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "saved search matches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["saved_search", "antique"], name="unique_saved_search_match"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["notified_at", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.antique_id} matched {self.saved_search_id}"
+
+
+class PercolationJob(models.Model):
+    """A new listing queued to be matched against saved searches."""
+
+    antique = models.OneToOneField(
+        Antique, on_delete=models.CASCADE, related_name="percolation_job"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Match {self.antique_id} against saved searches"
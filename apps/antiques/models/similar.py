@@ -0,0 +1,101 @@
+from django.db import models
+from django.utils import timezone
+
+from .antique import Antique
+
+
+class SimilarAntique(models.Model):
+    """
+    Precomputed "similar antiques" (TF-IDF cosine neighbours), written by the
+    build_similar_antiques command (see apps.antiques.similarity).
+    """
+
+    antique = models.ForeignKey(
+        Antique, on_delete=models.CASCADE, related_name="similar_entries"
+    )
+    similar = models.ForeignKey(Antique, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["antique", "rank"]
+        constraints = [
+            # Also the detail page lookup: antique -> neighbours in rank order
+            models.UniqueConstraint(
+                fields=["antique", "rank"], name="unique_similar_antique_rank"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.similar_id} similar to {self.antique_id} ({self.score:.2f})"
+
+
+class SimilarityFingerprint(models.Model):
+    """Digest of the text an antique's neighbours were last computed from."""
+
+    antique = models.OneToOneField(
+        Antique,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="similarity_fingerprint",
+    )
+    digest = models.CharField(max_length=32)
+
+    def __str__(self):
+        return f"{self.antique_id}: {self.digest}"
+
+
+class CoSavedAntique(models.Model):
+    """
+    "Collectors who saved this also saved": antiques that share wishlists,
+    written by the build_cosaved_antiques command (see apps.antiques.cosaved).
+    """
+
+    antique = models.ForeignKey(
+        Antique, on_delete=models.CASCADE, related_name="cosaved_entries"
+    )
+    other = models.ForeignKey(Antique, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    # Number of users who saved both
+    together = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["antique", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["antique", "rank"], name="unique_cosaved_antique_rank"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.other_id} saved with {self.antique_id} ({self.together})"
+
+
+class BuildRun(models.Model):
+    """When a recommendation build command last ran, one row per command."""
+
+    SIMILAR = "similar"  # build_similar_antiques
+    COSAVED = "cosaved"  # build_cosaved_antiques
+
+    name = models.CharField(max_length=50, primary_key=True)
+    # Incremental runs pick up changes made since this
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.started_at:%Y-%m-%d %H:%M:%S}"
+
+    @classmethod
+    def record(cls, name, started_at):
+        """Mark the named build as finished now."""
+        cls.objects.update_or_create(
+            name=name,
+            defaults={"started_at": started_at, "finished_at": timezone.now()},
+        )
+
+    @classmethod
+    def last_finished(cls, *names):
+        """When any of the named builds last finished (for ETags), or None."""
+        latest = cls.objects.filter(name__in=names).aggregate(models.Max("finished_at"))
+        return latest["finished_at__max"]
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class AntiqueTombstone(models.Model):
+    """
+    Marks a deleted antique for the delta-sync API (apps.antiques.sync), so
+    clients that copied the catalog learn to drop it. Written by a
+    post_delete signal; the antique's row is gone by then.
+    """
+
+    antique_id = models.UUIDField(unique=True)
+    slug = models.SlugField(max_length=255)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Same (timestamp, id) keyset as antique_changes_idx
+            models.Index(
+                fields=["deleted_at", "antique_id"], name="tombstone_changes_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.slug} (deleted {self.deleted_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,44 @@
+import re
+
+from django.db import models
+
+from .antique import Antique
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text):
+    """
+    Trigrams of each word, padded like pg_trgm but without the leading
+    "  x" trigram, which is shared by too many words to narrow anything down:
+    "Oak" -> {" oa", "oak", "ak "}
+    """
+    found = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f" {word} "
+        found.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+class AntiqueTrigram(models.Model):
+    """
+    Trigram index for typo-tolerant search on databases without pg_trgm.
+    Maintained from Antique saves (see apps.antiques.search); unused on
+    PostgreSQL, where trigram GIN indexes on the antique columns do the job.
+    """
+
+    antique = models.ForeignKey(
+        Antique, on_delete=models.CASCADE, related_name="trigrams"
+    )
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        constraints = [
+            # Also the lookup index: trigram -> antiques, without a table read
+            models.UniqueConstraint(
+                fields=["trigram", "antique"], name="unique_antique_trigram"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} in {self.antique_id}"
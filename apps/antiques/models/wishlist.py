@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 from .antique import Antique
@@ -9,3 +10,31 @@ class Wishlist(Base):
 
     def __str__(self):
         return f"{self.title}"
+
+    @classmethod
+    def last_modified_for(cls, user):
+        """Newest change to any of the user's wishlists (for ETags), or None."""
+        if not user.is_authenticated:
+            return None
+        latest = cls.objects.filter(user=user).aggregate(models.Max("updated_at"))
+        return latest["updated_at__max"]
+
+
+class WishlistRemoval(models.Model):
+    """
+    An antique taken out of a user's wishlist (or deleted with it). The
+    incremental co-saved build reads these, since the rows are gone from the
+    wishlist table, and deletes them once processed.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+    )
+    antique = models.ForeignKey(Antique, on_delete=models.CASCADE, related_name="+")
+    removed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.antique_id} removed by {self.user_id}"
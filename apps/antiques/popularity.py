@@ -0,0 +1,140 @@
+"""
+Buffered popularity counters.
+
+Detail page views and wishlist adds are counted in process memory
+(counter_buffer) and written in one batched UPDATE by a background thread
+every POPULARITY_FLUSH_INTERVAL seconds (or once POPULARITY_BUFFER_MAX
+antiques are pending; see apps.core.buffers), so reading a page never writes
+a row or waits for a flush. Counts still buffered when a process exits are
+lost, which is fine for popularity.
+
+Trending is an exponentially decayed score with half-life TRENDING_HALF_LIFE.
+It is stored as the log of the score scaled to a fixed epoch:
+
+    trending_score = log(sum(weight * exp(rate * (t - EPOCH))))
+
+Every listing decays at the same rate, so ordering by the stored value is
+ordering by the decayed score at any moment: nothing needs rewriting as time
+passes, and a plain index serves the "trending" sort. Working in logs keeps
+the value small (it grows linearly with time) where the scaled score itself
+would overflow.
+"""
+
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.buffers import BufferedWriter
+
+from .models import Antique
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b)) without overflow."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def trending_boost(when):
+    """Log-scale weight of one event at `when` (see module docstring)."""
+    rate = math.log(2) / settings.TRENDING_HALF_LIFE
+    return rate * (when - EPOCH).total_seconds()
+
+
+def flush_counts(views, saves, batch_size=500):
+    """
+    Add buffered counts to the antiques: views (Counter keyed by slug) and
+    wishlist adds (Counter keyed by pk). Rows are locked while the trending
+    score is folded in. Keys are removed from views and saves as their batch
+    commits, so after a failure they hold exactly what is still unwritten.
+    """
+    boost = trending_boost(timezone.now())
+    slugs, pks = list(views), list(saves)
+    for start in range(0, max(len(slugs), len(pks)), batch_size):
+        batch_slugs = slugs[start : start + batch_size]
+        batch_pks = pks[start : start + batch_size]
+        with transaction.atomic():
+            rows = list(
+                Antique.objects.select_for_update()
+                .filter(Q(slug__in=batch_slugs) | Q(pk__in=batch_pks))
+                .only("pk", "slug", "view_count", "wishlist_count", "trending_score")
+            )
+            for antique in rows:
+                viewed = views.get(antique.slug, 0)
+                saved = saves.get(antique.pk, 0)
+                antique.view_count += viewed
+                antique.wishlist_count += saved
+                weight = viewed + settings.TRENDING_WISHLIST_WEIGHT * saved
+                if weight:
+                    antique.trending_score = log_add(
+                        antique.trending_score, math.log(weight) + boost
+                    )
+            # bulk_update skips save(): counters don't bump updated_at or
+            # invalidate page caches
+            Antique.objects.bulk_update(
+                rows, ["view_count", "wishlist_count", "trending_score"]
+            )
+        # Written, or the antique no longer exists
+        for slug in batch_slugs:
+            del views[slug]
+        for pk in batch_pks:
+            del saves[pk]
+
+
+class CounterBuffer(BufferedWriter):
+    """Per-process view and wishlist-add counts waiting to be flushed."""
+
+    def __init__(self):
+        super().__init__()
+        self._views = Counter()
+        self._saves = Counter()
+
+    @property
+    def interval(self):
+        return settings.POPULARITY_FLUSH_INTERVAL
+
+    @property
+    def max_size(self):
+        return settings.POPULARITY_BUFFER_MAX
+
+    def record_view(self, slug):
+        with self._lock:
+            self._views[slug] += 1
+            self._recorded()
+
+    def record_save(self, pk, count=1):
+        with self._lock:
+            self._saves[pk] += count
+            self._recorded()
+
+    def size(self):
+        return len(self._views) + len(self._saves)
+
+    def flush(self):
+        """Write the pending counts; on failure they go back in the buffer."""
+        with self._lock:
+            views, saves = self._views, self._saves
+            self._views, self._saves = Counter(), Counter()
+        if not views and not saves:
+            return
+        try:
+            flush_counts(views, saves)
+        except Exception:
+            logger.exception("Could not flush popularity counters")
+            with self._lock:
+                # Whatever flush_counts didn't write goes back in the buffer
+                self._views.update(views)
+                self._saves.update(saves)
+
+
+counter_buffer = CounterBuffer()
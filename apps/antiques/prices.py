@@ -0,0 +1,99 @@
+"""
+Price range filter and histogram.
+
+The list filter shows how the current results spread over fixed price
+buckets (PRICE_HISTOGRAM_EDGES). All buckets are counted by one grouped
+aggregate: a CASE expression maps each row to its bucket and the database
+returns a (bucket, count) row per non-empty bucket. Histograms are cached
+per facet combination (search, category, sold toggle) and leave out the
+price filter itself, so the slider keeps showing the prices a user could
+widen the range to.
+"""
+
+import hashlib
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from .caches import catalog_cache
+
+
+def parse_price(value):
+    """A non-negative Decimal from a query parameter, or None."""
+    try:
+        price = Decimal((value or "").strip())
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+def price_buckets():
+    """[(low, high), ...] from PRICE_HISTOGRAM_EDGES; the last high is None."""
+    edges = sorted(settings.PRICE_HISTOGRAM_EDGES)
+    return list(zip(edges, [*edges[1:], None]))
+
+
+def bucket_expression():
+    """Index into price_buckets() of each row's price."""
+    buckets = price_buckets()
+    return Case(
+        *[
+            When(price__lt=high, then=Value(index))
+            for index, (_, high) in enumerate(buckets[:-1])
+        ],
+        default=Value(len(buckets) - 1),
+        output_field=IntegerField(),
+    )
+
+
+def _count_buckets(queryset):
+    counts = dict(
+        queryset.prefetch_related(None)
+        .order_by()
+        .annotate(bucket=bucket_expression())
+        .values("bucket")
+        .annotate(count=Count("pk"))
+        .values_list("bucket", "count")
+    )
+    highest = max(counts.values(), default=0)
+    return [
+        {
+            "min": low,
+            "max": high,
+            "count": counts.get(index, 0),
+            # Bar height in percent; non-empty buckets stay visible
+            "height": max(round(100 * counts.get(index, 0) / highest), 4)
+            if counts.get(index)
+            else 0,
+        }
+        for index, (low, high) in enumerate(price_buckets())
+    ]
+
+
+def price_histogram(queryset, facets):
+    """
+    [{"min", "max", "count", "height"}, ...] for every bucket of queryset,
+    which should carry every list filter except price. facets identifies
+    that filter combination in the cache (any string). Cached until an
+    antique changes.
+    """
+    key = hashlib.md5(facets.encode()).hexdigest()
+    return catalog_cache.get_or_set(
+        f"price_histogram:{key}",
+        lambda: _count_buckets(queryset),
+        tags=["antiques"],
+    )
+
+
+def mark_selected(histogram, low, high):
+    """Copies of the buckets flagged with whether they overlap [low, high]."""
+    return [
+        {
+            **bucket,
+            "selected": (low is not None or high is not None)
+            and (high is None or bucket["min"] <= high)
+            and (low is None or bucket["max"] is None or bucket["max"] > low),
+        }
+        for bucket in histogram
+    ]
@@ -0,0 +1,156 @@
+"""
+Typo-tolerant antique search.
+
+Matching happens in two steps so the cost doesn't grow with the catalog:
+
+1. A trigram index shortlists at most FUZZY_SEARCH_SHORTLIST candidates:
+   pg_trgm's word-similarity operator (GIN indexed) on PostgreSQL, the
+   AntiqueTrigram table elsewhere. There, at most FUZZY_SEARCH_MAX_POSTINGS
+   antiques are read per query trigram; commoner trigrams only count
+   towards the overlap of candidates found through rarer ones.
+2. Only that shortlist is scored with fuzzywuzzy's edit-distance ratio, and
+   candidates under FUZZY_SEARCH_MIN_SCORE are dropped.
+"""
+
+import math
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from fuzzywuzzy import fuzz
+
+from .models import Antique, AntiqueTrigram
+from .models.trigram import trigrams
+
+
+def uses_pg_trgm(model=Antique):
+    return connections[router.db_for_write(model)].vendor == "postgresql"
+
+
+def index_antique(antique):
+    """Bring the AntiqueTrigram rows of one antique up to date."""
+    if uses_pg_trgm():
+        return
+    wanted = trigrams(antique.title) | trigrams(antique.type_of_antique)
+    existing = set(
+        AntiqueTrigram.objects.filter(antique=antique).values_list("trigram", flat=True)
+    )
+    if existing - wanted:
+        AntiqueTrigram.objects.filter(
+            antique=antique, trigram__in=existing - wanted
+        ).delete()
+    AntiqueTrigram.objects.bulk_create(
+        [AntiqueTrigram(antique=antique, trigram=t) for t in wanted - existing]
+    )
+
+
+def _index_rows(antiques, batch_size):
+    """Insert the AntiqueTrigram rows of `antiques`; returns their number."""
+    rows = antiques.values_list("pk", "title", "type_of_antique")
+    count = 0
+    batch = []
+    for pk, title, type_name in rows.iterator(chunk_size=batch_size):
+        count += 1
+        batch.extend(
+            AntiqueTrigram(antique_id=pk, trigram=t)
+            for t in trigrams(title) | trigrams(type_name)
+        )
+        if len(batch) >= batch_size:
+            AntiqueTrigram.objects.bulk_create(batch)
+            batch = []
+    AntiqueTrigram.objects.bulk_create(batch)
+    return count
+
+
+@transaction.atomic
+def rebuild_trigram_index(batch_size=1000):
+    """Rebuild the whole AntiqueTrigram table; returns the number of antiques."""
+    AntiqueTrigram.objects.all().delete()
+    return _index_rows(Antique.objects.all(), batch_size)
+
+
+@transaction.atomic
+def reindex_antiques(antiques, batch_size=1000):
+    """Rebuild the AntiqueTrigram rows of a queryset after a bulk update."""
+    if uses_pg_trgm():
+        return
+    AntiqueTrigram.objects.filter(antique__in=antiques.values("pk")).delete()
+    _index_rows(antiques, batch_size)
+
+
+def shortlist(search, limit):
+    """Up to `limit` (pk, title, type) candidates sharing enough trigrams with search."""
+    if uses_pg_trgm():
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return list(
+            Antique.objects.filter(
+                Q(title__trigram_word_similar=search)
+                | Q(type_of_antique__trigram_word_similar=search)
+            )
+            .annotate(
+                similarity=Greatest(
+                    TrigramWordSimilarity(search, "title"),
+                    TrigramWordSimilarity(search, "type_of_antique"),
+                )
+            )
+            .order_by("-similarity")
+            .values_list("pk", "title", "type_of_antique")[:limit]
+        )
+
+    wanted = trigrams(search)
+    if not wanted:
+        return []
+    required = max(2, math.ceil(len(wanted) * settings.FUZZY_SEARCH_MIN_OVERLAP))
+    # Read a bounded slice of each trigram's postings off the (trigram,
+    # antique) index; a trigram with more is too common to narrow anything
+    cap = settings.FUZZY_SEARCH_MAX_POSTINGS
+    postings = {
+        trigram: list(
+            AntiqueTrigram.objects.filter(trigram=trigram).values_list(
+                "antique_id", flat=True
+            )[: cap + 1]
+        )
+        for trigram in wanted
+    }
+    common = {trigram for trigram, ids in postings.items() if len(ids) > cap}
+    hits = Counter(pk for trigram in wanted - common for pk in postings[trigram])
+    if common:
+        if hits:
+            # Candidates come from the rare trigrams alone
+            candidates = [
+                pk for pk, n in hits.most_common(cap) if n + len(common) >= required
+            ]
+        else:
+            candidates = list(
+                dict.fromkeys(pk for trigram in common for pk in postings[trigram])
+            )[:cap]
+        # Then the common trigrams are counted for those candidates only
+        hits = Counter({pk: hits[pk] for pk in candidates}) + Counter(
+            AntiqueTrigram.objects.filter(
+                antique_id__in=candidates, trigram__in=common
+            ).values_list("antique_id", flat=True)
+        )
+    ids = [pk for pk, n in hits.most_common() if n >= required][:limit]
+    return list(
+        Antique.objects.filter(pk__in=ids).values_list("pk", "title", "type_of_antique")
+    )
+
+
+def fuzzy_search_ids(search):
+    """
+    Primary keys of antiques whose title or type approximately matches
+    search, in no particular order: the list view only filters on them.
+    """
+    search = search.strip()
+    if len(search) < 3:
+        return []
+    minimum = settings.FUZZY_SEARCH_MIN_SCORE
+    return [
+        pk
+        for pk, title, type_name in shortlist(search, settings.FUZZY_SEARCH_SHORTLIST)
+        if fuzz.WRatio(search, title) >= minimum
+        or fuzz.WRatio(search, type_name) >= minimum
+    ]
@@ -0,0 +1,237 @@
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.core.caching import invalidate_on
+from apps.core.changes import consumer, record_updates, track_changes
+from apps.core.snapshots import queue_snapshot
+
+from apps.sellers.models import Seller
+
+from .alerts import index_saved_search
+from .categories import recount_categories
+from .popularity import counter_buffer
+from .models import (
+    Antique,
+    AntiqueImage,
+    AntiqueTombstone,
+    Category,
+    PercolationJob,
+    SavedSearch,
+    Wishlist,
+    WishlistRemoval,
+)
+from .search import index_antique, reindex_antiques
+from .suggest import suggestion_index
+
+invalidate_on(Antique, "antiques")
+invalidate_on(AntiqueImage, "antiques")
+invalidate_on(Category, "antiques")
+
+track_changes(Antique, fields=["slug", "seller_id"], previous=["seller_id"])
+track_changes(AntiqueImage, fields=["antique_id"])
+track_changes(Seller, fields=["slug"], previous=["slug"])
+
+
+@receiver(post_save, sender=AntiqueImage)
+@receiver(post_delete, sender=AntiqueImage)
+def touch_antique_on_image_change(sender, instance, **kwargs):
+    # Image changes count as a change to the antique (ETags, caches)
+    Antique.objects.filter(pk=instance.antique_id).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Wishlist.antiques.through)
+def touch_wishlist_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Adding/removing antiques doesn't save the wishlist row, so bump it here
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        pk_set = {instance.pk}
+    if pk_set:
+        Wishlist.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Wishlist.antiques.through)
+def record_wishlist_removals(sender, instance, action, reverse, pk_set, **kwargs):
+    # Removed pairs leave no row behind; the co-saved build needs them
+    if action == "pre_clear":
+        related = instance.wishlists if reverse else instance.antiques
+        pk_set = set(related.values_list("pk", flat=True))
+    elif action != "pre_remove":
+        return
+    if not pk_set:
+        return
+    if reverse:
+        users = Wishlist.objects.filter(pk__in=pk_set).values_list("user_id", flat=True)
+        pairs = {(user_id, instance.pk) for user_id in users}
+    else:
+        pairs = {(instance.user_id, antique_pk) for antique_pk in pk_set}
+    WishlistRemoval.objects.bulk_create(
+        WishlistRemoval(user_id=user_id, antique_id=antique_pk)
+        for user_id, antique_pk in pairs
+    )
+
+
+@receiver(pre_delete, sender=Wishlist)
+def record_deleted_wishlist(sender, instance, **kwargs):
+    WishlistRemoval.objects.bulk_create(
+        WishlistRemoval(user_id=instance.user_id, antique_id=antique_pk)
+        for antique_pk in instance.antiques.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_save, sender=Antique)
+def index_antique_suggestions(sender, instance, **kwargs):
+    suggestion_index.update_antique(instance)
+
+
+@receiver(post_save, sender=Antique)
+def index_antique_trigrams(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_antique(instance)
+
+
+@receiver(post_delete, sender=Antique)
+def unindex_antique_suggestions(sender, instance, **kwargs):
+    suggestion_index.remove_antique(instance.pk)
+
+
+@receiver(post_delete, sender=Antique)
+def record_antique_tombstone(sender, instance, **kwargs):
+    # Tells delta-sync clients (apps.antiques.sync) to drop the antique
+    AntiqueTombstone.objects.create(antique_id=instance.pk, slug=instance.slug)
+
+
+@receiver(post_save, sender=Seller)
+def reindex_seller_suggestions(sender, instance, **kwargs):
+    suggestion_index.update_seller(instance)
+
+
+@receiver(post_save, sender=Antique)
+def queue_saved_search_matching(sender, instance, created, raw=False, **kwargs):
+    # Matching runs in the process_saved_searches worker, not on this request
+    if created and not raw:
+        PercolationJob.objects.create(antique=instance)
+
+
+@receiver(post_save, sender=SavedSearch)
+def index_saved_search_terms(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_saved_search(instance)
+
+
+@receiver(pre_save, sender=Antique)
+def remember_previous_category(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._previous_category_id = None
+        return
+    instance._previous_category_id = (
+        Antique.objects.filter(pk=instance.pk)
+        .values_list("category_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Antique)
+def update_category_counts(sender, instance, raw=False, **kwargs):
+    if not raw:
+        previous = getattr(instance, "_previous_category_id", None)
+        recount_categories({previous, instance.category_id})
+
+
+@receiver(post_delete, sender=Antique)
+def update_category_counts_on_delete(sender, instance, **kwargs):
+    recount_categories({instance.category_id})
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_taxonomy(sender, instance, raw=False, **kwargs):
+    instance._previous_taxonomy = (
+        None
+        if raw or instance._state.adding
+        else Category.objects.filter(pk=instance.pk).values("name", "parent_id").first()
+    )
+
+
+@receiver(post_save, sender=Category)
+def propagate_category_change(sender, instance, raw=False, **kwargs):
+    """
+    Carry an admin rename or re-parent over to the antiques filed under the
+    category, which keep its name in type_of_antique. Both bump updated_at,
+    so ETags and delta sync pick the antiques up again.
+    """
+    previous = getattr(instance, "_previous_taxonomy", None)
+    if raw or previous is None:
+        return
+    renamed = previous["name"] != instance.name
+    if not renamed and previous["parent_id"] == instance.parent_id:
+        return
+    now = timezone.now()
+    if previous["parent_id"] != instance.parent_id:
+        # Ancestor filters now match the whole subtree differently; walk it
+        # here, the cached category_tree() may predate this transaction
+        subtree, level = set(), {instance.pk}
+        while level:
+            subtree |= level
+            level = (
+                set(
+                    Category.objects.filter(parent__in=level).values_list(
+                        "pk", flat=True
+                    )
+                )
+                - subtree
+            )
+        moved = Antique.objects.filter(category__in=subtree - {instance.pk})
+        moved.update(updated_at=now)
+        record_updates(moved)
+    antiques = Antique.objects.filter(category=instance)
+    antiques.update(type_of_antique=instance.name, updated_at=now)
+    record_updates(antiques)
+    if renamed:
+        reindex_antiques(antiques)
+        for antique in antiques.select_related("seller"):
+            suggestion_index.update_antique(antique)
+
+
+@receiver(m2m_changed, sender=Wishlist.antiques.through)
+def count_wishlist_adds(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        # antique.wishlists.add(...): one antique added to several wishlists
+        counter_buffer.record_save(instance.pk, len(pk_set))
+    else:
+        for antique_pk in pk_set:
+            counter_buffer.record_save(antique_pk)
+
+
+@consumer("storefront_snapshots", models=[Antique, AntiqueImage, Seller])
+def snapshot_storefronts(records):
+    """Queue the storefronts showing changed sellers, antiques and images."""
+    paths, gone, seller_ids, antique_ids = set(), set(), set(), set()
+    for record in records:
+        if record.model == Seller._meta.label_lower:
+            url = Seller(slug=record.data["slug"]).get_absolute_url()
+            (gone if record.action == "deleted" else paths).add(url)
+            if record.data.get("previous_slug"):
+                gone.add(Seller(slug=record.data["previous_slug"]).get_absolute_url())
+        elif record.model == Antique._meta.label_lower:
+            # A move to another seller changes both storefronts
+            seller_ids.add(record.data["seller_id"])
+            seller_ids.add(record.data.get("previous_seller_id"))
+        else:
+            antique_ids.add(record.data["antique_id"])
+    sellers = Seller.objects.filter(
+        Q(pk__in=seller_ids - {None}) | Q(antiques__in=antique_ids)
+    ).distinct()
+    paths.update(seller.get_absolute_url() for seller in sellers.only("slug"))
+    # Old URLs now 404; drop their snapshots without the debounce
+    queue_snapshot(*gone - paths, delay=0)
+    queue_snapshot(*paths)
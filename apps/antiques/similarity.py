@@ -0,0 +1,221 @@
+"""
+"Similar antiques" from TF-IDF cosine similarity.
+
+build_similar_antiques() (run by the build_similar_antiques command):
+
+1. Vectorizes every antique's title, description, content and type into an
+   L2-normalized TF-IDF SciPy sparse matrix (sublinear tf, smoothed idf).
+2. Multiplies blocks of rows against the unsold antiques (one sparse
+   matrix product per block) and keeps each row's top SIMILAR_ANTIQUES_COUNT
+   neighbours with argpartition.
+3. Stores them in SimilarAntique, so the detail page needs one indexed
+   lookup.
+
+Runs are incremental: an antique is recomputed when the digest of its text
+(and sold flag) differs from its SimilarityFingerprint, or when a changed
+antique was one of its neighbours or now scores above its weakest one.
+Document frequencies drift as the catalog changes, so a periodic --full run
+recomputes everything.
+
+NumPy and SciPy are only needed by this job, not by the web processes.
+"""
+
+import hashlib
+from array import array
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+from scipy import sparse
+
+from .models import Antique, BuildRun, SimilarAntique, SimilarityFingerprint
+from .models.trigram import WORD_RE
+
+# Term counts are multiplied by these, so title and type words weigh more
+FIELD_WEIGHTS = {
+    "title": 2,
+    "type_of_antique": 2,
+    "description": 1,
+    "content": 1,
+}
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the "
+    "this to was were with".split()
+)
+
+
+def tokens(text):
+    return [
+        word
+        for word in WORD_RE.findall((text or "").lower())
+        if len(word) > 1 and word not in STOP_WORDS
+    ]
+
+
+def vectorize(chunk_size=2000):
+    """
+    (ids, sold, digests, matrix): antique pks, a boolean sold array, text
+    digests and the L2-normalized TF-IDF matrix with one row per antique.
+    """
+    ids, digests, sold = [], [], []
+    vocabulary = {}
+    rows, cols, counts = array("i"), array("i"), array("f")
+
+    queryset = Antique.objects.order_by("pk").values_list(
+        "pk", "is_sold", *FIELD_WEIGHTS
+    )
+    for row, (pk, is_sold, *texts) in enumerate(
+        queryset.iterator(chunk_size=chunk_size)
+    ):
+        ids.append(pk)
+        sold.append(is_sold)
+        digest = hashlib.md5(str(is_sold).encode())
+        for text, weight in zip(texts, FIELD_WEIGHTS.values()):
+            digest.update(b"\x1f" + (text or "").encode())
+            for word in tokens(text):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+                counts.append(weight)
+        digests.append(digest.hexdigest())
+
+    n = len(ids)
+    matrix = sparse.csr_matrix(
+        (
+            np.frombuffer(counts, dtype=np.float32),
+            (np.frombuffer(rows, dtype=np.int32), np.frombuffer(cols, dtype=np.int32)),
+        ),
+        shape=(n, len(vocabulary)),
+        dtype=np.float32,
+    )
+    matrix.sum_duplicates()  # (row, col) pairs -> weighted term counts
+
+    matrix.data = 1 + np.log(matrix.data)
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+    matrix.data *= idf[matrix.indices].astype(np.float32)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+    return ids, np.array(sold, dtype=bool), digests, matrix
+
+
+def top_neighbours(scores, self_column, count, min_score):
+    """(columns, scores) of the best `count` entries of one sparse result row."""
+    columns, values = scores
+    keep = (values >= min_score) & (columns != self_column)
+    columns, values = columns[keep], values[keep]
+    if len(values) > count:
+        best = np.argpartition(-values, count)[:count]
+        columns, values = columns[best], values[best]
+    order = np.argsort(-values, kind="stable")
+    return columns[order], values[order]
+
+
+def affected_rows(ids, sold, matrix, changed, count, min_score, block_size):
+    """
+    Rows to recompute besides the changed ones: those listing a changed
+    antique, and those a changed unsold antique now beats the weakest
+    neighbour of (or fills up, when they have fewer than `count`).
+    """
+    index_of = {pk: row for row, pk in enumerate(ids)}
+    changed_pks = [ids[row] for row in changed]
+    affected = set()
+    for start in range(0, len(changed_pks), block_size):
+        listing = SimilarAntique.objects.filter(
+            similar__in=changed_pks[start : start + block_size]
+        ).values_list("antique_id", flat=True)
+        affected.update(index_of[pk] for pk in listing if pk in index_of)
+
+    weakest = np.full(len(ids), min_score, dtype=np.float32)
+    full_lists = (
+        SimilarAntique.objects.order_by()
+        .values("antique")
+        .annotate(entries=Count("pk"), low=Min("score"))
+        .filter(entries__gte=count)
+        .values_list("antique", "low")
+    )
+    for pk, low in full_lists.iterator():
+        if pk in index_of:
+            weakest[index_of[pk]] = low
+
+    candidates = [row for row in changed if not sold[row]]
+    for start in range(0, len(candidates), block_size):
+        block = matrix[candidates[start : start + block_size]]
+        best = (matrix @ block.T).max(axis=1).toarray().ravel()
+        affected.update(np.flatnonzero(best > weakest).tolist())
+    return affected
+
+
+def build_similar_antiques(full=False, count=None, block_size=None, min_score=None):
+    """
+    Bring SimilarAntique up to date. Returns (antiques recomputed, total).
+    """
+    count = count or settings.SIMILAR_ANTIQUES_COUNT
+    block_size = block_size or settings.SIMILAR_ANTIQUES_BLOCK_SIZE
+    min_score = settings.SIMILAR_ANTIQUES_MIN_SCORE if min_score is None else min_score
+    started = timezone.now()
+
+    ids, sold, digests, matrix = vectorize()
+    if full:
+        changed = list(range(len(ids)))
+    else:
+        stored = dict(SimilarityFingerprint.objects.values_list("antique_id", "digest"))
+        changed = [row for row, pk in enumerate(ids) if stored.get(pk) != digests[row]]
+    if not changed:
+        return 0, len(ids)
+
+    rows = set(changed)
+    if not full:
+        rows |= affected_rows(ids, sold, matrix, changed, count, min_score, block_size)
+    rows = sorted(rows)
+
+    # Neighbours are unsold antiques only; self_column excludes the row itself
+    unsold = np.flatnonzero(~sold)
+    candidates = matrix[unsold].T.tocsr()
+    self_column = np.full(len(ids), -1, dtype=np.int64)
+    self_column[unsold] = np.arange(len(unsold))
+
+    changed = set(changed)
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        scores = (matrix[block] @ candidates).tocsr()
+        entries = []
+        for offset, row in enumerate(block):
+            span = slice(scores.indptr[offset], scores.indptr[offset + 1])
+            columns, values = top_neighbours(
+                (scores.indices[span], scores.data[span]),
+                self_column[row],
+                count,
+                min_score,
+            )
+            entries.extend(
+                SimilarAntique(
+                    antique_id=ids[row],
+                    similar_id=ids[unsold[column]],
+                    rank=rank,
+                    score=float(value),
+                )
+                for rank, (column, value) in enumerate(zip(columns, values))
+            )
+        with transaction.atomic():
+            SimilarAntique.objects.filter(
+                antique_id__in=[ids[row] for row in block]
+            ).delete()
+            SimilarAntique.objects.bulk_create(entries)
+            SimilarityFingerprint.objects.bulk_create(
+                [
+                    SimilarityFingerprint(antique_id=ids[row], digest=digests[row])
+                    for row in block
+                    if row in changed
+                ],
+                update_conflicts=True,
+                unique_fields=["antique"],
+                update_fields=["digest"],
+            )
+    # Only runs that rewrote neighbours: detail page ETags include this
+    BuildRun.record(BuildRun.SIMILAR, started)
+    return len(rows), len(ids)
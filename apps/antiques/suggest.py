@@ -0,0 +1,294 @@
+"""
+In-memory prefix index for search-as-you-type suggestions.
+
+Each process keeps sorted arrays of (key, entry id) pairs, where the keys are
+every word-start suffix of an entry's normalized label ("louis xv chair" is
+reachable from "louis", "xv" and "chair"). A lookup is a bisect to the first
+key >= the prefix followed by a forward scan of at most `limit` keys.
+
+Keys are split into tiers that are scanned in order, so the best matches are
+found first without ranking every hit:
+
+    0. types and store names matching from their first word
+    1. types and store names matching a later word
+    2. antique titles matching from their first word
+    3. antique titles matching a later word
+
+Types and store names within a tier are ordered by how many unsold antiques
+they cover; titles are alphabetical.
+
+The index is built from one projected query on the first lookup, which the
+other requests wait for, and then kept current by the signals in
+apps.antiques.signals. Other processes only see those updates when they
+rebuild, at most SUGGEST_INDEX_MAX_AGE seconds apart; a stale index keeps
+answering while one background thread rebuilds it.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+from django.utils.text import slugify
+
+from .models import Antique
+
+FACET_TIER = 0
+ANTIQUE_TIER = 2
+TIERS = 4
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation: "Château Rouge!" -> "chateau rouge"."""
+    return slugify(text or "").replace("-", " ")
+
+
+def _keys(label):
+    words = normalize(label).split()
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class SuggestionIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()  # one rebuild at a time
+        self._tiers = [[] for _ in range(TIERS)]  # sorted [(key, entry_id)]
+        self._entries = {}  # entry_id -> {"label", "kind", "url", "weight", ...}
+        self._antiques = {}  # antique pk -> (type name, seller pk)
+        self.built_at = None
+
+    # Queries
+
+    def suggest(self, prefix, limit=8):
+        """Return up to `limit` entries whose label has a word starting with prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_built()
+
+        found = []
+        seen = set()
+        with self._lock:
+            for tier, keys in enumerate(self._tiers):
+                # Facets are few and ranked by weight, so look at all of them
+                budget = len(keys) if tier < ANTIQUE_TIER else limit
+                matches = []
+                index = bisect_left(keys, (prefix,))
+                while index < len(keys) and len(matches) < budget:
+                    key, entry_id = keys[index]
+                    if not key.startswith(prefix):
+                        break
+                    if entry_id not in seen:
+                        seen.add(entry_id)
+                        matches.append(self._entries[entry_id])
+                    index += 1
+                if tier < ANTIQUE_TIER:
+                    matches.sort(key=lambda entry: -entry["weight"])
+                found.extend(matches)
+                if len(found) >= limit:
+                    break
+
+        return [
+            {"label": entry["label"], "kind": entry["kind"], "url": entry["url"]}
+            for entry in found[:limit]
+        ]
+
+    # Building
+
+    def _is_stale(self):
+        max_age = settings.SUGGEST_INDEX_MAX_AGE
+        return self.built_at is None or time.monotonic() - self.built_at > max_age
+
+    def _ensure_built(self):
+        if self.built_at is None:
+            # Nothing to serve yet: wait for whichever request builds first
+            with self._rebuild_lock:
+                if self.built_at is None:
+                    self.rebuild()
+        elif self._is_stale() and self._rebuild_lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._rebuild_in_background, name="suggest-rebuild", daemon=True
+            ).start()
+
+    def _rebuild_in_background(self):
+        try:
+            if self._is_stale():
+                self.rebuild()
+        finally:
+            self._rebuild_lock.release()
+            connections.close_all()
+
+    def rebuild(self):
+        rows = Antique.objects.filter(is_sold=False).values_list(
+            "pk",
+            "title",
+            "slug",
+            "type_of_antique",
+            "seller_id",
+            "seller__store_name",
+            "seller__slug",
+        )
+        tiers, entries, antiques = [[] for _ in range(TIERS)], {}, {}
+        antique_url = _antique_url_builder()
+        for pk, title, slug, type_name, seller_id, store_name, seller_slug in rows:
+            antiques[pk] = (type_name, seller_id)
+            _add(tiers, entries, ("antique", pk), title, antique_url(slug))
+            _add_ref(
+                tiers, entries, ("type", type_name), type_name, _type_url(type_name)
+            )
+            if seller_id:
+                _add_ref(
+                    tiers,
+                    entries,
+                    ("seller", seller_id),
+                    store_name,
+                    _seller_url(seller_slug),
+                )
+        for keys in tiers:
+            keys.sort()
+
+        with self._lock:
+            self._tiers, self._entries, self._antiques = tiers, entries, antiques
+            self.built_at = time.monotonic()
+
+    # Incremental updates (called from signals)
+
+    def update_antique(self, antique):
+        if self.built_at is None:
+            return
+        with self._lock:
+            self._remove_antique(antique.pk)
+            if antique.is_sold:
+                return
+            seller = antique.seller
+            self._antiques[antique.pk] = (antique.type_of_antique, antique.seller_id)
+            _add(
+                self._tiers,
+                self._entries,
+                ("antique", antique.pk),
+                antique.title,
+                reverse("antiques:antique-detail", args=[antique.slug]),
+                insert=True,
+            )
+            _add_ref(
+                self._tiers,
+                self._entries,
+                ("type", antique.type_of_antique),
+                antique.type_of_antique,
+                _type_url(antique.type_of_antique),
+                insert=True,
+            )
+            if seller is not None:
+                _add_ref(
+                    self._tiers,
+                    self._entries,
+                    ("seller", seller.pk),
+                    seller.store_name,
+                    _seller_url(seller.slug),
+                    insert=True,
+                )
+
+    def remove_antique(self, pk):
+        if self.built_at is None:
+            return
+        with self._lock:
+            self._remove_antique(pk)
+
+    def update_seller(self, seller):
+        if self.built_at is None:
+            return
+        entry_id = ("seller", seller.pk)
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None or entry["label"] == seller.store_name:
+                return
+            _drop(self._tiers, self._entries, entry_id)
+            _add(
+                self._tiers,
+                self._entries,
+                entry_id,
+                seller.store_name,
+                _seller_url(seller.slug),
+                insert=True,
+                weight=entry["weight"],
+            )
+
+    # Internals (caller holds self._lock)
+
+    def _remove_antique(self, pk):
+        previous = self._antiques.pop(pk, None)
+        if previous is None:
+            return
+        type_name, seller_id = previous
+        _drop(self._tiers, self._entries, ("antique", pk))
+        _release_ref(self._tiers, self._entries, ("type", type_name))
+        if seller_id:
+            _release_ref(self._tiers, self._entries, ("seller", seller_id))
+
+
+def _add(tiers, entries, entry_id, label, url, insert=False, weight=1):
+    kind = entry_id[0]
+    leading = normalize(label)
+    if not leading:
+        return
+    base = ANTIQUE_TIER if kind == "antique" else FACET_TIER
+    entries[entry_id] = {
+        "label": label,
+        "kind": kind,
+        "url": url,
+        "weight": weight,
+        "keys": [(base if key == leading else base + 1, key) for key in _keys(label)],
+    }
+    for tier, key in entries[entry_id]["keys"]:
+        if insert:
+            insort(tiers[tier], (key, entry_id))
+        else:
+            tiers[tier].append((key, entry_id))
+
+
+def _add_ref(tiers, entries, entry_id, label, url, insert=False):
+    # Types and stores are shared by many antiques; weight is the count
+    if entry_id in entries:
+        entries[entry_id]["weight"] += 1
+    else:
+        _add(tiers, entries, entry_id, label, url, insert)
+
+
+def _release_ref(tiers, entries, entry_id):
+    entry = entries.get(entry_id)
+    if entry is None:
+        return
+    entry["weight"] -= 1
+    if entry["weight"] <= 0:
+        _drop(tiers, entries, entry_id)
+
+
+def _drop(tiers, entries, entry_id):
+    entry = entries.pop(entry_id, None)
+    if entry is None:
+        return
+    for tier, key in entry["keys"]:
+        keys = tiers[tier]
+        index = bisect_left(keys, (key, entry_id))
+        if index < len(keys) and keys[index] == (key, entry_id):
+            del keys[index]
+
+
+def _antique_url_builder():
+    """slug -> detail URL, with reverse() run once instead of once per antique."""
+    head, _, tail = reverse("antiques:antique-detail", args=["slug"]).rpartition("slug")
+    return lambda slug: f"{head}{slug}{tail}"
+
+
+def _type_url(type_name):
+    return f"{reverse('antiques:antique-list')}?{urlencode({'type': type_name})}"
+
+
+def _seller_url(seller_slug):
+    return reverse("sellers:seller-detail", args=[seller_slug])
+
+
+suggestion_index = SuggestionIndex()
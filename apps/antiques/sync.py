@@ -0,0 +1,176 @@
+"""
+Delta sync of the catalog for partner feeds and the mobile client.
+
+Clients keep a copy of the catalog and ask for what changed since their
+last watermark. Changes are antiques ordered by (updated_at, id) plus
+AntiqueTombstone rows for deleted antiques, ordered the same way by
+(deleted_at, antique_id); both are keyset scans of an index, so a sync
+reads only the rows that changed. The watermark is an opaque cursor
+holding the (timestamp, id) of the last change returned. Passing it back
+continues a long first sync page by page and later picks up new changes.
+
+updated_at is set when save() runs, not when its transaction commits, so a
+row can become visible with an updated_at older than rows a client has
+already synced past. Only changes older than CATALOG_SYNC_LAG seconds are
+returned, so the lag must exceed the longest transaction that writes
+antiques. The create view's transaction includes image uploads and two
+Stripe calls, each bounded by STRIPE_TIMEOUT; the 300 second default
+covers that with room to spare. Lowering the lag, or adding slower work
+to those transactions, can make clients miss changes.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from itertools import islice
+from uuid import UUID
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.core.pagination import decode_cursor, encode_cursor, keyset_filter
+
+from .models import Antique, AntiqueImage, AntiqueTombstone
+
+# Field name in the API -> values() lookup
+FIELDS = {
+    "slug": "slug",
+    "title": "title",
+    "description": "description",
+    "content": "content",
+    "price": "price",
+    "is_sold": "is_sold",
+    "quantity": "quantity",
+    "type_of_antique": "type_of_antique",
+    "dimensions": "dimensions",
+    "additional_info": "additional_info",
+    "created_at": "created_at",
+    "category": "category__slug",
+    "seller": "seller__slug",
+}
+# Computed per page: detail page path and primary image URL
+EXTRA_FIELDS = {"url", "image"}
+DEFAULT_FIELDS = ["slug", "title", "price", "is_sold", "quantity", "category", "seller"]
+
+ORDERING = ["updated_at", "id"]
+TOMBSTONE_ORDERING = ["deleted_at", "antique_id"]
+
+
+def parse_fields(value):
+    """Known field names from a comma-separated list, or DEFAULT_FIELDS."""
+    names = [name.strip() for name in (value or "").split(",")]
+    names = [name for name in names if name in FIELDS or name in EXTRA_FIELDS]
+    return list(dict.fromkeys(names)) or DEFAULT_FIELDS
+
+
+def parse_watermark(value):
+    """
+    (timestamp, id) to sync from: a watermark from a previous response or,
+    for a first sync that skips old listings, an ISO 8601 datetime. None
+    for a full sync; ValueError if it is neither.
+    """
+    if not value:
+        return None
+    try:
+        values = decode_cursor(value)
+    except ValueError:
+        values = None
+    if values is not None:
+        if (
+            len(values) != 2
+            or not isinstance(values[0], datetime)
+            or timezone.is_naive(values[0])
+            or not isinstance(values[1], UUID)
+        ):
+            raise ValueError("Invalid watermark")
+        return tuple(values)
+    since = parse_datetime(value)
+    if since is None:
+        raise ValueError("Invalid watermark")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, dt_timezone.utc)
+    # The nil UUID sorts first, so changes at exactly `since` are included
+    return since, UUID(int=0)
+
+
+def _primary_image_urls(antique_ids):
+    storage = AntiqueImage._meta.get_field("image").storage
+    names = {}
+    for antique_id, name in (
+        AntiqueImage.objects.filter(antique_id__in=antique_ids)
+        .order_by("antique_id", "pk")
+        .values_list("antique_id", "image")
+    ):
+        names.setdefault(antique_id, name)
+    return {antique_id: storage.url(name) for antique_id, name in names.items()}
+
+
+def changes(since=None, fields=None, limit=500):
+    """
+    Up to limit changes after since (see parse_watermark), oldest first.
+    Returns (changes, watermark, has_more): live antiques as
+    {"id", "updated_at", <fields>}, deleted ones as
+    {"id", "updated_at", "slug", "deleted": True}. The watermark is None
+    only when nothing has ever changed.
+    """
+    fields = fields or DEFAULT_FIELDS
+    horizon = timezone.now() - timedelta(seconds=settings.CATALOG_SYNC_LAG)
+    antiques = Antique.objects.filter(updated_at__lt=horizon)
+    tombstones = AntiqueTombstone.objects.filter(deleted_at__lt=horizon)
+    if since:
+        antiques = antiques.filter(keyset_filter(ORDERING, since))
+        tombstones = tombstones.filter(keyset_filter(TOMBSTONE_ORDERING, since))
+
+    lookups = {FIELDS[name] for name in fields if name in FIELDS}
+    if "url" in fields:
+        lookups.add("slug")
+    updated = antiques.order_by(*ORDERING).values("id", "updated_at", *lookups)
+    deleted = tombstones.order_by(*TOMBSTONE_ORDERING).values_list(
+        "deleted_at", "antique_id", "slug"
+    )
+    # Each query is one index range scan of at most limit + 1 rows
+    merged = list(
+        islice(
+            heapq.merge(
+                ((row["updated_at"], row["id"], row) for row in updated[: limit + 1]),
+                (
+                    (deleted_at, antique_id, {"slug": slug})
+                    for deleted_at, antique_id, slug in deleted[: limit + 1]
+                ),
+                key=lambda change: change[:2],
+            ),
+            limit + 1,
+        )
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    images = {}
+    if "image" in fields:
+        images = _primary_image_urls(
+            [pk for _, pk, row in merged if "updated_at" in row]
+        )
+    results = []
+    for timestamp, pk, row in merged:
+        change = {"id": pk, "updated_at": timestamp}
+        if "updated_at" not in row:
+            change.update(slug=row["slug"], deleted=True)
+        else:
+            for name in fields:
+                if name == "url":
+                    change[name] = reverse(
+                        "antiques:antique-detail", kwargs={"slug": row["slug"]}
+                    )
+                elif name == "image":
+                    change[name] = images.get(pk)
+                else:
+                    change[name] = row[FIELDS[name]]
+        results.append(change)
+
+    if merged:
+        watermark = encode_cursor(merged[-1][:2])
+    else:
+        watermark = encode_cursor(since) if since else None
+    return results, watermark, has_more
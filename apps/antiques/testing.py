@@ -0,0 +1,29 @@
+"""Test fixtures shared by the apps' test modules."""
+
+from .models import Antique
+
+
+def make_antiques(user, n, **fields):
+    """
+    Create n antiques for user in one query: "Antique <i>" at slug
+    "antique-<i>", price 0, unless fields say otherwise. A callable field
+    value is called with i. bulk_create skips the Stripe product signal.
+    """
+    defaults = {
+        "title": lambda i: f"Antique {i}",
+        "slug": lambda i: f"antique-{i}",
+        "price": 0,
+    }
+    fields = {**defaults, **fields}
+    return Antique.objects.bulk_create(
+        [
+            Antique(
+                user=user,
+                **{
+                    name: value(i) if callable(value) else value
+                    for name, value in fields.items()
+                },
+            )
+            for i in range(n)
+        ]
+    )
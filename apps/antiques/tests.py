@@ -1,3 +1,621 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import ChangeRecord
+from apps.core.pagination import cursor_page, encode_cursor, keyset_filter
+from apps.sellers.models import Seller
+
+from .alerts import matching_searches, percolate, send_digests
+
+from .caches import catalog_cache
+from .categories import (
+    category_tree,
+    cluster_names,
+    get_or_create_category,
+    recount_categories,
+)
+from .cosaved import build_cosaved_antiques
+from .forms import AntiqueForm, SavedSearchForm
+from .history import HistoryBuffer, load_lists, merge
+from .models import (
+    Antique,
+    AntiqueTombstone,
+    AntiqueTrigram,
+    BuildRun,
+    Category,
+    CoSavedAntique,
+    PercolationJob,
+    RecentlyViewed,
+    SavedSearch,
+    SavedSearchMatch,
+    Wishlist,
+    WishlistRemoval,
+)
+from .prices import price_histogram
+from .search import fuzzy_search_ids, rebuild_trigram_index, shortlist
+from .suggest import SuggestionIndex
+from .testing import make_antiques
+from .views import AntiqueListView
+
+
+class AntiqueListSortTests(TestCase):
+    """Every whitelisted sort is served by an index, never a sort step."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        # Quantity 0 marks some sold
+        make_antiques(
+            user,
+            60,
+            quantity=lambda i: i % 3,
+            is_sold=lambda i: i % 3 == 0,
+            view_count=lambda i: i % 7,
+        )
+
+    def list_queryset(self, sort):
+        view = AntiqueListView()
+        view.setup(RequestFactory().get("/antiques/", {"sort": sort}))
+        return view.get_queryset()
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == "sqlite":
+            self.assertIn("USING INDEX", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+        elif connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+            plan = queryset.explain()
+            self.assertNotIn("Sort  (", plan)
+        else:
+            self.skipTest(f"No plan assertions for {connection.vendor}")
+
+    def test_each_sort_page_uses_an_index(self):
+        for sort in AntiqueListView.sort_options:
+            with self.subTest(sort=sort):
+                self.assertUsesIndex(self.list_queryset(sort)[:20])
+
+    def test_each_sort_cursor_page_uses_an_index(self):
+        for sort, (_, ordering) in AntiqueListView.sort_options.items():
+            with self.subTest(sort=sort):
+                first = self.list_queryset(sort).first()
+                values = [getattr(first, field.lstrip("-")) for field in ordering]
+                queryset = self.list_queryset(sort).filter(
+                    keyset_filter(ordering, values)
+                )
+                self.assertUsesIndex(queryset[:20])
+
+    def test_unknown_sort_falls_back_to_newest(self):
+        self.assertEqual(
+            self.list_queryset("title; DROP TABLE").query.order_by,
+            ("-created_at", "-id"),
+        )
+
+    def test_cursor_pages_cover_the_list_once(self):
+        for sort, (_, ordering) in AntiqueListView.sort_options.items():
+            with self.subTest(sort=sort):
+                seen, cursor = [], None
+                while True:
+                    page, cursor = cursor_page(
+                        self.list_queryset(sort), ordering, cursor, per_page=7
+                    )
+                    seen.extend(antique.pk for antique in page)
+                    if cursor is None:
+                        break
+                self.assertEqual(
+                    seen, list(self.list_queryset(sort).values_list("pk", flat=True))
+                )
+
+
+@override_settings(PRICE_HISTOGRAM_EDGES=[0, 25, 50, 100])
+class PriceFilterTests(TestCase):
+    """Price range filter and its histogram."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        prices = ["10", "30", "30", "49.99", "75", "2500"]
+        make_antiques(user, len(prices), price=lambda i: prices[i])
+
+    def setUp(self):
+        catalog_cache.clear()
+
+    def list_view(self, **params):
+        view = AntiqueListView()
+        view.setup(RequestFactory().get("/antiques/", params))
+        return view
+
+    def test_range_filters_inclusive(self):
+        prices = self.list_view(min_price="30", max_price="75").get_queryset()
+        self.assertEqual(
+            sorted(prices.values_list("price", flat=True)),
+            [Decimal("30"), Decimal("30"), Decimal("49.99"), Decimal("75")],
+        )
+
+    def test_invalid_and_reversed_bounds(self):
+        self.assertEqual(
+            self.list_view(min_price="cheap", max_price="-5").get_price_range(),
+            (None, None),
+        )
+        self.assertEqual(
+            self.list_view(min_price="75", max_price="30").get_price_range(),
+            (Decimal("30"), Decimal("75")),
+        )
+
+    def test_histogram_is_one_grouped_query_then_cached(self):
+        with self.assertNumQueries(1):
+            histogram = price_histogram(Antique.objects.all(), "all")
+        self.assertEqual([bucket["count"] for bucket in histogram], [1, 3, 1, 1])
+        self.assertEqual(
+            [(bucket["min"], bucket["max"]) for bucket in histogram],
+            [(0, 25), (25, 50), (50, 100), (100, None)],
+        )
+        with self.assertNumQueries(0):
+            price_histogram(Antique.objects.all(), "all")
+
+    def test_histogram_ignores_the_price_filter(self):
+        view = self.list_view(min_price="30", max_price="40")
+        self.assertEqual(view.get_facets_key(), self.list_view().get_facets_key())
+        histogram = price_histogram(view.get_facet_queryset(), view.get_facets_key())
+        self.assertEqual(sum(bucket["count"] for bucket in histogram), 6)
+
+    def test_etag_covers_antiques_outside_the_price_range(self):
+        url = reverse("antiques:antique-list")
+        params = {"min_price": "30", "max_price": "40"}
+        etag = self.client.get(url, params)["ETag"]
+        Antique.objects.filter(price=2500).update(is_sold=True)
+        self.assertNotEqual(self.client.get(url, params)["ETag"], etag)
+
+
+class SuggestionIndexTests(TestCase):
+    """Prefix suggestions from the in-process index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        make_antiques(user, 1, title="Louis XV chair", slug="louis-xv-chair")
+
+    def test_first_lookup_builds_once(self):
+        index = SuggestionIndex()
+        with self.assertNumQueries(1):
+            suggestions = index.suggest("xv")
+            index.suggest("chair")
+        self.assertEqual(
+            suggestions,
+            [
+                {
+                    "label": "Louis XV chair",
+                    "kind": "antique",
+                    "url": reverse("antiques:antique-detail", args=["louis-xv-chair"]),
+                }
+            ],
+        )
+
+
+@override_settings(FUZZY_SEARCH_MIN_OVERLAP=0.3, FUZZY_SEARCH_MIN_SCORE=75)
+class FuzzySearchTests(TestCase):
+    """Trigram shortlist and typo-tolerant matching without pg_trgm."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        titles = ["Walnut bureau", "Oak chest", "Soaking tub", *["Oak chair"] * 10]
+        cls.antiques = make_antiques(
+            user, len(titles), title=lambda i: titles[i], type_of_antique="Misc"
+        )
+        rebuild_trigram_index()
+
+    def titles(self, rows):
+        return sorted(title for _, title, _ in rows)
+
+    def test_typos_match(self):
+        self.assertEqual(fuzzy_search_ids("walnut bureu"), [self.antiques[0].pk])
+        self.assertEqual(fuzzy_search_ids("walnt bureau"), [self.antiques[0].pk])
+
+    def test_overlap_threshold(self):
+        # "Soaking" shares only "oak" with the query, under the 2 required
+        self.assertNotIn("Soaking tub", self.titles(shortlist("oak", 50)))
+        self.assertIn("Oak chest", self.titles(shortlist("oak", 50)))
+        with self.settings(FUZZY_SEARCH_MIN_OVERLAP=0.9):
+            self.assertEqual(self.titles(shortlist("oak chst", 50)), [])
+
+    @override_settings(FUZZY_SEARCH_MAX_POSTINGS=3)
+    def test_common_trigrams_only_count_for_rarer_candidates(self):
+        # 8 trigram reads, the common-trigram count and the final fetch
+        with self.assertNumQueries(10):
+            self.assertEqual(self.titles(shortlist("oak chest", 50)), ["Oak chest"])
+        # Nothing rarer to go on: at most MAX_POSTINGS candidates
+        found = self.titles(shortlist("oak chair", 50))
+        self.assertTrue(0 < len(found) <= 3)
+        self.assertEqual(set(found), {"Oak chair"})
+
+
+class AntiqueDetailETagTests(TestCase):
+    """Detail page revalidation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        make_antiques(user, 1, title="Oak chest", slug="oak-chest")
+
+    def test_etag_changes_when_neighbours_are_rebuilt(self):
+        url = reverse("antiques:antique-detail", args=["oak-chest"])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url)["ETag"], etag)
+        BuildRun.record(BuildRun.SIMILAR, timezone.now())
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+
+@override_settings(RECENTLY_VIEWED_MAX=3, RECENTLY_VIEWED_FLUSH_INTERVAL=3600)
+class RecentlyViewedTests(TestCase):
+    """Buffered per-user history, written once per flush."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("collector", "c@example.com", "password")
+
+    def setUp(self):
+        cache.clear()
+        self.buffer = HistoryBuffer()
+
+    def test_merge_dedupes_and_caps(self):
+        self.assertEqual(merge(["b", "a"], ["c", "b", "d"], 3), ["b", "a", "c"])
+
+    def test_views_are_buffered_until_flush(self):
+        with self.assertNumQueries(0):
+            for slug in ["a", "b", "a", "c", "d"]:
+                self.buffer.record(self.user.pk, slug)
+        self.assertEqual(self.buffer.pending_for(self.user.pk), ["d", "c", "a"])
+        self.assertFalse(RecentlyViewed.objects.exists())
+
+        self.buffer.flush()
+        self.buffer.record(self.user.pk, "e")
+        self.buffer.flush()
+        self.assertEqual(load_lists([self.user.pk])[self.user.pk], ["e", "d", "c"])
+        self.assertEqual(
+            RecentlyViewed.objects.get(user=self.user).slugs, ["e", "d", "c"]
+        )
+
+    def test_lists_are_restored_from_the_table(self):
+        self.buffer.record(self.user.pk, "a")
+        self.buffer.flush()
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(load_lists([self.user.pk])[self.user.pk], ["a"])
+        with self.assertNumQueries(0):
+            load_lists([self.user.pk])
+
+
+@override_settings(WISHLIST_COSAVED_MIN_COUNT=2)
+class CoSavedBuildTests(TestCase):
+    """Incremental co-saved builds see every change that affects a pair."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.u1 = User.objects.create_user("u1", "u1@example.com", "password")
+        cls.u2 = User.objects.create_user("u2", "u2@example.com", "password")
+        seller = User.objects.create_user("seller", "seller@example.com", "password")
+        cls.x, cls.y, cls.z = make_antiques(
+            seller, 3, slug=lambda i: "xyz"[i], title=lambda i: "xyz"[i]
+        )
+
+    def setUp(self):
+        self.first = Wishlist.objects.create(user=self.u1, title="First")
+        self.second = Wishlist.objects.create(user=self.u1, title="Second")
+        self.other = Wishlist.objects.create(user=self.u2, title="Other")
+        self.first.antiques.add(self.x)
+        self.second.antiques.add(self.y)
+        self.other.antiques.add(self.x, self.y, self.z)
+        build_cosaved_antiques(full=True)
+
+    def neighbours(self, antique):
+        return list(
+            CoSavedAntique.objects.filter(antique=antique).values_list(
+                "other__slug", flat=True
+            )
+        )
+
+    def test_change_to_one_wishlist_recomputes_the_users_other_wishlists(self):
+        self.assertEqual(self.neighbours(self.y), ["x"])
+        # y (in u1's untouched second wishlist) is now saved with z twice
+        self.first.antiques.add(self.z)
+        build_cosaved_antiques()
+        self.assertEqual(sorted(self.neighbours(self.y)), ["x", "z"])
+
+    def test_removed_antiques_are_recomputed(self):
+        self.other.antiques.remove(self.y)
+        build_cosaved_antiques()
+        self.assertEqual(self.neighbours(self.y), [])
+        self.assertEqual(self.neighbours(self.x), [])
+        self.assertFalse(WishlistRemoval.objects.exists())
+
+    def test_deleted_wishlists_count_as_removals(self):
+        self.second.delete()
+        build_cosaved_antiques()
+        self.assertEqual(self.neighbours(self.y), [])
+
+
+class CategoryTests(TestCase):
+    """Taxonomy clustering, counts and admin edits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("seller", "seller@example.com", "password")
+        cls.furniture = Category.objects.create(name="Furniture")
+        cls.chairs = Category.objects.create(name="Chairs", parent=cls.furniture)
+        cls.clocks = Category.objects.create(name="Clocks")
+
+    def setUp(self):
+        catalog_cache.clear()
+
+    def file(self, category, n, **fields):
+        antiques = make_antiques(
+            self.user,
+            n,
+            category=category,
+            type_of_antique=category.name,
+            slug=lambda i: f"{category.slug}-{i}",
+            **fields,
+        )
+        recount_categories({category.pk})
+        return antiques
+
+    def test_cluster_names_folds_case_spacing_and_typos(self):
+        mapping = cluster_names(
+            {"Furniture": 5, "furniture ": 2, "Furnture": 1, "Clocks": 3, " ": 4}
+        )
+        self.assertEqual(
+            mapping,
+            {
+                "Furniture": "Furniture",
+                "furniture ": "Furniture",
+                "Furnture": "Furniture",
+                "Clocks": "Clocks",
+            },
+        )
+
+    def test_near_duplicate_names_reuse_the_category(self):
+        self.assertEqual(get_or_create_category("  furnture "), self.furniture)
+        lamps = get_or_create_category("Oil  lamps")
+        self.assertEqual((lamps.name, lamps.slug), ("Oil lamps", "oil-lamps"))
+        self.assertEqual(Category.objects.count(), 4)
+
+    def test_counts_skip_sold_antiques_and_roll_up(self):
+        self.file(self.chairs, 3)
+        self.file(self.furniture, 1)
+        Antique.objects.filter(slug="chairs-0").update(is_sold=True)
+        recount_categories({self.chairs.pk, self.furniture.pk})
+        self.chairs.refresh_from_db()
+        self.assertEqual(self.chairs.antique_count, 2)
+        tree = {node["name"]: node for node in category_tree()}
+        self.assertEqual(tree["Furniture"]["count"], 3)
+        self.assertEqual(tree["Chairs"]["label"], "— Chairs")
+        self.assertEqual(
+            sorted(tree["Furniture"]["ids"]), [self.furniture.pk, self.chairs.pk]
+        )
+        self.assertEqual(tree["Clocks"]["count"], 0)
+
+    def test_rename_reaches_antiques_and_search_indexes(self):
+        antique = self.file(self.chairs, 1)[0]
+        Antique.objects.filter(pk=antique.pk).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+        index = SuggestionIndex()
+        with patch("apps.antiques.signals.suggestion_index", index):
+            index.suggest("chairs")
+            self.chairs.name = "Seating"
+            self.chairs.save()
+        antique.refresh_from_db()
+        self.assertEqual(antique.type_of_antique, "Seating")
+        self.assertGreater(antique.updated_at, timezone.now() - timedelta(minutes=1))
+        self.assertTrue(
+            AntiqueTrigram.objects.filter(antique=antique, trigram="sea").exists()
+        )
+        self.assertIn("Seating", [s["label"] for s in index.suggest("seat")])
+        self.assertTrue(
+            ChangeRecord.objects.filter(
+                object_id=str(antique.pk), action="updated"
+            ).exists()
+        )
+
+    def test_reparent_bumps_the_subtree(self):
+        antique = self.file(self.chairs, 1)[0]
+        stale = timezone.now() - timedelta(days=1)
+        Antique.objects.filter(pk=antique.pk).update(updated_at=stale)
+        self.furniture.parent = self.clocks
+        self.furniture.save()
+        antique.refresh_from_db()
+        self.assertGreater(antique.updated_at, stale)
+        self.assertEqual(antique.type_of_antique, "Chairs")
+
+    def test_form_without_commit_creates_the_category_on_save_m2m(self):
+        form = AntiqueForm(
+            data={
+                "title": "Carriage clock",
+                "description": "Brass",
+                "content": "Brass carriage clock",
+                "price": "0",
+                "new_category": "Carriage clocks",
+                "quantity": "1",
+            }
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        antique = form.save(commit=False)
+        self.assertFalse(Category.objects.filter(name="Carriage clocks").exists())
+        antique.user = self.user
+        antique.save()
+        form.save_m2m()
+        antique.refresh_from_db()
+        self.assertEqual(antique.category.name, "Carriage clocks")
+        self.assertEqual(antique.type_of_antique, "Carriage clocks")
+
+
+class SavedSearchAlertTests(TestCase):
+    """New listings percolate into saved searches and go out as digests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create_user("buyer", "buyer@example.com", "password")
+        seller_user = User.objects.create_user(
+            "seller", "seller@example.com", "password"
+        )
+        cls.seller = Seller.objects.create(user=seller_user, store_name="Shop")
+        cls.chair, cls.sold = make_antiques(
+            seller_user,
+            2,
+            title="Victorian oak chair",
+            type_of_antique="Chair",
+            price=Decimal("100"),
+            seller=cls.seller,
+            is_sold=lambda i: i == 1,
+        )
+        searches = {
+            "oak chair": {"query": "oak chair"},
+            "chairs 50-150": {
+                "type_of_antique": "chair",
+                "min_price": Decimal("50"),
+                "max_price": Decimal("150"),
+            },
+            "everything": {},
+            "oak table": {"query": "oak table"},
+            "under 50": {"max_price": Decimal("50")},
+            "paused": {"is_active": False},
+        }
+        cls.searches = {
+            title: SavedSearch.objects.create(user=cls.buyer, title=title, **fields)
+            for title, fields in searches.items()
+        }
+        # A seller isn't alerted about their own listings
+        SavedSearch.objects.create(user=seller_user, title="mine", query="chair")
+
+    def matched_titles(self, antique):
+        return sorted(
+            SavedSearch.objects.filter(pk__in=matching_searches(antique)).values_list(
+                "title", flat=True
+            )
+        )
+
+    def test_matching_needs_every_term_and_the_price_range(self):
+        self.assertEqual(
+            self.matched_titles(self.chair),
+            ["chairs 50-150", "everything", "oak chair"],
+        )
+
+    def test_percolate_records_matches_and_drops_jobs(self):
+        PercolationJob.objects.create(antique=self.chair)
+        PercolationJob.objects.create(antique=self.sold)
+        self.assertEqual(percolate(10), (2, 3))
+        self.assertFalse(PercolationJob.objects.exists())
+        # Matching the same listing again doesn't duplicate its matches
+        PercolationJob.objects.create(antique=self.chair)
+        percolate(10)
+        self.assertEqual(SavedSearchMatch.objects.count(), 3)
+
+    def test_digest_waits_for_the_interval_then_sends_once(self):
+        PercolationJob.objects.create(antique=self.chair)
+        percolate(10)
+        with self.settings(SAVED_SEARCH_DIGEST_INTERVAL=3600):
+            self.assertEqual(send_digests(10), 0)
+        with self.settings(SAVED_SEARCH_DIGEST_INTERVAL=0):
+            self.assertEqual(send_digests(10), 1)
+            self.assertEqual(send_digests(10), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["buyer@example.com"])
+        self.assertEqual(
+            mail.outbox[0].subject, "3 new listings match your saved searches"
+        )
+        self.assertFalse(
+            SavedSearchMatch.objects.filter(notified_at__isnull=True).exists()
+        )
+
+    def test_form_rejects_an_inverted_price_range(self):
+        form = SavedSearchForm(
+            data={"title": "Chairs", "min_price": "200", "max_price": "100"}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("max_price", form.errors)
+
+
+@override_settings(CATALOG_SYNC_LAG=0)
+class ChangesApiTests(TestCase):
+    """Delta sync returns each change once, deletes as tombstones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        make_antiques(user, 7, price=lambda i: i)
+
+    def sync(self, since=None, **params):
+        if since:
+            params["since"] = since
+        response = self.client.get(reverse("antiques_api:antique-changes"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def sync_all(self, since=None, **params):
+        changes = []
+        while True:
+            data = self.sync(since, **params)
+            changes += data["changes"]
+            since = data["watermark"]
+            if not data["has_more"]:
+                return changes, since
+
+    def test_pages_cover_every_antique_once(self):
+        changes, watermark = self.sync_all(limit=3)
+        self.assertEqual(
+            sorted(change["slug"] for change in changes),
+            sorted(Antique.objects.values_list("slug", flat=True)),
+        )
+        self.assertEqual(self.sync(watermark)["changes"], [])
+
+    def test_updates_and_deletes_after_watermark(self):
+        _, watermark = self.sync_all()
+        changed = Antique.objects.get(slug="antique-2")
+        changed.title = "Renamed"
+        changed.save()
+        Antique.objects.get(slug="antique-4").delete()
+
+        changes = self.sync(watermark)["changes"]
+        self.assertEqual(
+            [change["slug"] for change in changes], ["antique-2", "antique-4"]
+        )
+        self.assertEqual(changes[0]["title"], "Renamed")
+        self.assertTrue(changes[1]["deleted"])
+        self.assertTrue(AntiqueTombstone.objects.filter(slug="antique-4").exists())
+
+    def test_field_selection(self):
+        change = self.sync(fields="price,url,bogus", limit=1)["changes"][0]
+        self.assertEqual(set(change), {"id", "updated_at", "price", "url"})
+        slug = Antique.objects.get(pk=change["id"]).slug
+        self.assertEqual(change["url"], f"/antiques/{slug}/")
+
+    def test_invalid_watermark(self):
+        antique_id = Antique.objects.values_list("pk", flat=True).first()
+        forged = [
+            encode_cursor(values)
+            for values in (
+                ["x", antique_id],
+                [None, antique_id],
+                [5, antique_id],
+                [date(2025, 1, 1), antique_id],
+                [timezone.now(), "x"],
+            )
+        ]
+        for since in ["yesterday", *forged]:
+            with self.subTest(since=since):
+                response = self.client.get(
+                    reverse("antiques_api:antique-changes"), {"since": since}
+                )
+                self.assertEqual(response.status_code, 400)
@@ -6,11 +6,18 @@ from .views import (
     AntiqueDetailView,
     AntiqueListView,
     AntiqueUpdateView,
+    SavedSearchCreateView,
+    SavedSearchDeleteView,
+    SavedSearchListView,
     WishlistCreateView,
     WishlistDeleteView,
     WishlistDetailView,
     WishlistListView,
     WishlistToggleView,
+    antique_also_saved,
+    antique_suggest,
+    recently_viewed_antiques,
+    recommended_antiques,
     wishlist_add_antique,
     wishlist_remove_antique,
 )
@@ -21,6 +28,11 @@ urlpatterns = [
     # Antique URLs
     path("", AntiqueListView.as_view(), name="antique-list"),
     path("create/", AntiqueCreateView.as_view(), name="antique-create"),
+    path("suggest/", antique_suggest, name="antique-suggest"),
+    path("recommended/", recommended_antiques, name="antique-recommended"),
+    path(
+        "recently-viewed/", recently_viewed_antiques, name="antique-recently-viewed"
+    ),
 
     # Wishlist URLs (must come before <slug:slug>/ to avoid conflicts)
     path("wishlist/", WishlistListView.as_view(), name="wishlist-list"),
@@ -51,12 +63,30 @@ urlpatterns = [
         name="wishlist-delete",
     ),
 
+    # Saved search URLs
+    path("saved-searches/", SavedSearchListView.as_view(), name="saved-search-list"),
+    path(
+        "saved-searches/create/",
+        SavedSearchCreateView.as_view(),
+        name="saved-search-create",
+    ),
+    path(
+        "saved-searches/<uuid:pk>/delete/",
+        SavedSearchDeleteView.as_view(),
+        name="saved-search-delete",
+    ),
+
     # Antique detail URLs (must come after wishlist URLs to avoid catching "wishlist" as a slug)
     path(
         "<slug:slug>/",
         AntiqueDetailView.as_view(),
         name="antique-detail",
     ),
+    path(
+        "<slug:slug>/also-saved/",
+        antique_also_saved,
+        name="antique-also-saved",
+    ),
     path(
         "<slug:slug>/update/",
         AntiqueUpdateView.as_view(),
@@ -1,5 +1,8 @@
 # apps/antiques/views/__init__.py
 from .antique_views import *
+from .recommendation_views import *
+from .saved_search_views import *
+from .sync_views import *
 from .wishlist_views import *
 
 # Optional: restrict what gets exported (if you want)
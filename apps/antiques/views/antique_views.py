@@ -1,6 +1,12 @@
+import time
+
+from django.conf import settings
 from django.contrib import messages
 from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
+from django.views.decorators.http import require_GET
 from django.urls import reverse_lazy
 from django.views.generic import (
     CreateView,
@@ -12,16 +18,31 @@ from django.views.generic import (
 
 from apps.core.mixins import (
     BaseModelViewMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
     SearchableListViewMixin,
+    SearchRateLimitMixin,
     VerifiedSellerRequiredMixin,
 )
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
+from ..categories import category_tree, descendant_ids, normalize_name
 from ..forms import AntiqueForm, AntiqueImageFormSet
-from ..models import Antique, AntiqueImage, Wishlist
-
-
-class AntiqueListView(SearchableListViewMixin, ListView):
+from ..history import history_buffer
+from ..models import Antique, AntiqueImage, BuildRun, SimilarAntique, Wishlist
+from ..popularity import counter_buffer
+from ..prices import mark_selected, parse_price, price_histogram
+from ..search import fuzzy_search_ids
+from ..suggest import suggestion_index
+
+
+class AntiqueListView(
+    SearchRateLimitMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    SearchableListViewMixin,
+    ListView,
+):
     model = Antique
     template_name = "antiques/antique_list.html"
     paginate_by = 20
@@ -33,33 +54,142 @@ class AntiqueListView(SearchableListViewMixin, ListView):
         "type_of_antique__icontains",
     ]
     prefetch_related_fields = ["images"]
-    default_ordering = ["-created_at"]
+    # Each ordering has an index led by is_sold (see Antique.Meta) and ends
+    # with id, so it is a total order usable for cursor pagination
+    sort_options = {
+        "newest": ("Newest", ["-created_at", "-id"]),
+        "price_asc": ("Price: low to high", ["price", "id"]),
+        "price_desc": ("Price: high to low", ["-price", "-id"]),
+        "updated": ("Recently updated", ["-updated_at", "-id"]),
+        "popular": ("Most viewed", ["-view_count", "-id"]),
+        "trending": ("Trending", ["-trending_score", "-id"]),
+    }
+    default_sort = "newest"
+
+    def get_search_filter(self, search):
+        """Exact substring matches plus typo-tolerant trigram matches."""
+        if not settings.FUZZY_SEARCH_ENABLED:
+            return super().get_search_filter(search)
+        # get_queryset() runs twice per request (ETag and list); match once
+        if getattr(self, "_fuzzy_search", (None,))[0] != search:
+            self._fuzzy_search = (search, fuzzy_search_ids(search))
+        return super().get_search_filter(search) | Q(pk__in=self._fuzzy_search[1])
 
     def get_queryset(self):
-        """Apply custom sold filter."""
+        """The facet filters plus the price range."""
+        queryset = self.get_facet_queryset()
+
+        # Price range; unsold rows are served by antique_price_idx
+        low, high = self.get_price_range()
+        if low is not None:
+            queryset = queryset.filter(price__gte=low)
+        if high is not None:
+            queryset = queryset.filter(price__lte=high)
+
+        return queryset
+
+    def get_facet_queryset(self):
+        """Every filter except price: the base of the price histogram."""
         queryset = super().get_queryset()
 
-        # Type filter
-        antique_type = self.request.GET.get("type", "").strip()
-        if antique_type:
-            queryset = queryset.filter(type_of_antique=antique_type)
+        # Category filter (includes subcategories), on integer keys
+        category_ids = self.get_category_filter()
+        if category_ids is not None:
+            queryset = queryset.filter(category__in=category_ids)
 
         # Sold filter (hide sold items by default)
         show_sold = self.request.GET.get("show_sold", "")
         if show_sold != "true":
-            queryset = queryset.filter(is_sold=False)
+            # Not is_sold=False: that compiles to NOT "is_sold", which SQLite
+            # won't match to the (is_sold, <sort key>) indexes
+            queryset = queryset.filter(is_sold__in=[False])
 
         return queryset
 
+    def get_category_filter(self):
+        """
+        Category ids to filter on, or None for no filter. Old ?type=<name>
+        links (suggestions, saved searches) resolve to the matching category.
+        """
+        try:
+            category = int(self.request.GET.get("category", ""))
+        except ValueError:
+            category = None
+        if category is None:
+            type_name = normalize_name(self.request.GET.get("type"))
+            if not type_name:
+                return None
+            category = next(
+                (
+                    node["id"]
+                    for node in category_tree()
+                    if normalize_name(node["name"]) == type_name
+                ),
+                None,
+            )
+        return descendant_ids(category)
+
+    def get_price_range(self):
+        """(min_price, max_price) as Decimals, either of them None."""
+        low = parse_price(self.request.GET.get("min_price"))
+        high = parse_price(self.request.GET.get("max_price"))
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        return low, high
+
+    def get_facets_key(self):
+        """The filters that shape the price histogram, as a cache key."""
+        return "|".join(
+            [
+                self.request.GET.get("search", "").strip(),
+                ",".join(map(str, self.get_category_filter() or [])),
+                self.request.GET.get("show_sold", ""),
+            ]
+        )
+
+    def get_last_modified(self):
+        # Count as well as max: deleting an antique doesn't change the max
+        version = self.get_queryset().aggregate(
+            latest=Max("updated_at"), count=Count("pk")
+        )
+        self.result_count = version["count"]
+        self.facet_count = None
+        if self.get_price_range() == (None, None):
+            return version["latest"]
+        # The price histogram also counts antiques outside the price range
+        facets = self.get_facet_queryset().aggregate(
+            latest=Max("updated_at"), count=Count("pk")
+        )
+        self.facet_count = facets["count"]
+        return facets["latest"]  # a superset of the results, so the newest
+
+    def get_etag_parts(self):
+        parts = [
+            self.result_count,
+            self.facet_count,
+            Wishlist.last_modified_for(self.request.user),
+        ]
+        if self.get_sort() in ("popular", "trending"):
+            # Counter flushes reorder the list without touching updated_at
+            parts.append(int(time.time() // settings.POPULARITY_FLUSH_INTERVAL))
+        return parts
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get all unique antique types for the filter dropdown
-        context["antique_types"] = (
-            Antique.objects.values_list("type_of_antique", flat=True)
-            .distinct()
-            .order_by("type_of_antique")
+        # Category facets with maintained counts (cached, no antique scan)
+        context["categories"] = category_tree()
+        category_ids = self.get_category_filter()
+        context["selected_category"] = category_ids[0] if category_ids else None
+
+        # Price buckets of the results without the price filter (cached)
+        low, high = self.get_price_range()
+        context["price_histogram"] = mark_selected(
+            price_histogram(self.get_facet_queryset(), self.get_facets_key()),
+            low,
+            high,
         )
+        context["price_range"] = {"min": low, "max": high}
 
         # Safely get user's wishlist (returns the first if multiple exist)
         if self.request.user.is_authenticated:
@@ -72,10 +202,56 @@ class AntiqueListView(SearchableListViewMixin, ListView):
         return context
 
 
-class AntiqueDetailView(DetailView, BaseModelViewMixin):
+@require_GET
+def antique_suggest(request):
+    """
+    Search-as-you-type suggestions (JSON) from the in-memory prefix index
+
+    Query params:
+        q (str): What the user has typed so far
+        limit (int): Maximum suggestions to return (1-20, default 8)
+    """
+    try:
+        limit = min(max(int(request.GET.get("limit", 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    suggestions = suggestion_index.suggest(request.GET.get("q", ""), limit=limit)
+    response = JsonResponse({"suggestions": suggestions})
+    response["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+class AntiqueDetailView(
+    ReplicaReadMixin, ConditionalGetMixin, DetailView, BaseModelViewMixin
+):
     model = Antique
     action = "detail"
 
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        # Revalidations (304) are views too; counted in memory, flushed in batches
+        if request.method == "GET" and response.status_code in (200, 304):
+            counter_buffer.record_view(self.kwargs["slug"])
+            if request.user.is_authenticated:
+                history_buffer.record(request.user.pk, self.kwargs["slug"])
+        return response
+
+    def get_last_modified(self):
+        # Image changes bump the antique's updated_at (see antiques.signals)
+        versions = (
+            Antique.objects.filter(slug=self.kwargs["slug"])
+            .values_list("updated_at", "seller__updated_at")
+            .first()
+        )
+        return max(filter(None, versions)) if versions else None
+
+    def get_etag_parts(self):
+        return [
+            Wishlist.last_modified_for(self.request.user),
+            # Similar and co-saved strips are rebuilt without touching antiques
+            BuildRun.last_finished(BuildRun.SIMILAR, BuildRun.COSAVED),
+        ]
+
     def get_object(self, queryset=None):
         return Antique.objects.get(slug=self.kwargs["slug"])
 
@@ -91,6 +267,16 @@ class AntiqueDetailView(DetailView, BaseModelViewMixin):
         else:
             context['in_wishlist'] = False
 
+        # Precomputed by build_similar_antiques; one lookup on (antique, rank)
+        context["similar_antiques"] = [
+            entry.similar
+            for entry in SimilarAntique.objects.filter(
+                antique=self.object, similar__is_sold=False
+            )
+            .select_related("similar")
+            .prefetch_related("similar__images")
+        ]
+
         return context
 
 
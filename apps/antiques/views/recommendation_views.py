@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db.models import Sum
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from ..history import recently_viewed
+from ..models import Antique, CoSavedAntique, Wishlist
+
+
+@require_GET
+def antique_also_saved(request, slug):
+    """
+    "Collectors who saved this also saved" strip for the detail page (HTMX
+    partial), read from the precomputed CoSavedAntique table.
+    """
+    antiques = [
+        entry.other
+        for entry in CoSavedAntique.objects.filter(
+            antique__slug=slug, other__is_sold=False
+        )
+        .select_related("other")
+        .prefetch_related("other__images")
+    ]
+    response = render(
+        request,
+        "antiques/partials/antique_strip.html",
+        {"heading": "Collectors who saved this also saved", "antiques": antiques},
+    )
+    response["Cache-Control"] = "public, max-age=300"
+    return response
+
+
+@login_required
+@require_GET
+def recommended_antiques(request):
+    """
+    Dashboard recommendations (HTMX partial): the co-saved neighbours of
+    everything in the user's wishlists, summed, minus what they already saved.
+    """
+    saved = Wishlist.antiques.through.objects.filter(
+        wishlist__user=request.user
+    ).values("antique_id")
+    ranked = list(
+        CoSavedAntique.objects.filter(antique__in=saved, other__is_sold=False)
+        .exclude(other__in=saved)
+        .values("other")
+        .annotate(total=Sum("score"))
+        .order_by("-total")
+        .values_list("other", flat=True)[: settings.WISHLIST_COSAVED_COUNT]
+    )
+    found = Antique.objects.prefetch_related("images").in_bulk(ranked)
+    response = render(
+        request,
+        "antiques/partials/antique_strip.html",
+        {
+            "heading": "Recommended from your wishlists",
+            "antiques": [found[pk] for pk in ranked if pk in found],
+        },
+    )
+    response["Cache-Control"] = "private, max-age=300"
+    return response
+
+
+@login_required
+@require_GET
+def recently_viewed_antiques(request):
+    """
+    Dashboard "Recently viewed" strip (HTMX partial): the user's history from
+    the cache, fetched with one in_bulk lookup by slug.
+    """
+    slugs = recently_viewed(request.user)
+    found = Antique.objects.prefetch_related("images").in_bulk(
+        slugs, field_name="slug"
+    )
+    response = render(
+        request,
+        "antiques/partials/antique_strip.html",
+        {
+            "heading": "Recently viewed",
+            "antiques": [found[slug] for slug in slugs if slug in found],
+        },
+    )
+    response["Cache-Control"] = "private, no-cache"
+    return response
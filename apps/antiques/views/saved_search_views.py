@@ -0,0 +1,93 @@
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.messages.views import SuccessMessageMixin
+from django.db.models import Count, Q
+from django.urls import reverse_lazy
+from django.views.generic import CreateView, DeleteView, ListView
+
+from apps.core.mixins import BaseModelViewMixin
+
+from ..categories import category_tree
+from ..forms import SavedSearchForm
+from ..models import SavedSearch
+
+
+class SavedSearchListView(LoginRequiredMixin, ListView):
+    template_name = "antiques/saved_searches/saved_search_list.html"
+    paginate_by = 20
+
+    def get_queryset(self):
+        return (
+            SavedSearch.objects.filter(user=self.request.user)
+            .annotate(
+                pending_count=Count(
+                    "matches", filter=Q(matches__notified_at__isnull=True)
+                )
+            )
+            .order_by("-created_at")
+        )
+
+
+class SavedSearchCreateView(
+    LoginRequiredMixin, SuccessMessageMixin, CreateView, BaseModelViewMixin
+):
+    model = SavedSearch
+    action = "form"
+    form_class = SavedSearchForm
+    template_name = "antiques/saved_searches/saved_search_form.html"
+    success_url = reverse_lazy("antiques:saved-search-list")
+    success_message = (
+        "Saved search '%(title)s' created. We'll email you when new listings match."
+    )
+
+    def get_initial(self):
+        """Prefill from the antique list filters ("Save this search")."""
+        params = self.request.GET
+        query = params.get("search", "").strip()
+        type_of_antique = params.get("type", "").strip()
+        category = params.get("category", "")
+        if category.isdigit():
+            type_of_antique = next(
+                (n["name"] for n in category_tree() if n["id"] == int(category)),
+                type_of_antique,
+            )
+        return {
+            "title": query or type_of_antique or "All antiques",
+            "query": query,
+            "type_of_antique": type_of_antique,
+            "min_price": params.get("min_price") or None,
+            "max_price": params.get("max_price") or None,
+        }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            {
+                "form_title": "Save Search",
+                "form_description": "Get an email digest when new antiques match this search",
+                "submit_text": "Save Search",
+                "cancel_url": reverse_lazy("antiques:antique-list"),
+                "back_url": reverse_lazy("antiques:saved-search-list"),
+            }
+        )
+        return context
+
+    def form_valid(self, form):
+        form.instance.user = self.request.user
+        return super().form_valid(form)
+
+
+class SavedSearchDeleteView(LoginRequiredMixin, DeleteView):
+    model = SavedSearch
+    http_method_names = ["post"]
+    success_url = reverse_lazy("antiques:saved-search-list")
+
+    def get_queryset(self):
+        """Ensure users can only delete their own saved searches"""
+        return SavedSearch.objects.filter(user=self.request.user)
+
+    def form_valid(self, form):
+        messages.success(
+            self.request, f"Saved search '{self.object.title}' deleted successfully!"
+        )
+        return super().form_valid(form)
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ..sync import changes, parse_fields, parse_watermark
+
+
+@require_GET
+def antique_changes(request):
+    """
+    Delta sync (JSON): antiques created, updated or deleted since a watermark
+
+    Query params:
+        since (str): "watermark" from the previous response, or an ISO 8601
+            datetime; omit for a full sync
+        fields (str): Comma-separated fields to return (default: compact set)
+        limit (int): Maximum changes to return (1-CATALOG_SYNC_PAGE_SIZE)
+
+    Call again with since=<watermark> while "has_more" is true, and later to
+    pick up new changes. Deleted antiques come back as {"deleted": true}.
+    """
+    try:
+        since = parse_watermark(request.GET.get("since"))
+    except ValueError:
+        return JsonResponse({"error": "Invalid watermark"}, status=400)
+    page_size = settings.CATALOG_SYNC_PAGE_SIZE
+    try:
+        limit = min(max(int(request.GET.get("limit", page_size)), 1), page_size)
+    except ValueError:
+        limit = page_size
+
+    results, watermark, has_more = changes(
+        since, parse_fields(request.GET.get("fields")), limit
+    )
+    response = JsonResponse(
+        {"changes": results, "watermark": watermark, "has_more": has_more}
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
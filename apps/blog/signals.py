@@ -0,0 +1,21 @@
+from apps.core.changes import consumer, track_changes
+from apps.core.snapshots import queue_snapshot
+
+from .models import BlogPost
+
+track_changes(BlogPost, fields=["slug"], previous=["slug"])
+
+
+@consumer("blog_snapshots", models=[BlogPost])
+def snapshot_blog_posts(records):
+    # Drafts are queued too: rendering one removes any published snapshot
+    changed, gone = set(), set()
+    for record in records:
+        if record.data.get("previous_slug"):
+            gone.add(BlogPost(slug=record.data["previous_slug"]).get_absolute_url())
+        if record.data["slug"]:
+            url = BlogPost(slug=record.data["slug"]).get_absolute_url()
+            (gone if record.action == "deleted" else changed).add(url)
+    # Old URLs now 404; drop their snapshots without the debounce
+    queue_snapshot(*gone - changed, delay=0)
+    queue_snapshot(*changed)
@@ -2,7 +2,10 @@ from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
 from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Max
 from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -16,13 +19,25 @@ from django.views.generic import (
 )
 
 from braces.views import SuperuserRequiredMixin
-from apps.core.mixins import BaseModelViewMixin, SearchableListViewMixin
+from apps.core.mixins import (
+    BaseModelViewMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    SearchableListViewMixin,
+    SearchRateLimitMixin,
+)
 
 from .forms import BlogPostForm
 from .models import BlogPost
 
 
-class BlogPostListView(SearchableListViewMixin, ListView):
+class BlogPostListView(
+    SearchRateLimitMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    SearchableListViewMixin,
+    ListView,
+):
     model = BlogPost
     template_name = "blog/blogpost_list.html"
     context_object_name = "object_list"
@@ -40,6 +55,17 @@ class BlogPostListView(SearchableListViewMixin, ListView):
             queryset = queryset.filter(status="published")
         return queryset
 
+    def get_last_modified(self):
+        # Count as well as max: deleting a post doesn't change the max
+        version = self.get_queryset().aggregate(
+            latest=Max("updated_at"), count=Count("pk")
+        )
+        self.result_count = version["count"]
+        return version["latest"]
+
+    def get_etag_parts(self):
+        return [self.result_count]
+
     def get_filter_context(self):
         """Provide filter options for the template."""
         return {
@@ -105,12 +131,21 @@ class BlogPostListView(SearchableListViewMixin, ListView):
         return context
 
 
-class BlogPostDetailView(DetailView, BaseModelViewMixin):
+class BlogPostDetailView(
+    ReplicaReadMixin, ConditionalGetMixin, DetailView, BaseModelViewMixin
+):
     model = BlogPost
     action = "detail"
 
+    def get_last_modified(self):
+        return (
+            BlogPost.objects.filter(slug=self.kwargs["slug"])
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+
     def get_object(self, queryset=None):
-        obj = BlogPost.objects.get(slug=self.kwargs["slug"])
+        obj = get_object_or_404(BlogPost, slug=self.kwargs["slug"])
         # Only allow viewing drafts for superusers
         if obj.status == "draft" and not self.request.user.is_superuser:
             raise PermissionDenied("This blog post is not published yet.")
@@ -141,7 +176,9 @@ class BlogPostCreateView(SuperuserRequiredMixin, CreateView, BaseModelViewMixin)
         return context
 
     def form_valid(self, form):
-        response = super().form_valid(form)
+        # The post and its change record commit together
+        with transaction.atomic():
+            response = super().form_valid(form)
         messages.success(
             self.request, f"Blog post '{self.object.title}' created successfully!"
         )
@@ -175,7 +212,9 @@ class BlogPostUpdateView(UpdateView, BaseModelViewMixin, UserPassesTestMixin):
         return context
 
     def form_valid(self, form):
-        response = super().form_valid(form)
+        # The post and its change record commit together
+        with transaction.atomic():
+            response = super().form_valid(form)
         messages.success(
             self.request, f"Blog post '{self.object.title}' updated successfully!"
         )
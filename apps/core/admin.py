@@ -1,3 +1,8 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ChangeConsumerOffset, ChangeRecord, OutboxEmail, SnapshotJob
+
+admin.site.register(OutboxEmail)
+admin.site.register(SnapshotJob)
+admin.site.register(ChangeRecord)
+admin.site.register(ChangeConsumerOffset)
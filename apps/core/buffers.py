@@ -0,0 +1,70 @@
+"""
+Per-process write buffers flushed off the request path.
+
+A buffer collects cheap in-memory updates and writes them in one batch from a
+daemon thread: every `interval` seconds, or as soon as it holds `max_size`
+entries. Recording only takes the buffer's lock, so it stays O(1) whatever a
+flush costs, and no request ever waits on one.
+
+The thread starts with the first record in each process (again after a fork,
+since threads don't survive one) and closes its database connections after
+every flush. Entries still buffered when a process exits are lost.
+"""
+
+import logging
+import os
+import threading
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """
+    Base for per-process buffers. Subclasses hold their entries under
+    self._lock, call self._recorded() after adding one, and implement size()
+    and flush(); interval and max_size usually read settings.
+    """
+
+    interval = 30  # seconds between flushes
+    max_size = 1000  # pending entries that wake the flush thread early
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def size(self):
+        """Pending entries; called with self._lock held."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Write the pending entries; must not raise for a failed write."""
+        raise NotImplementedError
+
+    def _recorded(self):
+        """Call with self._lock held after adding an entry."""
+        if self._pid != os.getpid():
+            self._start()
+        if self.size() >= self.max_size:
+            self._wake.set()
+
+    def _start(self):
+        self._pid = os.getpid()
+        self._wake = threading.Event()
+        threading.Thread(
+            target=self._run, name=f"{type(self).__name__}-flush", daemon=True
+        ).start()
+
+    def _run(self):
+        wake = self._wake
+        while True:
+            wake.wait(self.interval)
+            wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s flush failed", type(self).__name__)
+            finally:
+                connections.close_all()
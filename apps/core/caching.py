@@ -0,0 +1,340 @@
+"""
+Two-tier cache: a small in-process LRU in front of the shared Django cache.
+
+- Values are serialized with msgpack (Decimal, UUID and date are supported
+  via extension types) instead of pickle.
+- Recomputation is single-flight: one caller per key (per process via a lock,
+  across processes via cache.add) recomputes while the others wait or keep
+  serving the previous value.
+- Entries are refreshed early with probability rising towards expiry
+  ("XFetch"), so hot keys are rebuilt before they expire for everyone at once.
+- Every entry carries the versions of its tags; bumping a tag (usually from a
+  model signal, see invalidate_on) makes all entries with that tag stale.
+  Each namespace is also a tag, so TwoTierCache.clear() drops a namespace.
+
+In-process copies are kept for at most CACHE_LOCAL_TIMEOUT seconds, which
+bounds how long another worker can serve a value after an invalidation.
+"""
+
+import math
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+import msgpack
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+EXT_DECIMAL = 1
+EXT_UUID = 2
+EXT_DATE = 3
+
+# Namespace name -> TwoTierCache, for stats
+namespaces = {}
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, UUID):
+        return msgpack.ExtType(EXT_UUID, obj.bytes)
+    if isinstance(obj, date) and not isinstance(obj, datetime):
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__} for the cache")
+
+
+def _ext_hook(code, data):
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_UUID:
+        return UUID(bytes=data)
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def dumps(value):
+    # datetime=True encodes aware datetimes as msgpack timestamps
+    return msgpack.packb(value, default=_default, use_bin_type=True, datetime=True)
+
+
+def loads(data):
+    return msgpack.unpackb(
+        data, ext_hook=_ext_hook, raw=False, timestamp=3, strict_map_key=False
+    )
+
+
+def _tag_key(tag):
+    return f"cachetag:{tag}"
+
+
+def invalidate_tags(*tags, using="default"):
+    """Bump the version of each tag, making every entry carrying it stale."""
+    backend = caches[using]
+    for tag in tags:
+        try:
+            backend.incr(_tag_key(tag))
+        except ValueError:
+            # First invalidation: entries were stored against version 0
+            backend.set(_tag_key(tag), 1, timeout=None)
+    for namespace in namespaces.values():
+        namespace.forget_local(tags)
+
+
+def invalidate_on(model, *tags):
+    """
+    Invalidate `tags` whenever an instance of `model` is saved or deleted,
+    once the write commits. Bumping earlier would let a concurrent reader
+    recompute from pre-commit data and cache it under the new version.
+    """
+
+    def receiver(sender, using=None, **kwargs):
+        transaction.on_commit(lambda: invalidate_tags(*tags), using=using)
+
+    uid = f"invalidate:{model._meta.label}:{','.join(tags)}"
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(
+        receiver, sender=model, weak=False, dispatch_uid=f"{uid}:delete"
+    )
+
+
+class TwoTierCache:
+    """
+    A cache namespace. Use get_or_set() for read-through caching:
+
+        catalog_cache = TwoTierCache("catalog", timeout=600)
+        types = catalog_cache.get_or_set("types", load_types, tags=["antiques"])
+    """
+
+    def __init__(
+        self,
+        namespace,
+        timeout=300,
+        local_maxsize=None,
+        local_timeout=None,
+        beta=None,
+        using="default",
+    ):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.local_maxsize = local_maxsize or settings.CACHE_LOCAL_MAXSIZE
+        self.local_timeout = (
+            settings.CACHE_LOCAL_TIMEOUT if local_timeout is None else local_timeout
+        )
+        self.beta = settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+        self.using = using
+
+        self._local = OrderedDict()  # key -> (packed, local_expiry, tags)
+        self._local_bytes = 0
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> threading.Lock
+        self.counters = dict.fromkeys(
+            [
+                "local_hits",
+                "shared_hits",
+                "misses",
+                "coalesced",  # misses served by another caller's recompute
+                "early_refreshes",
+                "stale_served",
+            ],
+            0,
+        )
+        namespaces[namespace] = self
+
+    @property
+    def backend(self):
+        return caches[self.using]
+
+    def get_or_set(self, key, compute, timeout=None, tags=()):
+        """Return the cached value for key, calling compute() to (re)build it."""
+        timeout = self.timeout if timeout is None else timeout
+        tags = (self.namespace, *tags)
+        full_key = f"{self.namespace}:{key}"
+        now = time.time()
+
+        envelope = self._local_get(full_key, now)
+        if envelope is not None:
+            self._count("local_hits")
+        else:
+            envelope = self._shared_get(full_key, tags, now)
+            if envelope is not None:
+                self._count("shared_hits")
+
+        if envelope is not None:
+            value, expires_at, delta = envelope[:3]
+            if not self._should_refresh(expires_at, delta, now):
+                return value
+            # Early refresh: one caller rebuilds, everyone else keeps the value
+            token = self._try_lock(full_key)
+            if token is None:
+                self._count("stale_served")
+                return value
+            self._count("early_refreshes")
+            try:
+                return self._compute(full_key, compute, timeout, tags)
+            finally:
+                self._unlock(full_key, token)
+
+        return self._compute_single_flight(full_key, compute, timeout, tags)
+
+    def delete(self, key):
+        full_key = f"{self.namespace}:{key}"
+        self.backend.delete(full_key)
+        with self._lock:
+            self._local_pop(full_key)
+
+    def clear(self):
+        """Invalidate every entry in this namespace (in all processes)."""
+        invalidate_tags(self.namespace, using=self.using)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "namespace": self.namespace,
+                **self.counters,
+                "local_entries": len(self._local),
+                "local_bytes": self._local_bytes,
+            }
+
+    def forget_local(self, tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [k for k, entry in self._local.items() if tags & entry[2]]:
+                self._local_pop(key)
+
+    # Internals
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _should_refresh(self, expires_at, delta, now):
+        # XFetch: recompute early with probability growing as expiry nears,
+        # scaled by how long the value took to compute
+        if not self.beta:
+            return now >= expires_at
+        return now - delta * self.beta * math.log(1 - random.random()) >= expires_at
+
+    def _shared_get(self, full_key, tags, now):
+        tag_keys = [_tag_key(tag) for tag in tags]
+        found = self.backend.get_many([full_key, *tag_keys])
+        packed = found.get(full_key)
+        if packed is None:
+            return None
+        envelope = loads(packed)
+        versions = {tag: found.get(_tag_key(tag), 0) for tag in tags}
+        if envelope[3] != versions:
+            return None
+        self._local_set(full_key, packed, tags, now)
+        return envelope
+
+    def _compute_single_flight(self, full_key, compute, timeout, tags):
+        with self._lock:
+            flight = self._flights.setdefault(full_key, threading.Lock())
+
+        # Threads in this process queue here; the first one computes
+        with flight:
+            now = time.time()
+            envelope = self._local_get(full_key, now) or self._shared_get(
+                full_key, tags, now
+            )
+            if envelope is not None:
+                self._count("coalesced")
+                return envelope[0]
+
+            # Other processes: wait briefly for whoever holds the lock, then
+            # compute without it (token None) rather than wait any longer
+            deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+            while (token := self._try_lock(full_key)) is None:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.05)
+                envelope = self._shared_get(full_key, tags, time.time())
+                if envelope is not None:
+                    self._count("coalesced")
+                    return envelope[0]
+            self._count("misses")
+            try:
+                return self._compute(full_key, compute, timeout, tags)
+            finally:
+                if token is not None:
+                    self._unlock(full_key, token)
+                with self._lock:
+                    self._flights.pop(full_key, None)
+
+    def _compute(self, full_key, compute, timeout, tags):
+        # Read tag versions before computing, so an invalidation that lands
+        # mid-compute leaves this value stale rather than fresh
+        tag_keys = {tag: _tag_key(tag) for tag in tags}
+        found = self.backend.get_many(list(tag_keys.values()))
+        versions = {tag: found.get(key, 0) for tag, key in tag_keys.items()}
+
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+
+        now = time.time()
+        packed = dumps([value, now + timeout, delta, versions])
+        self.backend.set(full_key, packed, timeout=timeout)
+        self._local_set(full_key, packed, tags, now)
+        return value
+
+    def _try_lock(self, full_key):
+        """A token proving we hold the key's lock, or None if another does."""
+        token = secrets.token_hex(8)
+        if self.backend.add(
+            f"lock:{full_key}", token, timeout=settings.CACHE_LOCK_TIMEOUT
+        ):
+            return token
+        return None
+
+    def _unlock(self, full_key, token):
+        # Only release our own lock: it may have expired during a slow
+        # compute and been taken by another process. The cache API has no
+        # compare-and-delete, so a lock taken between get and delete can
+        # still go; that only costs one extra recompute.
+        if self.backend.get(f"lock:{full_key}") == token:
+            self.backend.delete(f"lock:{full_key}")
+
+    def _local_get(self, full_key, now):
+        if not self.local_timeout:
+            return None
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                self._local_pop(full_key)
+                return None
+            self._local.move_to_end(full_key)
+            packed = entry[0]
+        return loads(packed)
+
+    def _local_set(self, full_key, packed, tags, now):
+        if not self.local_timeout:
+            return
+        with self._lock:
+            self._local_pop(full_key)
+            self._local[full_key] = (packed, now + self.local_timeout, set(tags))
+            self._local_bytes += len(packed)
+            while len(self._local) > self.local_maxsize:
+                self._local_pop(next(iter(self._local)))
+
+    def _local_pop(self, full_key):
+        # Caller holds self._lock
+        entry = self._local.pop(full_key, None)
+        if entry is not None:
+            self._local_bytes -= len(entry[0])
+
+
+def cache_stats():
+    return [namespace.stats() for namespace in namespaces.values()]
@@ -0,0 +1,232 @@
+"""
+Transactional outbox of catalog changes for downstream consumers.
+
+track_changes(Model, fields) records every save and delete of the model as
+a ChangeRecord: model label, pk, action and a few field values, enough to
+act on a row that has since been deleted. The row is inserted by the
+model's own post_save/post_delete receiver, so it commits or rolls back
+with the change whenever the write runs in a transaction (deletes always
+do; the create/update views and the Stripe webhook wrap their writes in
+one). Writers pay for one INSERT, however many consumers there are.
+
+Consumers register with @consumer(name, models=[...]) and are called by the
+`dispatch_changes` worker with batches of records, oldest first. Each has
+its own offset (ChangeConsumerOffset: the id of the last record it has
+processed), so a slow or failing consumer only holds itself back. When a
+consumer raises, its batch is retried on the next pass; its database
+writes commit together with its offset. A newly registered consumer starts
+at the current end of the outbox.
+
+Ids are assigned on insert but become visible on commit, so a slow
+transaction (the antique create view calls Stripe inside one) can commit a
+lower id after a consumer has moved past it. Each offset therefore also
+keeps the ids it skipped over ("gaps"), and every pass fetches those again
+until they show up or CHANGE_OUTBOX_GAP_TIMEOUT passes; an id that never
+appears belonged to a rolled-back transaction.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import ChangeConsumerOffset, ChangeRecord
+
+logger = logging.getLogger(__name__)
+
+# Consumer name -> (handler, model labels or None for every model)
+consumers = {}
+
+# Model label -> fields recorded by track_changes
+tracked = {}
+
+# Skipped id ranges longer than this aren't tracked as gaps
+MAX_TRACKED_GAP = 1000
+
+
+def track_changes(model, fields=(), previous=()):
+    """
+    Record saves and deletes of `model`, with the values of `fields`. For the
+    fields in `previous`, an update that changes them also records the old
+    value as previous_<field> (one extra SELECT per update), so consumers can
+    clean up after a renamed slug.
+    """
+    label = model._meta.label_lower
+    tracked[label] = list(fields)
+
+    def record(instance, action, data=None):
+        ChangeRecord.objects.create(
+            model=label,
+            object_id=str(instance.pk),
+            action=action,
+            data={field: getattr(instance, field) for field in fields} | (data or {}),
+        )
+
+    def remember_previous(sender, instance, raw=False, **kwargs):
+        instance._previous_values = (
+            {}
+            if raw or instance._state.adding
+            else model._base_manager.filter(pk=instance.pk).values(*previous).first()
+            or {}
+        )
+
+    def record_save(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        changed = {
+            f"previous_{field}": value
+            for field, value in getattr(instance, "_previous_values", {}).items()
+            if value != getattr(instance, field)
+        }
+        record(instance, "created" if created else "updated", changed)
+
+    def record_delete(sender, instance, **kwargs):
+        record(instance, "deleted")
+
+    uid = f"track_changes:{label}"
+    if previous:
+        pre_save.connect(
+            remember_previous, sender=model, weak=False, dispatch_uid=f"{uid}:pre_save"
+        )
+    post_save.connect(record_save, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(
+        record_delete, sender=model, weak=False, dispatch_uid=f"{uid}:delete"
+    )
+
+
+def record_updates(queryset):
+    """
+    Record an "updated" change for every row of `queryset`, for bulk
+    updates of a tracked model that bypass its save signals.
+    """
+    label = queryset.model._meta.label_lower
+    fields = tracked[label]
+    ChangeRecord.objects.bulk_create(
+        ChangeRecord(
+            model=label,
+            object_id=str(row["pk"]),
+            action="updated",
+            data={field: row[field] for field in fields},
+        )
+        for row in queryset.values("pk", *fields)
+    )
+
+
+def consumer(name, models=None):
+    """
+    Register the decorated function as change consumer `name`. It is called
+    with a list of ChangeRecords (only those of `models`, if given).
+    """
+
+    def register(handler):
+        labels = {model._meta.label_lower for model in models} if models else None
+        consumers[name] = (handler, labels)
+        return handler
+
+    return register
+
+
+def _claim_offset(name):
+    """This consumer's offset, locked, or None if another worker holds it."""
+    ChangeConsumerOffset.objects.get_or_create(
+        consumer=name,
+        defaults={
+            "position": ChangeRecord.objects.aggregate(last=Max("pk"))["last"] or 0
+        },
+    )
+    return (
+        ChangeConsumerOffset.objects.select_for_update(skip_locked=True)
+        .filter(consumer=name)
+        .first()
+    )
+
+
+def _advance(offset, records, now):
+    """
+    (position, gaps) after `records`: ids skipped between records become
+    gaps, gaps that arrived are closed, gaps past the timeout are dropped.
+    """
+    position = offset.position
+    gaps = {int(pk): seen for pk, seen in offset.gaps.items()}
+    for record in records:
+        if record.pk in gaps:
+            del gaps[record.pk]
+        elif record.pk > position:
+            # Larger jumps are sequence gaps (e.g. after a crash), not writers
+            if record.pk - position <= MAX_TRACKED_GAP:
+                gaps.update(dict.fromkeys(range(position + 1, record.pk), now))
+            position = record.pk
+    expired = now - settings.CHANGE_OUTBOX_GAP_TIMEOUT
+    return position, {pk: seen for pk, seen in gaps.items() if seen > expired}
+
+
+def _dispatch(name, handler, labels, batch_size, now):
+    with transaction.atomic():
+        offset = _claim_offset(name)
+        if offset is None:
+            return 0
+        records = list(
+            ChangeRecord.objects.filter(
+                Q(pk__gt=offset.position) | Q(pk__in=[int(pk) for pk in offset.gaps])
+            ).order_by("pk")[:batch_size]
+        )
+        position, gaps = _advance(offset, records, now)
+        if not records:
+            if len(gaps) != len(offset.gaps):
+                offset.gaps = gaps
+                offset.save(update_fields=["gaps", "updated_at"])
+            return 0
+        relevant = [
+            record for record in records if labels is None or record.model in labels
+        ]
+        try:
+            with transaction.atomic():
+                if relevant:
+                    handler(relevant)
+        except Exception as exc:
+            logger.exception("Change consumer %s failed", name)
+            offset.last_error = repr(exc)
+            offset.save(update_fields=["last_error", "updated_at"])
+            return 0
+        # Skipped records of other models count as processed too
+        offset.position, offset.gaps = position, gaps
+        offset.last_error = ""
+        offset.save(update_fields=["position", "gaps", "last_error", "updated_at"])
+        return len(records)
+
+
+def dispatch_changes(batch_size=500):
+    """
+    Give every consumer its next batch. Returns {consumer: records
+    processed}; all zero means everyone is caught up.
+    """
+    now = time.time()
+    return {
+        name: _dispatch(name, handler, labels, batch_size, now)
+        for name, (handler, labels) in consumers.items()
+    }
+
+
+def prune_changes():
+    """
+    Delete records every consumer has processed (and no consumer may still
+    be waiting below), after CHANGE_OUTBOX_RETENTION.
+    """
+    records = ChangeRecord.objects.filter(
+        created_at__lt=timezone.now()
+        - timedelta(seconds=settings.CHANGE_OUTBOX_RETENTION)
+    )
+    floors = [
+        min([position, *(int(pk) - 1 for pk in gaps)])
+        for position, gaps in ChangeConsumerOffset.objects.filter(
+            consumer__in=consumers
+        ).values_list("position", "gaps")
+    ]
+    if floors:
+        records = records.filter(pk__lte=min(floors))
+    return records.delete()[0]
@@ -0,0 +1,66 @@
+"""
+System checks for assets the project expects on disk.
+
+The browser libraries in theme/_assets.html are copied into static/vendor/
+by `npm run vendor` (scripts/vendor-assets.mjs, which reads the same
+scripts/vendor-assets.json manifest as this module) rather than committed.
+If that step was skipped every page loses HTMX, Alpine and Toastify in
+development, and with DEBUG=False the manifest storage raises on render, so
+every page is a 500.
+
+Missing assets are a warning on runserver and `manage.py check`, and an
+error for `manage.py check --deploy` and `build_static`.
+"""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+
+def vendor_manifest():
+    """Path of the manifest shared with scripts/vendor-assets.mjs."""
+    return os.path.join(settings.BASE_DIR.parent, "scripts", "vendor-assets.json")
+
+
+def vendor_assets():
+    """Paths under static/vendor/ the templates load."""
+    with open(vendor_manifest()) as manifest:
+        return list(json.load(manifest))
+
+
+def vendor_root():
+    return os.path.join(settings.BASE_DIR.parent, "static", "vendor")
+
+
+def missing_vendor_assets():
+    root = vendor_root()
+    return [
+        path for path in vendor_assets() if not os.path.isfile(os.path.join(root, path))
+    ]
+
+
+def _missing_vendor_assets(level, id):
+    missing = missing_vendor_assets()
+    if not missing:
+        return []
+    return [
+        level(
+            f"Vendored static assets are missing from {vendor_root()}: "
+            f"{', '.join(missing)}.",
+            hint="Run `npm install && npm run vendor`.",
+            id=id,
+        )
+    ]
+
+
+@register(Tags.staticfiles)
+def check_vendor_assets(app_configs, **kwargs):
+    return _missing_vendor_assets(Warning, "core.W001")
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_vendor_assets_deploy(app_configs, **kwargs):
+    # Production would serve a 500 on every page
+    return _missing_vendor_assets(Error, "core.E001")
@@ -0,0 +1,25 @@
+from django.db import connections
+
+
+def connection_stats(alias="default"):
+    """
+    Return connection reuse metrics for a database alias.
+
+    For PostgreSQL with psycopg's pool this includes the pool's own counters
+    (size, idle connections, waiting requests, connection errors, ...).
+    """
+    connection = connections[alias]
+    stats = {
+        "alias": alias,
+        "vendor": connection.vendor,
+        "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+        "conn_health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS"),
+        "pooled": False,
+    }
+
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        stats["pooled"] = True
+        stats["pool"] = pool.get_stats()
+
+    return stats
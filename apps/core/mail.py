@@ -0,0 +1,170 @@
+import logging
+import time
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed batch is hidden from other workers while it is sent
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that queues messages in the OutboxEmail table.
+
+    send_mail(), allauth and anything else using EMAIL_BACKEND only pay for an
+    INSERT on the request path; the `send_outbox_email` worker delivers them
+    over a single reused SMTP connection.
+    """
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if message.attachments:
+                # Attachments aren't stored in the outbox; send these directly
+                get_connection(
+                    settings.EMAIL_OUTBOX_DELIVERY_BACKEND,
+                    fail_silently=self.fail_silently,
+                ).send_messages([message])
+                continue
+            rows.append(_to_outbox(message))
+
+        OutboxEmail.objects.bulk_create(rows)
+        return len(email_messages)
+
+
+def _to_outbox(message):
+    body, html_body = message.body, ""
+    if message.content_subtype == "html":
+        body, html_body = "", message.body
+    for content, mimetype in getattr(message, "alternatives", []):
+        if mimetype == "text/html":
+            html_body = content
+
+    return OutboxEmail(
+        subject=message.subject,
+        body=body,
+        html_body=html_body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+
+
+def build_message(email, connection=None):
+    """Rebuild a Django EmailMessage from an outbox row."""
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body and email.body:
+        message.attach_alternative(email.html_body, "text/html")
+    elif email.html_body:
+        message.body = email.html_body
+        message.content_subtype = "html"
+    return message
+
+
+def claim_batch(batch_size):
+    """
+    Claim up to batch_size due emails by pushing their next_attempt_at past a
+    lease, so concurrent workers skip them. A crashed worker's claim simply
+    expires and the emails are retried.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=ids).update(next_attempt_at=now + CLAIM_LEASE)
+    return list(OutboxEmail.objects.filter(pk__in=ids).order_by("created_at"))
+
+
+def deliver_batch(emails, connection, rate_limit=None):
+    """
+    Send already-claimed emails over one open connection, at most rate_limit
+    messages per second. Failures are rescheduled with exponential backoff
+    until EMAIL_OUTBOX_MAX_ATTEMPTS. Returns (sent, failed, latencies_ms).
+    """
+    rate_limit = settings.EMAIL_OUTBOX_RATE_LIMIT if rate_limit is None else rate_limit
+    interval = 1 / rate_limit if rate_limit else 0
+    sent, failed, latencies = 0, 0, []
+
+    for email in emails:
+        started = time.monotonic()
+        try:
+            # No-op when the connection is already open
+            connection.open()
+            if not connection.send_messages([build_message(email, connection)]):
+                raise SMTPException("Message was not accepted for delivery")
+        except Exception as exc:
+            failed += 1
+            _record_failure(email, exc)
+            # Drop a possibly broken connection; the next send reopens it
+            connection.close()
+        else:
+            sent += 1
+            email.status = "sent"
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.latency_ms = int(
+                (email.sent_at - email.created_at).total_seconds() * 1000
+            )
+            email.last_error = ""
+            email.save(
+                update_fields=[
+                    "status",
+                    "attempts",
+                    "sent_at",
+                    "latency_ms",
+                    "last_error",
+                ]
+            )
+            latencies.append(email.latency_ms)
+
+        elapsed = time.monotonic() - started
+        if interval > elapsed:
+            time.sleep(interval - elapsed)
+
+    return sent, failed, latencies
+
+
+def _record_failure(email, exc):
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = "failed"
+        logger.error("Giving up on outbox email %s: %s", email.pk, email.last_error)
+    else:
+        delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning(
+            "Outbox email %s failed (attempt %s), retrying in %ss: %s",
+            email.pk,
+            email.attempts,
+            delay,
+            email.last_error,
+        )
+    email.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
@@ -0,0 +1,105 @@
+import copy
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core.db import connection_stats
+
+
+class Command(BaseCommand):
+    """
+    Measure per-request database connection overhead.
+
+    Simulates N requests, each running one trivial query, spread over worker
+    threads like a threaded web server, twice:
+      - baseline: a fresh connection per request (CONN_MAX_AGE=0, no pool),
+        which is how the project behaved before connection reuse
+      - configured: each worker's own connection from the current DATABASES
+        settings (pool or persistent connections), released the same way
+        Django's request_finished does
+
+    Connections are per thread, so the configured run's connection_stats are
+    collected by each worker, for the connection it actually used.
+    """
+
+    help = "Benchmark per-request connection overhead before/after connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        threads = max(options["threads"], 1)
+        shares = [
+            len(range(worker, options["requests"], threads))
+            for worker in range(threads)
+        ]
+
+        baseline_settings = copy.deepcopy(connections[alias].settings_dict)
+        baseline_settings["CONN_MAX_AGE"] = 0
+        baseline_settings["OPTIONS"].pop("pool", None)
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            baseline = list(
+                executor.map(
+                    lambda n: self.run_baseline(alias, baseline_settings, n), shares
+                )
+            )
+            configured = list(
+                executor.map(lambda n: self.run_configured(alias, n), shares)
+            )
+
+        baseline_timings = [timing for timings in baseline for timing in timings]
+        configured_timings = [timing for timings, _ in configured for timing in timings]
+        self.report("fresh connection per request", baseline_timings)
+        self.report("configured (pool / persistent)", configured_timings)
+
+        saved = statistics.mean(baseline_timings) - statistics.mean(configured_timings)
+        self.stdout.write(
+            self.style.SUCCESS(f"Average saving per request: {saved:.3f} ms")
+        )
+        for worker, (_, stats) in enumerate(configured):
+            self.stdout.write(f"worker {worker}: {stats}")
+
+    def run_baseline(self, alias, settings_dict, iterations):
+        connection = connections[alias].__class__(
+            settings_dict, alias=f"{alias}_baseline"
+        )
+        return self.run(connection, iterations, fresh=True)
+
+    def run_configured(self, alias, iterations):
+        # connections[alias] is this worker thread's own connection
+        connection = connections[alias]
+        try:
+            timings = self.run(connection, iterations, fresh=False)
+            return timings, connection_stats(alias)
+        finally:
+            connection.close()
+
+    def run(self, connection, iterations, fresh):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            if fresh:
+                connection.close()
+            else:
+                # What close_old_connections() does at the end of a request
+                connection.close_if_unusable_or_obsolete()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{label:<34} mean {statistics.mean(timings):7.3f} ms"
+            f"   p95 {p95:7.3f} ms   n={len(timings)}"
+        )
@@ -0,0 +1,43 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.core.ratelimit import check_rate_limit, request_key
+
+
+class Command(BaseCommand):
+    """
+    Measure what a rate limit check adds to a request.
+
+    Runs the same path as RateLimitMixin (request_key() then
+    check_rate_limit(), i.e. cache add, incr and get) against the configured
+    default cache, under a rate high enough never to reject, so every check
+    takes the full path. Keys expire on their own after two periods.
+    """
+
+    help = "Benchmark the per-request cost of a rate limit check."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--rate", default="1000000/m")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().post("/", REMOTE_ADDR="192.0.2.1")
+        timings = []
+        for _ in range(options["requests"]):
+            start = time.perf_counter()
+            check_rate_limit(
+                "bench_ratelimit", request_key(request, "ip"), options["rate"]
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(f"cache backend: {settings.CACHES['default']['BACKEND']}")
+        self.stdout.write(
+            f"rate limit check   mean {statistics.mean(timings):7.3f} ms"
+            f"   p95 {p95:7.3f} ms   n={len(timings)}"
+        )
@@ -0,0 +1,140 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Mixed read/write throughput of SQLite with and without the production profile.
+
+    Runs the same workload twice against a scratch database file:
+      - baseline: Django's stock SQLite connection (rollback journal,
+        deferred transactions, 5 second busy timeout)
+      - tuned: the pragmas, busy timeout and transaction mode from
+        DATABASES["default"]["OPTIONS"]
+    Writers mimic webhook/wishlist/session writes (short transactions that
+    update a row and insert another); readers mimic catalog browsing.
+    """
+
+    help = "Benchmark concurrent SQLite reads/writes before/after the production profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--rows", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES["default"]
+        if database["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("The default database is not SQLite.")
+
+        tuned = database.get("OPTIONS", {})
+        if not tuned.get("init_command"):
+            self.stdout.write(
+                self.style.WARNING("DATABASE_SQLITE_TUNED is off; comparing baseline to itself.")
+            )
+
+        profiles = [
+            ("baseline", {"timeout": 5}, [], "DEFERRED"),
+            (
+                "tuned",
+                {"timeout": tuned.get("timeout", 5)},
+                [c for c in tuned.get("init_command", "").split(";") if c.strip()],
+                tuned.get("transaction_mode") or "DEFERRED",
+            ),
+        ]
+        for label, connect_kwargs, pragmas, transaction_mode in profiles:
+            result = self.run_profile(
+                connect_kwargs, pragmas, transaction_mode, options
+            )
+            self.stdout.write(
+                f"{label:<9} reads/s {result['reads'] / options['seconds']:9.0f}"
+                f"   writes/s {result['writes'] / options['seconds']:7.0f}"
+                f"   'database is locked' errors {result['locked']}"
+            )
+
+    def run_profile(self, connect_kwargs, pragmas, transaction_mode, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.sqlite3")
+
+            def connect():
+                # Autocommit mode, transactions are opened explicitly below
+                conn = sqlite3.connect(
+                    path, isolation_level=None, check_same_thread=False, **connect_kwargs
+                )
+                for pragma in pragmas:
+                    conn.execute(pragma)
+                return conn
+
+            setup = connect()
+            setup.execute(
+                "CREATE TABLE item (id INTEGER PRIMARY KEY, title TEXT, views INTEGER)"
+            )
+            setup.execute("CREATE TABLE event (id INTEGER PRIMARY KEY, item_id INTEGER)")
+            setup.executemany(
+                "INSERT INTO item (title, views) VALUES (?, 0)",
+                ((f"item {i}",) for i in range(options["rows"])),
+            )
+            setup.close()
+
+            counters = {"reads": 0, "writes": 0, "locked": 0}
+            lock = threading.Lock()
+            deadline = time.perf_counter() + options["seconds"]
+            rows = options["rows"]
+
+            def reader():
+                conn = connect()
+                done = locked = 0
+                while time.perf_counter() < deadline:
+                    try:
+                        start = random.randint(1, rows)
+                        conn.execute(
+                            "SELECT id, title, views FROM item WHERE id >= ? LIMIT 20",
+                            (start,),
+                        ).fetchall()
+                        done += 1
+                    except sqlite3.OperationalError:
+                        locked += 1
+                conn.close()
+                with lock:
+                    counters["reads"] += done
+                    counters["locked"] += locked
+
+            def writer():
+                conn = connect()
+                done = locked = 0
+                while time.perf_counter() < deadline:
+                    item_id = random.randint(1, rows)
+                    try:
+                        conn.execute(f"BEGIN {transaction_mode}")
+                        conn.execute("SELECT views FROM item WHERE id = ?", (item_id,))
+                        conn.execute(
+                            "UPDATE item SET views = views + 1 WHERE id = ?", (item_id,)
+                        )
+                        conn.execute("INSERT INTO event (item_id) VALUES (?)", (item_id,))
+                        conn.execute("COMMIT")
+                        done += 1
+                    except sqlite3.OperationalError:
+                        locked += 1
+                        if conn.in_transaction:
+                            conn.execute("ROLLBACK")
+                conn.close()
+                with lock:
+                    counters["writes"] += done
+                    counters["locked"] += locked
+
+            threads = [threading.Thread(target=reader) for _ in range(options["readers"])]
+            threads += [threading.Thread(target=writer) for _ in range(options["writers"])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            return counters
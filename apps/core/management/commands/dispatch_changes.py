@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.changes import consumers, dispatch_changes, prune_changes
+
+
+class Command(BaseCommand):
+    """
+    Fan out the change outbox to registered consumers (see apps.core.changes).
+
+    Writers only insert a ChangeRecord; snapshot queueing and other
+    reactions to catalog changes run here, each consumer at its own pace.
+    """
+
+    help = "Dispatch catalog changes to consumers (once, or with --loop)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Records handed to each consumer per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new changes instead of exiting when idle.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.CHANGE_OUTBOX_POLL_INTERVAL,
+            help="Seconds to wait between polls when there is nothing to do.",
+        )
+
+    def handle(self, *args, **options):
+        if not consumers:
+            self.stdout.write(self.style.WARNING("No change consumers registered."))
+        try:
+            while True:
+                processed = dispatch_changes(options["batch_size"])
+                if any(processed.values()):
+                    for name, count in processed.items():
+                        if count:
+                            self.stdout.write(f"{name}: {count} changes")
+                    continue
+                pruned = prune_changes()
+                if pruned:
+                    self.stdout.write(f"Pruned {pruned} processed changes")
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import BlogPost
+from apps.core.snapshots import publish_due, queue_snapshot
+from apps.sellers.models import Seller
+
+
+class Command(BaseCommand):
+    """
+    Render queued storefront and blog post snapshots (see apps.core.snapshots).
+
+    Changes only queue a SnapshotJob (via the dispatch_changes worker), so
+    rendering never runs on a request. Run with --all after a deploy that
+    changes templates, to re-render every storefront and published post.
+    """
+
+    help = "Publish static snapshots of changed pages (once, or with --loop)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Pages rendered per batch.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Queue every storefront and published blog post first.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for changed pages instead of exiting when idle.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.SNAPSHOT_POLL_INTERVAL,
+            help="Seconds to wait between polls when there is nothing to do.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SNAPSHOTS_ENABLED:
+            self.stdout.write(
+                self.style.WARNING("SNAPSHOTS_ENABLED is off, nothing to publish.")
+            )
+            return
+        if options["all"]:
+            queue_snapshot(
+                *[seller.get_absolute_url() for seller in Seller.objects.only("slug")],
+                *[
+                    post.get_absolute_url()
+                    for post in BlogPost.objects.filter(status="published").only("slug")
+                ],
+                delay=0,
+            )
+        try:
+            while True:
+                written, removed = publish_due(options["batch_size"])
+                if written or removed:
+                    self.stdout.write(f"Wrote {written} snapshots, removed {removed}")
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
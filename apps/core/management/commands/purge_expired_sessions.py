@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """
+    Delete expired sessions in small batches.
+
+    Unlike `clearsessions`, which issues one large DELETE, each batch is its
+    own short statement so the session table is never locked for long while
+    users are logging in. Cached copies of cached_db sessions expire on their
+    own.
+    """
+
+    help = "Delete expired sessions from the database in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions deleted per statement.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list(
+                    "session_key", flat=True
+                )[: options["batch_size"]]
+            )
+            if not keys:
+                break
+            deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+            total += deleted
+            if len(keys) < options["batch_size"]:
+                break
+            time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} expired sessions."))
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from apps.core.mail import claim_batch, deliver_batch
+
+
+class Command(BaseCommand):
+    """
+    Deliver queued OutboxEmail rows.
+
+    Keeps one connection to EMAIL_OUTBOX_DELIVERY_BACKEND open across batches
+    instead of a handshake per message, paces sends to
+    EMAIL_OUTBOX_RATE_LIMIT and reports enqueue-to-send latency per batch.
+    """
+
+    help = "Send pending emails from the outbox (once, or continuously with --loop)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Emails claimed per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new emails instead of exiting when idle.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help="Seconds to wait between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(settings.EMAIL_OUTBOX_DELIVERY_BACKEND)
+        try:
+            while True:
+                emails = claim_batch(options["batch_size"])
+                if emails:
+                    self.report(*deliver_batch(emails, connection))
+                    continue
+                if not options["loop"]:
+                    break
+                # Idle: release the SMTP session rather than let the server time it out
+                connection.close()
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+    def report(self, sent, failed, latencies):
+        message = f"Sent {sent}, failed {failed}"
+        if latencies:
+            p95 = (
+                statistics.quantiles(latencies, n=20)[-1]
+                if len(latencies) > 1
+                else latencies[0]
+            )
+            message += (
+                f" | latency ms: median {statistics.median(latencies):.0f}"
+                f", p95 {p95:.0f}"
+            )
+        self.stdout.write(message)
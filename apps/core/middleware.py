@@ -0,0 +1,39 @@
+from django.conf import settings
+
+PIN_COOKIE_NAME = "db_primary_pin"
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class PrimaryPinningMiddleware:
+    """
+    Pin a client to the primary database for a short window after it writes.
+
+    Replicas lag the primary slightly, so right after a wishlist edit, an
+    antique edit or a checkout the user must read their own write. A
+    short-lived cookie (rather than a session write) marks the window, and
+    ReplicaReadMixin skips replicas while it is present.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.pin_to_primary = PIN_COOKIE_NAME in request.COOKIES
+
+        response = self.get_response(request)
+
+        pin_seconds = getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 0)
+        if (
+            getattr(settings, "DATABASE_REPLICAS", [])
+            and pin_seconds
+            and request.method in UNSAFE_METHODS
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                "1",
+                max_age=pin_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
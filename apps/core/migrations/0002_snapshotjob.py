@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SnapshotJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.CharField(max_length=500, unique=True)),
+                ("due_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_change_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="changeconsumeroffset",
+            name="gaps",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,7 +1,18 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.urls import reverse_lazy
 from django.core.exceptions import PermissionDenied
 
+from apps.users.backends import get_seller_capabilities
+
+from .ratelimit import is_ratelimited
+from .routers import read_from_replica
+
 
 class SearchableListViewMixin:
     """
@@ -14,6 +25,12 @@ class SearchableListViewMixin:
     prefetch_related_fields = []  # List of fields to prefetch
     select_related_fields = []  # List of fields to select_related
     default_ordering = ["-created_at"]  # Default ordering
+    # Whitelisted ?sort= values: {"value": ("Label", ["field", ...])}. Each
+    # ordering should end with a unique field (cursor pagination needs a total
+    # order) and have a matching index; unknown values fall back to
+    # default_sort, or default_ordering when that is empty.
+    sort_options = {}
+    default_sort = ""
     paginate_by = 20
 
     def get_queryset(self):
@@ -29,10 +46,7 @@ class SearchableListViewMixin:
         # Search functionality
         search = self.request.GET.get("search", "").strip()
         if search and self.search_fields:
-            q_objects = Q()
-            for field in self.search_fields:
-                q_objects |= Q(**{field: search})
-            queryset = queryset.filter(q_objects)
+            queryset = queryset.filter(self.get_search_filter(search))
 
         # Apply custom filters
         for param_name, field_name in self.filter_fields.items():
@@ -41,7 +55,25 @@ class SearchableListViewMixin:
                 queryset = queryset.filter(**{field_name: value})
 
         # Apply ordering
-        return queryset.order_by(*self.default_ordering)
+        return queryset.order_by(*self.get_ordering_fields())
+
+    def get_sort(self):
+        """The whitelisted ?sort= value in effect ("" when there is none)."""
+        sort = self.request.GET.get("sort", "")
+        return sort if sort in self.sort_options else self.default_sort
+
+    def get_ordering_fields(self):
+        sort = self.get_sort()
+        if sort:
+            return self.sort_options[sort][1]
+        return self.default_ordering
+
+    def get_search_filter(self, search):
+        """Override this method to widen or replace the search_fields match."""
+        q_objects = Q()
+        for field in self.search_fields:
+            q_objects |= Q(**{field: search})
+        return q_objects
 
     def get_filter_context(self):
         """Override this method to add filter-specific context data."""
@@ -50,9 +82,130 @@ class SearchableListViewMixin:
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update(self.get_filter_context())
+        context["sort_choices"] = [
+            (value, label) for value, (label, _) in self.sort_options.items()
+        ]
+        context["current_sort"] = self.get_sort()
         return context
 
 
+class RateLimitMixin:
+    """
+    Throttle a view with the shared cache-backed limiter (apps.core.ratelimit).
+    Over-limit requests get a 429 with Retry-After before the view runs.
+    ratelimit_key is "ip", "user" or "user_or_ip".
+    """
+
+    ratelimit_scope = None  # Defaults to the view class name
+    ratelimit_rate = None  # e.g. "5/m"; None disables
+    ratelimit_key = "ip"
+    ratelimit_methods = ("POST",)
+
+    def should_ratelimit(self, request):
+        return request.method in self.ratelimit_methods
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.should_ratelimit(request):
+            response = is_ratelimited(
+                request,
+                self.ratelimit_scope or type(self).__name__,
+                self.ratelimit_rate,
+                self.ratelimit_key,
+            )
+            if response is not None:
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
+
+class SearchRateLimitMixin(RateLimitMixin):
+    """Throttle list views only when a search query is present."""
+
+    ratelimit_rate = settings.RATELIMIT_SEARCH
+    ratelimit_key = "user_or_ip"
+    ratelimit_methods = ("GET",)
+
+    def should_ratelimit(self, request):
+        return super().should_ratelimit(request) and bool(
+            request.GET.get("search", "").strip()
+        )
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe (GET/HEAD) requests from a read replica.
+    Falls back to the primary while the client is pinned after a recent write
+    (see PrimaryPinningMiddleware) or when no replicas are configured.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or getattr(
+            request, "pin_to_primary", False
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        with read_from_replica():
+            response = super().dispatch(request, *args, **kwargs)
+            # Render now so lazy querysets in the template also hit the replica
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer browser revalidations (If-None-Match / If-Modified-Since) with a
+    304 before the page is built.
+
+    Subclasses implement get_last_modified() with a cheap query (updated_at
+    values, not full objects). get_etag_parts() can add anything else the page
+    depends on. The ETag also covers the URL and the current user, so
+    per-user pages are never shared.
+    """
+
+    def get_last_modified(self):
+        """Return the newest change time for this page, or None to skip."""
+        raise NotImplementedError
+
+    def get_etag_parts(self):
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        # Pending flash messages would be swallowed by a 304
+        if request.method not in ("GET", "HEAD") or (
+            CookieStorage.cookie_name in request.COOKIES
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        user = request.user
+        parts = [
+            settings.RELEASE_VERSION,
+            request.get_full_path(),
+            user.pk if user.is_authenticated else "anon",
+            last_modified.isoformat(),
+            *self.get_etag_parts(),
+        ]
+        etag = "W/" + quote_etag(
+            hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+        )
+        timestamp = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+            # Cacheable by the browser only, and always revalidated
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class BaseModelViewMixin:
     """
     Provides automatic template naming, success URLs, and context names.
@@ -115,9 +268,8 @@ class VerifiedSellerRequiredMixin:
     def dispatch(self, request, *args, **kwargs):
         # Check if the user is a verified seller or superuser
         user = request.user
-        if not (
-            user.is_superuser or (hasattr(user, "seller") and user.seller.is_verified)
-        ):
+        capabilities = get_seller_capabilities(user)
+        if not (user.is_superuser or capabilities.is_verified):
             raise PermissionDenied("You must be a verified seller to access this page.")
 
         # For views that involve an existing object, ensure ownership
@@ -126,7 +278,11 @@ class VerifiedSellerRequiredMixin:
                 obj = self.get_object()
             except AttributeError:
                 obj = None
-            if obj and hasattr(obj, "seller") and obj.seller != user.seller:
+            if (
+                obj
+                and hasattr(obj, "seller_id")
+                and obj.seller_id != capabilities.seller_id
+            ):
                 raise PermissionDenied("You do not own this antique.")
 
         return super().dispatch(request, *args, **kwargs)
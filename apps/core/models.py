@@ -1,3 +1,101 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class OutboxEmail(models.Model):
+    """
+    An email queued for delivery by the `send_outbox_email` worker.
+    Rows are written by OutboxEmailBackend inside the caller's transaction,
+    so a rolled-back request never sends its mail.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Also used as a lease: a worker pushes this forward while it sends
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Time from enqueue to SMTP acceptance, in milliseconds
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class SnapshotJob(models.Model):
+    """
+    A page queued to be re-rendered to a static snapshot by the
+    `publish_snapshots` worker (see apps.core.snapshots). One row per path:
+    further changes before it is due join the same render.
+    """
+
+    path = models.CharField(max_length=500, unique=True)
+    due_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Snapshot {self.path} at {self.due_at}"
+
+
+class ChangeRecord(models.Model):
+    """
+    A save or delete of a tracked model, written in the writer's transaction
+    and fanned out to consumers by the `dispatch_changes` worker (see
+    apps.core.changes). data holds the few fields consumers need, so they
+    can act on rows that no longer exist.
+    """
+
+    ACTION_CHOICES = [
+        ("created", "Created"),
+        ("updated", "Updated"),
+        ("deleted", "Deleted"),
+    ]
+
+    model = models.CharField(max_length=100)  # app_label.modelname
+    object_id = models.CharField(max_length=64)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.action}"
+
+
+class ChangeConsumerOffset(models.Model):
+    """
+    How far a change consumer has got: the last ChangeRecord id it processed,
+    plus lower ids it is still waiting for.
+    """
+
+    consumer = models.CharField(max_length=100, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    # Skipped ids below position whose transaction may still commit:
+    # {id: unix time first skipped}
+    gaps = models.JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.consumer} at {self.position}"
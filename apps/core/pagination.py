@@ -0,0 +1,93 @@
+"""
+Keyset ("cursor") pagination.
+
+Instead of OFFSET, each page starts after the last row of the previous one:
+for an ordering (a, -b, id) the next page is
+    a > A OR (a = A AND b < B) OR (a = A AND b = B AND id > ID)
+With an index matching the ordering every page is an index range scan,
+however deep the user scrolls, and rows inserted meanwhile don't shift pages.
+
+Orderings must be total, i.e. end with a unique field such as the pk, and
+use plain (non-null) model fields.
+"""
+
+import base64
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .caching import dumps, loads
+
+
+def keyset_filter(ordering, values):
+    """Q selecting the rows after `values` (one per ordering field)."""
+    after = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        after |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return after
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(dumps(list(values))).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """The values encoded in cursor; ValueError if it is malformed."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = loads(data)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def clean_cursor_values(model, ordering, values):
+    """
+    values converted by the ordering fields' to_python(); ValueError if one
+    doesn't fit its field or is None (a forged cursor).
+    """
+    if len(values) != len(ordering):
+        raise ValueError("Invalid cursor")
+    cleaned = []
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        model_field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        try:
+            value = model_field.to_python(value)
+        except (ValidationError, TypeError, ValueError) as exc:
+            raise ValueError("Invalid cursor") from exc
+        if value is None:
+            raise ValueError("Invalid cursor")
+        cleaned.append(value)
+    return cleaned
+
+
+def cursor_page(queryset, ordering, cursor=None, per_page=20):
+    """
+    One page of queryset in `ordering`, starting after `cursor` (a value
+    from a previous call; invalid cursors restart from the first page).
+    Returns (objects, cursor for the next page or None on the last page).
+    """
+    if cursor:
+        try:
+            values = clean_cursor_values(
+                queryset.model, ordering, decode_cursor(cursor)
+            )
+        except ValueError:
+            pass
+        else:
+            queryset = queryset.filter(keyset_filter(ordering, values))
+    objects = list(queryset.order_by(*ordering)[: per_page + 1])
+    if len(objects) <= per_page:
+        return objects, None
+    objects = objects[:per_page]
+    last = objects[-1]
+    return objects, encode_cursor(
+        getattr(last, field.lstrip("-")) for field in ordering
+    )
@@ -0,0 +1,116 @@
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """Parse "5/m", "100/h" or "3/10m" into (limit, period_seconds)."""
+    match = RATE_RE.match(rate.replace(" ", ""))
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}, expected e.g. '5/m' or '3/10m'")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * UNIT_SECONDS[unit]
+
+
+def client_ip(request):
+    if settings.RATELIMIT_USE_X_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            # The proxy appends the address it saw, so the last entry is the
+            # one a client can't spoof
+            return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def request_key(request, key):
+    """Build the identity part of a rate limit key: "ip", "user" or "user_or_ip"."""
+    user = getattr(request, "user", None)
+    is_authenticated = user is not None and user.is_authenticated
+    if key == "user" or (key == "user_or_ip" and is_authenticated):
+        return f"user:{user.pk}" if is_authenticated else f"ip:{client_ip(request)}"
+    return f"ip:{client_ip(request)}"
+
+
+def check_rate_limit(scope, identity, rate):
+    """
+    Sliding-window counter shared through the cache.
+
+    Counts hits in fixed windows and weights the previous window by how much of
+    it still overlaps the sliding window. add()/incr() are atomic on Redis and
+    memcached, so the limit holds across processes. Only the first hit of a
+    window pays for the add(). Returns (allowed, retry_after_seconds).
+    """
+    limit, period = parse_rate(rate)
+    now = time.time()
+    window = int(now // period)
+    elapsed = now - window * period
+
+    current_key = f"rl:{scope}:{identity}:{window}"
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # First hit of the window; keep it long enough to serve as the
+        # "previous" one. Losing the add() race means another hit created it.
+        if cache.add(current_key, 1, timeout=period * 2):
+            current = 1
+        else:
+            current = cache.incr(current_key)
+    previous = cache.get(f"rl:{scope}:{identity}:{window - 1}", 0)
+
+    estimated = previous * (period - elapsed) / period + current
+    if estimated <= limit:
+        return True, 0
+
+    if current > limit or not previous:
+        retry_after = period - elapsed
+    else:
+        # Wait until enough of the previous window has slid out
+        retry_after = period * (1 - (limit - current) / previous) - elapsed
+    return False, max(1, math.ceil(retry_after))
+
+
+def ratelimited_response(request, retry_after):
+    message = f"Too many requests. Please try again in {retry_after} seconds."
+    if "application/json" in request.headers.get("Accept", "") or request.headers.get(
+        "Content-Type", ""
+    ).startswith("application/json"):
+        response = JsonResponse({"success": False, "message": message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain")
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def is_ratelimited(request, scope, rate, key="ip"):
+    """Return the 429 response if the request is over its limit, else None."""
+    if not settings.RATELIMIT_ENABLED or not rate:
+        return None
+    allowed, retry_after = check_rate_limit(scope, request_key(request, key), rate)
+    if allowed:
+        return None
+    return ratelimited_response(request, retry_after)
+
+
+def ratelimit(scope, rate, key="ip", methods=("POST",)):
+    """Rate limit a function view; see RateLimitMixin for class-based views."""
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                response = is_ratelimited(request, scope, rate, key)
+                if response is not None:
+                    return response
+            return view_func(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
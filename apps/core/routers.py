@@ -0,0 +1,42 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Set for the duration of a request that is allowed to read from a replica
+_use_replica = ContextVar("use_replica", default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads inside this block to a replica (if any are configured)."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to a random replica only when a view opted in via
+    ReplicaReadMixin; everything else (writes, webhooks, orders, auth, admin)
+    stays on the primary "default" database.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so cross-alias relations are the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -0,0 +1,216 @@
+"""
+Pre-rendered HTML snapshots of rarely changing, often linked pages.
+
+Seller storefronts and blog posts are rendered as an anonymous visitor to
+SNAPSHOT_ROOT/<url path>/index.html, with gzip/Brotli variants from
+WhiteNoise's compressor, by the `publish_snapshots` worker.
+SnapshotMiddleware serves an existing snapshot to anonymous GET/HEAD
+requests without a query string, before sessions, auth or the view run,
+and falls through to the dynamic view when there is none.
+
+Change consumers (see apps.core.changes) call queue_snapshot(), which
+inserts a SnapshotJob for the URL unless one is already waiting. A job is
+due SNAPSHOT_DEBOUNCE seconds after the first change, so a burst of edits (a
+seller updating twenty listings) is rendered once. Pages that no longer
+render (a deleted or unpublished post) have their snapshot removed.
+"""
+
+import logging
+import os
+import re
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import FileResponse
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.test import Client
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from whitenoise.compress import Compressor
+
+from .models import SnapshotJob
+
+logger = logging.getLogger(__name__)
+
+# (suffix, Content-Encoding), best first
+ENCODINGS = [(".br", "br"), (".gz", "gzip")]
+
+# Sent by the renderer so it never gets the snapshot it is replacing
+RENDER_HEADER = "HTTP_X_SNAPSHOT_RENDER"
+
+
+def snapshot_file(path):
+    """The index.html for a URL path; SuspiciousFileOperation if it escapes."""
+    return safe_join(settings.SNAPSHOT_ROOT, path.strip("/"), "index.html")
+
+
+def queue_snapshot(*paths, delay=None):
+    """
+    Schedule paths for re-rendering in delay seconds (SNAPSHOT_DEBOUNCE by
+    default). Paths already waiting keep their job.
+    """
+    if not settings.SNAPSHOTS_ENABLED:
+        return
+    delay = settings.SNAPSHOT_DEBOUNCE if delay is None else delay
+    due_at = timezone.now() + timedelta(seconds=delay)
+    SnapshotJob.objects.bulk_create(
+        [SnapshotJob(path=path, due_at=due_at) for path in paths if path],
+        ignore_conflicts=True,
+    )
+
+
+def claim_due(batch_size):
+    """Take up to batch_size due paths off the queue."""
+    with transaction.atomic():
+        jobs = list(
+            SnapshotJob.objects.select_for_update(skip_locked=True)
+            .filter(due_at__lte=timezone.now())
+            .order_by("due_at")
+            .values_list("pk", "path")[:batch_size]
+        )
+        # Changes from here on queue a fresh job instead of joining this one
+        SnapshotJob.objects.filter(pk__in=[pk for pk, _ in jobs]).delete()
+    return [path for _, path in jobs]
+
+
+def render_snapshot(path):
+    """The page's HTML as an anonymous visitor sees it, or None if not a 200."""
+    client = Client(raise_request_exception=False, SERVER_NAME=settings.SNAPSHOT_HOST)
+    response = client.get(path, secure=True, **{RENDER_HEADER: "1"})
+    if response.status_code >= 500:
+        logger.warning("Snapshot of %s failed with %s", path, response.status_code)
+    if response.status_code != 200 or not response.get(
+        "Content-Type", ""
+    ).startswith("text/html"):
+        return None
+    return response.content
+
+
+def write_snapshot(path, content):
+    """Atomically replace the snapshot (and its compressed variants)."""
+    target = snapshot_file(path)
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".html")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.chmod(tmp, 0o644)
+        # Compressor skips variants that don't save enough; drop stale ones
+        written = set(Compressor(quiet=True).compress(tmp))
+        for suffix, _ in ENCODINGS:
+            if tmp + suffix in written:
+                os.replace(tmp + suffix, target + suffix)
+            elif os.path.exists(target + suffix):
+                os.remove(target + suffix)
+        os.replace(tmp, target)
+    finally:
+        for leftover in (tmp, *(tmp + suffix for suffix, _ in ENCODINGS)):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def remove_snapshot(path):
+    target = snapshot_file(path)
+    for filename in (target, *(target + suffix for suffix, _ in ENCODINGS)):
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def publish_due(batch_size):
+    """Render due snapshots. Returns (written, removed)."""
+    written = removed = 0
+    for path in claim_due(batch_size):
+        try:
+            content = render_snapshot(path)
+            if content is None:
+                remove_snapshot(path)
+                removed += 1
+            else:
+                write_snapshot(path, content)
+                written += 1
+        except Exception:
+            logger.exception("Could not publish snapshot of %s", path)
+            queue_snapshot(path)
+    return written, removed
+
+
+class SnapshotMiddleware:
+    """
+    Serve pre-rendered snapshots to anonymous visitors.
+
+    Only full-page GET/HEAD requests without a query string, session cookie
+    or pending flash messages qualify, so signed-in users always get the
+    dynamic page (wishlist hearts, seller controls). Place it right after
+    WhiteNoise.
+    """
+
+    accept_encoding_re = {
+        encoding: re.compile(rf"\b{encoding}\b") for _, encoding in ENCODINGS
+    }
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Snapshots are answered before XFrameOptionsMiddleware runs
+        self.xframe_options = XFrameOptionsMiddleware(get_response)
+
+    def __call__(self, request):
+        response = self.serve(request) if settings.SNAPSHOTS_ENABLED else None
+        return response or self.get_response(request)
+
+    def serve(self, request):
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.META.get("QUERY_STRING")
+            or RENDER_HEADER in request.META
+            or "HTTP_HX_REQUEST" in request.META
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+            or CookieStorage.cookie_name in request.COOKIES
+        ):
+            return None
+        try:
+            target = snapshot_file(request.path)
+            stat = os.stat(target)
+        except (OSError, ValueError, SuspiciousFileOperation):
+            return None
+
+        etag = quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(stat.st_mtime)
+        )
+        if response is None:
+            accept = request.META.get("HTTP_ACCEPT_ENCODING", "")
+            filename, content_encoding = target, None
+            for suffix, encoding in ENCODINGS:
+                if self.accept_encoding_re[encoding].search(
+                    accept
+                ) and os.path.exists(target + suffix):
+                    filename, content_encoding = target + suffix, encoding
+                    break
+            try:
+                response = FileResponse(
+                    open(filename, "rb"), content_type="text/html; charset=utf-8"
+                )
+            except FileNotFoundError:
+                # Removed between the stat and the open
+                return None
+            response.headers.pop("Content-Disposition", None)
+            if content_encoding:
+                response["Content-Encoding"] = content_encoding
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["X-Snapshot"] = "hit"
+        # Same URL is dynamic for signed-in users
+        patch_vary_headers(response, ["Accept-Encoding", "Cookie"])
+        patch_cache_control(response, private=True, no_cache=True)
+        return self.xframe_options.process_response(request, response)
@@ -0,0 +1,73 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+from apps.core.caching import TwoTierCache
+
+register = template.Library()
+
+fragment_cache = TwoTierCache("fragments", timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, obj, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.obj = obj
+        self.vary_on = vary_on
+
+    def render(self, context):
+        obj = self.obj.resolve(context)
+        version = getattr(obj, "updated_at", None)
+        if version is None:
+            return self.nodelist.render(context)
+
+        vary_on = "|".join(str(var.resolve(context)) for var in self.vary_on)
+        key = ":".join(
+            [
+                str(self.name.resolve(context)),
+                obj._meta.label_lower,
+                str(obj.pk),
+                str(version.timestamp()),
+                settings.RELEASE_VERSION,
+                hashlib.md5(vary_on.encode()).hexdigest(),
+            ]
+        )
+        return mark_safe(
+            fragment_cache.get_or_set(key, lambda: str(self.nodelist.render(context)))
+        )
+
+
+@register.tag
+def cachefragment(parser, token):
+    """
+    Cache the rendered block per object version:
+
+        {% load fragment_cache %}
+        {% cachefragment "antique-card" antique %}
+          <c-item-card ...>...</c-item-card>
+        {% endcachefragment %}
+
+    The key is the fragment name, the object's id and updated_at (image
+    changes bump an antique's updated_at), RELEASE_VERSION, and any extra
+    arguments given after the object. Editing the object therefore renders a
+    fresh card without any explicit invalidation.
+
+    Keep anything user-specific (wishlist hearts, CSRF forms) outside the
+    block and render it alongside, so one cached card serves every visitor.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a fragment name and an object."
+        )
+    nodelist = parser.parse(("endcachefragment",))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
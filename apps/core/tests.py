@@ -1,3 +1,524 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.mail import get_connection, send_mail
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+
+from apps.antiques.caches import catalog_cache
+from apps.antiques.models import Antique, Category
+from apps.antiques.signals import snapshot_storefronts
+from apps.blog.models import BlogPost
+from apps.blog.signals import snapshot_blog_posts
+from apps.sellers.models import Seller
+from apps.users.views import LoginView
+
+from .buffers import BufferedWriter
+from .checks import check_vendor_assets_deploy, vendor_assets
+from .changes import consumers, dispatch_changes, prune_changes
+from .mail import CLAIM_LEASE, claim_batch, deliver_batch
+from .models import ChangeConsumerOffset, ChangeRecord, OutboxEmail, SnapshotJob
+from .ratelimit import check_rate_limit, parse_rate
+from .snapshots import publish_due, queue_snapshot, write_snapshot
+
+
+class AnonymousSessionTests(TestCase):
+    """Anonymous catalog and blog GETs must not create or load a session."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        cls.seller = Seller.objects.create(
+            user=user, store_name="Old Curiosity Shop", is_verified=True
+        )
+        # Price 0 skips the Stripe product signal
+        cls.antique = Antique.objects.create(
+            title="Oak Chair",
+            user=user,
+            seller=cls.seller,
+            price=0,
+            description="Victorian oak chair",
+            content="Victorian oak chair",
+            type_of_antique="Chair",
+        )
+        cls.post = BlogPost.objects.create(
+            title="Caring for Oak", user=user, content="Wax it.", status="published"
+        )
+
+    def anonymous_urls(self):
+        return [
+            reverse("antiques:antique-list"),
+            reverse("antiques:antique-list") + "?search=oak",
+            reverse("antiques:antique-detail", kwargs={"slug": self.antique.slug}),
+            reverse("sellers:seller-detail", kwargs={"slug": self.seller.slug}),
+            reverse("blog:blogpost-list"),
+            reverse("blog:blogpost-detail", kwargs={"slug": self.post.slug}),
+        ]
+
+    def test_anonymous_get_is_session_free(self):
+        for url in self.anonymous_urls():
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("sessionid", response.cookies)
+                self.assertFalse(response.wsgi_request.session.modified)
+                self.assertFalse(
+                    [q["sql"] for q in queries if "django_session" in q["sql"]]
+                )
+
+        self.assertFalse(Session.objects.exists())
+
+
+class SnapshotTests(TestCase):
+    """Pre-rendered pages are served to anonymous visitors only."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("seller", "seller@example.com", "password")
+        cls.seller = Seller.objects.create(
+            user=user, store_name="Old Curiosity Shop", is_verified=True
+        )
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings = override_settings(
+            SNAPSHOTS_ENABLED=True, SNAPSHOT_ROOT=self.root, SNAPSHOT_HOST="testserver"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.url = self.seller.get_absolute_url()
+
+    def test_queue_is_debounced(self):
+        SnapshotJob.objects.all().delete()
+        queue_snapshot(self.url)
+        queue_snapshot(self.url)
+        self.assertEqual(SnapshotJob.objects.filter(path=self.url).count(), 1)
+
+    def test_publish_writes_snapshot(self):
+        SnapshotJob.objects.all().delete()
+        queue_snapshot(self.url, delay=0)
+        self.assertEqual(publish_due(10), (1, 0))
+        self.assertFalse(SnapshotJob.objects.exists())
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Snapshot"], "hit")
+        self.assertIn(b"Old Curiosity Shop", b"".join(response.streaming_content))
+
+    def test_signed_in_and_query_requests_are_dynamic(self):
+        write_snapshot(self.url, b"<html>snapshot</html>")
+        self.assertEqual(self.client.get(self.url)["X-Snapshot"], "hit")
+        self.assertNotIn("X-Snapshot", self.client.get(self.url + "?cursor=x"))
+
+        self.client.force_login(self.seller.user)
+        self.assertNotIn("X-Snapshot", self.client.get(self.url))
+
+    def test_conditional_get(self):
+        write_snapshot(self.url, b"<html>snapshot</html>")
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_snapshots_keep_clickjacking_protection(self):
+        write_snapshot(self.url, b"<html>snapshot</html>")
+        self.assertEqual(self.client.get(self.url)["X-Frame-Options"], "DENY")
+
+    def test_renamed_post_drops_the_old_snapshot(self):
+        post = BlogPost.objects.create(
+            title="Caring for Oak", user=self.seller.user, status="published"
+        )
+        old_url = post.get_absolute_url()
+        post.slug = "oak-care"
+        post.save()
+        SnapshotJob.objects.all().delete()
+
+        snapshot_blog_posts([ChangeRecord.objects.latest("pk")])
+        jobs = dict(SnapshotJob.objects.values_list("path", "due_at"))
+        self.assertEqual(set(jobs), {old_url, post.get_absolute_url()})
+        self.assertLess(jobs[old_url], jobs[post.get_absolute_url()])
+
+    def test_moved_antique_refreshes_both_storefronts(self):
+        other = Seller.objects.create(
+            user=User.objects.create_user("other", "other@example.com", "password"),
+            store_name="Bric-a-brac",
+        )
+        # Price 0 skips the Stripe product signal
+        antique = Antique.objects.create(
+            title="Oak Chair", user=self.seller.user, seller=self.seller, price=0
+        )
+        antique.seller = other
+        antique.save()
+        SnapshotJob.objects.all().delete()
+
+        snapshot_storefronts([ChangeRecord.objects.latest("pk")])
+        self.assertEqual(
+            set(SnapshotJob.objects.values_list("path", flat=True)),
+            {self.url, other.get_absolute_url()},
+        )
+
+
+@override_settings(CHANGE_OUTBOX_RETENTION=0)
+class ChangeOutboxTests(TestCase):
+    """Changes are recorded with the write and reach each consumer once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("seller", "s@example.com", "password")
+
+    def setUp(self):
+        self.received = []
+        registry = mock.patch.dict(consumers, clear=True)
+        registry.start()
+        self.addCleanup(registry.stop)
+        consumers["seen"] = (self.received.extend, {"blog.blogpost"})
+
+    def create_post(self, title="Caring for Oak"):
+        return BlogPost.objects.create(
+            title=title, user=self.user, content="Wax it.", status="published"
+        )
+
+    def test_saves_and_deletes_are_recorded(self):
+        post = self.create_post()
+        post.delete()
+        self.assertEqual(
+            list(
+                ChangeRecord.objects.filter(model="blog.blogpost").values_list(
+                    "action", "data"
+                )
+            ),
+            [("created", {"slug": post.slug}), ("deleted", {"slug": post.slug})],
+        )
+
+    def test_rolled_back_write_leaves_no_record(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.create_post()
+            raise RuntimeError
+        self.assertFalse(ChangeRecord.objects.filter(model="blog.blogpost").exists())
+
+    def test_consumers_keep_separate_offsets(self):
+        failing = mock.Mock(side_effect=RuntimeError("index down"))
+        consumers["failing"] = (failing, None)
+        dispatch_changes()  # new consumers start at the end of the outbox
+        post = self.create_post()
+
+        dispatch_changes()
+        self.assertEqual([record.object_id for record in self.received], [str(post.pk)])
+        offset = ChangeConsumerOffset.objects.get(consumer="failing")
+        self.assertIn("index down", offset.last_error)
+
+        failing.side_effect = None
+        self.assertEqual(dispatch_changes()["seen"], 0)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(failing.call_args.args[0][-1].object_id, str(post.pk))
+
+    def test_late_commit_below_the_offset_is_delivered(self):
+        dispatch_changes()
+        first = self.create_post().pk
+        record = ChangeRecord.objects.latest("pk")
+        # A transaction holding record.pk + 1 commits after record.pk + 2
+        ChangeRecord.objects.create(
+            pk=record.pk + 2, model=record.model, object_id="late", action="updated"
+        )
+        dispatch_changes()
+        offset = ChangeConsumerOffset.objects.get(consumer="seen")
+        self.assertEqual(list(offset.gaps), [str(record.pk + 1)])
+
+        ChangeRecord.objects.create(
+            pk=record.pk + 1, model=record.model, object_id="slow", action="updated"
+        )
+        dispatch_changes()
+        self.assertEqual(
+            [r.object_id for r in self.received], [str(first), "late", "slow"]
+        )
+        offset.refresh_from_db()
+        self.assertEqual(offset.gaps, {})
+
+    def test_prune_keeps_unprocessed_records(self):
+        dispatch_changes()
+        self.create_post()
+        prune_changes()
+        self.assertTrue(ChangeRecord.objects.exists())
+        dispatch_changes()
+        prune_changes()
+        self.assertFalse(ChangeRecord.objects.exists())
+
+
+class CacheInvalidationTests(TestCase):
+    """Tag versions are bumped after the write commits, not before."""
+
+    def setUp(self):
+        cache.clear()
+
+    def cached(self, value):
+        return catalog_cache.get_or_set("probe", lambda: value, tags=["antiques"])
+
+    def test_invalidation_waits_for_commit(self):
+        self.cached("old")
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Clocks")
+            # A reader before the commit must not cache under the new version
+            self.assertEqual(self.cached("pre-commit"), "old")
+        self.assertEqual(self.cached("new"), "new")
+
+
+class SingleFlightLockTests(TestCase):
+    """Recomputes only ever release their own cross-process lock."""
+
+    def setUp(self):
+        cache.clear()
+        catalog_cache.clear()
+        self.lock_key = f"lock:{catalog_cache.namespace}:probe"
+
+    @override_settings(CACHE_LOCK_TIMEOUT=0)
+    def test_compute_after_waiting_leaves_the_holders_lock(self):
+        catalog_cache.backend.add(self.lock_key, "theirs")
+        self.assertEqual(catalog_cache.get_or_set("probe", lambda: 1), 1)
+        self.assertEqual(catalog_cache.backend.get(self.lock_key), "theirs")
+
+    def test_expired_lock_taken_by_another_process_is_kept(self):
+        def compute():
+            # Our lock expired mid-compute and another process took it
+            catalog_cache.backend.set(self.lock_key, "theirs")
+            return 1
+
+        self.assertEqual(catalog_cache.get_or_set("probe", compute), 1)
+        self.assertEqual(catalog_cache.backend.get(self.lock_key), "theirs")
+
+    def test_own_lock_is_released(self):
+        catalog_cache.get_or_set("probe", lambda: 1)
+        self.assertIsNone(catalog_cache.backend.get(self.lock_key))
+
+
+@override_settings(
+    EMAIL_OUTBOX_RATE_LIMIT=0,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    EMAIL_OUTBOX_RETRY_DELAY=30,
+)
+class OutboxEmailTests(TestCase):
+    """Queued mail commits with the caller and is sent in leased batches."""
+
+    def queue(self, n, **fields):
+        return OutboxEmail.objects.bulk_create(
+            [
+                OutboxEmail(
+                    subject=f"Order {i}",
+                    body="Thanks",
+                    from_email="shop@example.com",
+                    to=["buyer@example.com"],
+                    **fields,
+                )
+                for i in range(n)
+            ]
+        )
+
+    def smtp(self):
+        return get_connection(
+            "django.core.mail.backends.smtp.EmailBackend", host="smtp.example.com"
+        )
+
+    def test_queued_mail_rolls_back_with_the_transaction(self):
+        connection = get_connection("apps.core.mail.OutboxEmailBackend")
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            send_mail("Hi", "Body", None, ["buyer@example.com"], connection=connection)
+            raise RuntimeError
+        self.assertFalse(OutboxEmail.objects.exists())
+        send_mail("Hi", "Body", None, ["buyer@example.com"], connection=connection)
+        self.assertEqual(OutboxEmail.objects.get().status, "pending")
+
+    def test_claimed_emails_are_leased(self):
+        self.queue(3)
+        self.queue(1, next_attempt_at=timezone.now() + timedelta(hours=1))
+        claimed = claim_batch(2)
+        self.assertEqual(len(claimed), 2)
+        for email in claimed:
+            self.assertGreater(email.next_attempt_at, timezone.now() + CLAIM_LEASE / 2)
+        # Only the unclaimed due email is left for the next worker
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
+
+    @mock.patch("django.core.mail.backends.smtp.smtplib.SMTP")
+    def test_batch_reuses_one_smtp_connection(self, smtp):
+        emails = self.queue(3)
+        self.assertEqual(deliver_batch(emails, self.smtp())[:2], (3, 0))
+        smtp.assert_called_once()
+        self.assertEqual(smtp.return_value.sendmail.call_count, 3)
+        self.assertEqual(
+            set(OutboxEmail.objects.values_list("status", flat=True)), {"sent"}
+        )
+
+    @mock.patch("django.core.mail.backends.smtp.smtplib.SMTP")
+    def test_failures_back_off_then_give_up(self, smtp):
+        smtp.return_value.sendmail.side_effect = SMTPException("421 try later")
+        (email,) = self.queue(1)
+        for attempt, delay in [(1, 30), (2, 60)]:
+            started = timezone.now()
+            self.assertEqual(deliver_batch([email], self.smtp())[:2], (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ("pending", attempt))
+            self.assertGreaterEqual(
+                email.next_attempt_at, started + timedelta(seconds=delay)
+            )
+            self.assertIn("421 try later", email.last_error)
+        deliver_batch([email], self.smtp())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("failed", 3))
+
+    @mock.patch("django.core.mail.backends.smtp.smtplib.SMTP")
+    def test_failure_reopens_the_connection(self, smtp):
+        smtp.return_value.sendmail.side_effect = [SMTPException("reset"), {}]
+        self.assertEqual(deliver_batch(self.queue(2), self.smtp())[:2], (1, 1))
+        self.assertEqual(smtp.call_count, 2)
+
+
+class RateLimitTests(TestCase):
+    """Sliding-window counts and the 429 they lead to."""
+
+    def setUp(self):
+        cache.clear()
+        clock = mock.patch("apps.core.ratelimit.time")
+        self.time = clock.start().time
+        self.addCleanup(clock.stop)
+
+    def hits(self, n, at, rate="10/m"):
+        self.time.return_value = at
+        return [check_rate_limit("test", "ip:1", rate) for _ in range(n)]
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("5/m"), (5, 60))
+        self.assertEqual(parse_rate("3 / 10m"), (3, 600))
+        self.assertEqual(parse_rate("100/h"), (100, 3600))
+        with self.assertRaises(ValueError):
+            parse_rate("5/week")
+
+    def test_limit_within_one_window(self):
+        start = 60 * 1000
+        self.assertEqual(self.hits(10, start), [(True, 0)] * 10)
+        self.assertEqual(self.hits(1, start + 15), [(False, 45)])
+
+    def test_previous_window_slides_out(self):
+        start = 60 * 1000
+        self.hits(11, start)
+        # Half of the previous window's 11 hits still count: 5.5 + 4 <= 10
+        self.assertEqual(self.hits(4, start + 90), [(True, 0)] * 4)
+        # 5.5 + 5 > 10; 5 of 11 more previous hits must slide out, which
+        # takes 60 * 6/11 - 30 = 2.7s
+        self.assertEqual(self.hits(1, start + 90), [(False, 3)])
+        # Two windows later nothing from the first one counts
+        self.assertEqual(self.hits(10, start + 180), [(True, 0)] * 10)
+
+    def test_identities_and_scopes_are_counted_apart(self):
+        self.time.return_value = 60 * 1000
+        self.assertTrue(check_rate_limit("test", "ip:1", "1/m")[0])
+        self.assertTrue(check_rate_limit("test", "ip:2", "1/m")[0])
+        self.assertTrue(check_rate_limit("other", "ip:1", "1/m")[0])
+        self.assertFalse(check_rate_limit("test", "ip:1", "1/m")[0])
+
+
+class RateLimitViewTests(TestCase):
+    """Over-limit requests are answered with 429 and Retry-After."""
+
+    url = reverse_lazy("users:login")
+    data = {"email": "nobody@example.com", "password": "wrong"}
+
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch.object(LoginView, "ratelimit_rate", "2/m")
+    def test_login_is_throttled_per_ip(self):
+        for _ in range(2):
+            self.assertNotEqual(self.client.post(self.url, self.data).status_code, 429)
+        response = self.client.post(self.url, self.data)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response["Retry-After"]) <= 60)
+        # Another client isn't affected
+        other = self.client.post(self.url, self.data, REMOTE_ADDR="192.0.2.7")
+        self.assertNotEqual(other.status_code, 429)
+
+    @mock.patch.object(LoginView, "ratelimit_rate", "1/m")
+    def test_json_clients_get_json(self):
+        self.client.post(self.url, self.data)
+        response = self.client.post(self.url, self.data, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(response.json()["success"], False)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    @mock.patch.object(LoginView, "ratelimit_rate", "1/m")
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertNotEqual(self.client.post(self.url, self.data).status_code, 429)
+
+
+class ListBuffer(BufferedWriter):
+    interval = 3600
+    max_size = 3
+
+    def __init__(self):
+        super().__init__()
+        self.items, self.written = [], []
+        self.flushed = threading.Event()
+
+    def record(self, item):
+        with self._lock:
+            self.items.append(item)
+            self._recorded()
+
+    def size(self):
+        return len(self.items)
+
+    def flush(self):
+        with self._lock:
+            items, self.items = self.items, []
+        self.written.append((threading.current_thread().name, items))
+        self.flushed.set()
+
+
+class BufferedWriterTests(SimpleTestCase):
+    """Full buffers are flushed by their own thread, never by the recorder."""
+
+    def test_full_buffer_wakes_the_flush_thread(self):
+        buffer = ListBuffer()
+        buffer.record(1)
+        buffer.record(2)
+        self.assertFalse(buffer.flushed.wait(0.1))
+        buffer.record(3)
+        self.assertTrue(buffer.flushed.wait(5))
+        self.assertEqual(buffer.written, [("ListBuffer-flush", [1, 2, 3])])
+
+
+class VendorAssetTests(SimpleTestCase):
+    """Missing vendored assets block deploys and build_static."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        patcher = mock.patch("apps.core.checks.vendor_root", return_value=self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_missing_assets_are_a_deploy_error(self):
+        errors = check_vendor_assets_deploy(None)
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+        self.assertIn("htmx/htmx.min.js", errors[0].msg)
+        with self.assertRaises(CommandError):
+            call_command("build_static")
+
+    def test_complete_vendor_directory_passes(self):
+        for path in vendor_assets():
+            os.makedirs(os.path.dirname(os.path.join(self.root, path)), exist_ok=True)
+            open(os.path.join(self.root, path), "w").close()
+        self.assertEqual(check_vendor_assets_deploy(None), [])
@@ -6,6 +6,8 @@ from .views import (
         AboutView,
         TermsOfServiceView,
         PrivacyPolicyView,
+        DatabaseStatsView,
+        CacheStatsView,
         )
 
 urlpatterns = [
@@ -14,4 +16,6 @@ urlpatterns = [
     path("about/", AboutView.as_view(), name="about"),
     path("terms-of-service/", TermsOfServiceView.as_view(), name="terms-of-service"),
     path("privacy-policy/", PrivacyPolicyView.as_view(), name="privacy-policy"),
+    path("health/db/", DatabaseStatsView.as_view(), name="db-stats"),
+    path("health/cache/", CacheStatsView.as_view(), name="cache-stats"),
 ]
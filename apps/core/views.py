@@ -1,9 +1,16 @@
+from braces.views import SuperuserRequiredMixin
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import connections
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.urls import reverse_lazy
+from django.views import View
 from django.views.generic import RedirectView, TemplateView
 
+from .caching import cache_stats
+from .db import connection_stats
+
 
 class IndexView(RedirectView):
     """
@@ -36,3 +43,23 @@ class TermsOfServiceView(TemplateView):
 
 class PrivacyPolicyView(TemplateView):
     template_name = "core/about/privacy_policy.html"
+
+
+class DatabaseStatsView(SuperuserRequiredMixin, View):
+    """Connection pool / persistent connection metrics for each database."""
+
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(
+            {"databases": [connection_stats(alias) for alias in connections]}
+        )
+
+
+class CacheStatsView(SuperuserRequiredMixin, View):
+    """Hit/miss counters and in-process memory for each two-tier cache namespace."""
+
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"namespaces": cache_stats()})
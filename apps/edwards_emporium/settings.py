@@ -1,3 +1,4 @@
+import copy
 import os
 from pathlib import Path
 
@@ -60,6 +61,7 @@ INSTALLED_APPS = [
     "apps.sellers.apps.SellersConfig",
     "apps.payments",
     # third party
+    "compressor",
     "django_cotton",
     "django_viewcomponent",
     # allauth
@@ -74,13 +76,17 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",  # Serves hashed, precompressed static files
+    "apps.core.snapshots.SnapshotMiddleware",  # Pre-rendered pages for anonymous visitors
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
+    "apps.users.middleware.LegacyBackendSessionMiddleware",  # Before auth reads it
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",  # Required for allauth
+    "apps.core.middleware.PrimaryPinningMiddleware",  # Read-your-writes for replicas
 ]
 
 ROOT_URLCONF = "apps.edwards_emporium.urls"
@@ -117,6 +123,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "apps.edwards_emporium.wsgi.application"
 
+# Bump on deploy so browsers revalidate pages whose templates changed
+# (part of every ETag, see apps.core.mixins.ConditionalGetMixin)
+RELEASE_VERSION = config("RELEASE_VERSION", default="1")
+
 
 # ==============================================================================
 # DATABASE CONFIGURATION
@@ -132,7 +142,15 @@ WSGI_APPLICATION = "apps.edwards_emporium.wsgi.application"
 # PostgreSQL (production recommended):
 #   - Set DATABASE_ENGINE=postgresql in .env
 #   - Configure DATABASE_NAME, DATABASE_USER, DATABASE_PASSWORD, etc.
-#   - Requires psycopg2-binary: pip install psycopg2-binary
+#   - Requires psycopg 3: pip install "psycopg[binary,pool]"
+#
+# Connection reuse (PostgreSQL):
+#   - DATABASE_POOL=True uses psycopg's native connection pool (recommended).
+#     Requests borrow an already-authenticated connection instead of paying a
+#     TCP + auth handshake each time.
+#   - Without the pool, DATABASE_CONN_MAX_AGE keeps one persistent connection
+#     per worker thread. Django does not allow both at once.
+#   - Measure the difference with: python manage.py bench_db_connections
 # ==============================================================================
 
 # Get database engine from environment (defaults to sqlite3)
@@ -140,7 +158,40 @@ DATABASE_ENGINE = config("DATABASE_ENGINE", default="sqlite3")
 
 if DATABASE_ENGINE == "postgresql":
     # PostgreSQL Configuration
-    # Requires: pip install psycopg2-binary
+    # Requires: pip install "psycopg[binary,pool]"
+    DATABASE_POOL = config("DATABASE_POOL", default=True, cast=bool)
+    DATABASE_STATEMENT_TIMEOUT = config(
+        "DATABASE_STATEMENT_TIMEOUT", default=30000, cast=int
+    )  # in milliseconds, 0 disables
+
+    DATABASE_OPTIONS = {
+        # Connection timeout in seconds
+        "connect_timeout": config("DATABASE_CONNECT_TIMEOUT", default=10, cast=int),
+        # Other options can be added here as needed
+        # Example: "sslmode": "require" for SSL connections
+    }
+    # Word-similarity cutoff for pg_trgm's %> operator, used by typo-tolerant
+    # search (same setting as FUZZY_SEARCH_MIN_OVERLAP below)
+    DATABASE_OPTIONS["options"] = "-c pg_trgm.word_similarity_threshold={}".format(
+        config("FUZZY_SEARCH_MIN_OVERLAP", default=0.3, cast=float)
+    )
+    if DATABASE_STATEMENT_TIMEOUT:
+        # Abort runaway queries server-side so they can't pin a pooled connection
+        DATABASE_OPTIONS["options"] += f" -c statement_timeout={DATABASE_STATEMENT_TIMEOUT}"
+
+    if DATABASE_POOL:
+        DATABASE_OPTIONS["pool"] = {
+            "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+            # Seconds a request waits for a free connection before erroring
+            "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=float),
+            # Recycle connections periodically and drop idle extras
+            "max_lifetime": config(
+                "DATABASE_POOL_MAX_LIFETIME", default=1800, cast=float
+            ),
+            "max_idle": config("DATABASE_POOL_MAX_IDLE", default=300, cast=float),
+        }
+
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.postgresql",
@@ -149,17 +200,37 @@ if DATABASE_ENGINE == "postgresql":
             "PASSWORD": config("DATABASE_PASSWORD", default=""),
             "HOST": config("DATABASE_HOST", default="localhost"),
             "PORT": config("DATABASE_PORT", default="5432", cast=int),
+            # Persistent connection lifetime in seconds. Must be 0 with the pool.
+            "CONN_MAX_AGE": (
+                0
+                if DATABASE_POOL
+                else config("DATABASE_CONN_MAX_AGE", default=60, cast=int)
+            ),
+            # Ping persistent/pooled connections before reuse so dead ones are replaced
+            "CONN_HEALTH_CHECKS": config(
+                "DATABASE_CONN_HEALTH_CHECKS", default=True, cast=bool
+            ),
             # Optional PostgreSQL-specific settings
-            "OPTIONS": {
-                # Connection timeout in seconds
-                "connect_timeout": config(
-                    "DATABASE_CONNECT_TIMEOUT", default=10, cast=int
-                ),
-                # Other options can be added here as needed
-                # Example: "sslmode": "require" for SSL connections
-            },
+            "OPTIONS": DATABASE_OPTIONS,
         }
     }
+
+    # Trigram lookups for typo-tolerant search
+    INSTALLED_APPS += ["django.contrib.postgres"]
+
+    # Optional read replicas (comma-separated hosts). Only catalog and blog
+    # pages read from them (see apps.core.mixins.ReplicaReadMixin); writes,
+    # checkout, orders and webhooks always use the primary.
+    for index, replica_host in enumerate(
+        config("DATABASE_REPLICA_HOSTS", default="", cast=Csv()), start=1
+    ):
+        DATABASES[f"replica_{index}"] = {
+            **DATABASES["default"],
+            "HOST": replica_host,
+            "OPTIONS": copy.deepcopy(DATABASE_OPTIONS),
+            # Tests run against the primary only
+            "TEST": {"MIRROR": "default"},
+        }
 else:
     # SQLite Configuration (default)
     # No additional configuration needed
@@ -170,6 +241,46 @@ else:
         }
     }
 
+    # SQLite production profile (on by default):
+    #   - WAL lets readers run while a write is in progress
+    #   - synchronous=NORMAL is durable under WAL and avoids an fsync per commit
+    #   - mmap/cache sizes keep hot pages in memory
+    #   - busy timeout waits for the write lock instead of failing with
+    #     "database is locked"
+    #   - IMMEDIATE transactions take the write lock up front, so two writers
+    #     can't deadlock trying to upgrade from a read lock
+    # Benchmark with: python manage.py bench_sqlite_concurrency
+    if config("DATABASE_SQLITE_TUNED", default=True, cast=bool):
+        SQLITE_PRAGMAS = {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": config(
+                "DATABASE_SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int
+            ),  # in bytes
+            # Negative values are KiB rather than pages
+            "cache_size": -config(
+                "DATABASE_SQLITE_CACHE_SIZE", default=64 * 1024, cast=int
+            ),  # in KiB
+            "temp_store": "MEMORY",
+        }
+        DATABASES["default"]["OPTIONS"] = {
+            "init_command": "".join(
+                f"PRAGMA {name}={value};" for name, value in SQLITE_PRAGMAS.items()
+            ),
+            "timeout": config(
+                "DATABASE_SQLITE_BUSY_TIMEOUT", default=20, cast=int
+            ),  # in seconds
+            "transaction_mode": "IMMEDIATE",
+        }
+
+# Read replicas: aliases other than "default" (none unless configured above)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["apps.core.routers.PrimaryReplicaRouter"]
+# Seconds a client reads from the primary after writing, to cover replica lag
+DATABASE_REPLICA_PIN_SECONDS = config(
+    "DATABASE_REPLICA_PIN_SECONDS", default=5, cast=int
+)
+
 
 # ==============================================================================
 # PASSWORD VALIDATION
@@ -209,10 +320,54 @@ USE_I18N = True
 USE_TZ = True
 
 
-# Static files (CSS, JavaScript, Images)
+# ==============================================================================
+# STATIC FILES (CSS, JavaScript, Images)
+# ==============================================================================
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
+#
+# Production pipeline (DEBUG=False), built with `python manage.py build_static`:
+#   1. collectstatic copies everything into STATIC_ROOT with manifest-hashed
+#      names and writes gzip/Brotli variants next to each file (WhiteNoise)
+#   2. compress bundles the {% compress %} blocks offline into CACHE/
+#   3. the bundles are precompressed the same way
+# WhiteNoise then serves hashed files with a one-year "immutable" Cache-Control,
+# so repeat visits never revalidate assets.
+# ==============================================================================
 
 STATIC_URL = "/static/"
+STATIC_ROOT = config("STATIC_ROOT", default=str(BASE_DIR.parent / "staticfiles"))
+
+STATICFILES_DIRS = [
+    BASE_DIR.parent / "static",  # project-level static folder (vendored JS, compiled TS)
+]
+
+STATICFILES_FINDERS = [
+    "django.contrib.staticfiles.finders.FileSystemFinder",
+    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+    "compressor.finders.CompressorFinder",
+]
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
+# Both Django's manifest storage and django-compressor embed a 12 character
+# content hash in the filename, so anything matching can be cached forever.
+WHITENOISE_IMMUTABLE_FILE_TEST = r"\.[0-9a-f]{12}\.[^/]+$"
+
+# django-compressor: bundle local scripts/styles offline in production
+COMPRESS_ENABLED = config("COMPRESS_ENABLED", default=not DEBUG, cast=bool)
+COMPRESS_OFFLINE = config("COMPRESS_OFFLINE", default=not DEBUG, cast=bool)
+COMPRESS_ROOT = STATIC_ROOT
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
@@ -233,12 +388,15 @@ if DEBUG:
 # AUTHENTICATION SETTINGS
 # ==============================================================================
 
+# Both backends load the session user with select_related("seller", "profile")
 AUTHENTICATION_BACKENDS = [
     # Needed to login by username in Django admin, regardless of allauth
-    "django.contrib.auth.backends.ModelBackend",
+    "apps.users.backends.SelectRelatedModelBackend",
     # allauth specific authentication methods, such as login by e-mail
-    "allauth.account.auth_backends.AuthenticationBackend",
+    "apps.users.backends.SelectRelatedAuthenticationBackend",
 ]
+# Sessions store the dotted path of the backend that logged the user in;
+# apps.users.middleware moves those of the original backends over
 
 # Django Allauth Settings (Updated for latest version)
 ACCOUNT_AUTHENTICATION_METHOD = config("ACCOUNT_AUTHENTICATION_METHOD", default="email")
@@ -335,9 +493,178 @@ else:
 # Default "from" email for development
 DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="noreply@localhost")
 
-STATICFILES_DIRS = [
-    BASE_DIR / "static",  # your project-level static folder
-]
+# Transactional outbox: mail is written to the OutboxEmail table inside the
+# caller's transaction and delivered by `python manage.py send_outbox_email --loop`
+# over a single reused connection. On by default in production.
+EMAIL_OUTBOX_ENABLED = config("EMAIL_OUTBOX_ENABLED", default=not DEBUG, cast=bool)
+# Backend the worker actually sends through (SMTP/console from above by default)
+EMAIL_OUTBOX_DELIVERY_BACKEND = config(
+    "EMAIL_OUTBOX_DELIVERY_BACKEND", default=EMAIL_BACKEND
+)
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", default=50, cast=int)
+EMAIL_OUTBOX_RATE_LIMIT = config(
+    "EMAIL_OUTBOX_RATE_LIMIT", default=10, cast=float
+)  # messages per second, 0 disables
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config(
+    "EMAIL_OUTBOX_RETRY_DELAY", default=30, cast=int
+)  # seconds, doubled after each failed attempt
+EMAIL_OUTBOX_POLL_INTERVAL = config(
+    "EMAIL_OUTBOX_POLL_INTERVAL", default=2, cast=float
+)  # seconds
+if EMAIL_OUTBOX_ENABLED:
+    EMAIL_BACKEND = "apps.core.mail.OutboxEmailBackend"
+
+# ==============================================================================
+# CACHE & RATE LIMITING
+# ==============================================================================
+# Set REDIS_URL in production so the cache (and rate limit counters) is shared
+# by every process. Without it each process keeps its own in-memory cache.
+
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Two-tier cache (apps.core.caching): per-process LRU in front of the cache above
+CACHE_LOCAL_MAXSIZE = config("CACHE_LOCAL_MAXSIZE", default=1000, cast=int)  # per namespace
+CACHE_LOCAL_TIMEOUT = config(
+    "CACHE_LOCAL_TIMEOUT", default=5, cast=float
+)  # seconds a process may serve its own copy after an invalidation elsewhere
+CACHE_EARLY_REFRESH_BETA = config(
+    "CACHE_EARLY_REFRESH_BETA", default=1.0, cast=float
+)  # >1 refreshes earlier, 0 disables early refresh
+CACHE_LOCK_TIMEOUT = config("CACHE_LOCK_TIMEOUT", default=10, cast=int)  # seconds
+# Rendered cards from {% cachefragment %}; keys change with the object, so this
+# only bounds how long superseded versions linger
+FRAGMENT_CACHE_TIMEOUT = config(
+    "FRAGMENT_CACHE_TIMEOUT", default=24 * 3600, cast=int
+)  # seconds
+
+# Sliding-window limits as "<count>/<period>", e.g. "10/m", "5/h" or "3/10m"
+RATELIMIT_ENABLED = config("RATELIMIT_ENABLED", default=True, cast=bool)
+RATELIMIT_LOGIN = config("RATELIMIT_LOGIN", default="10/m")  # per IP
+RATELIMIT_SEARCH = config("RATELIMIT_SEARCH", default="60/m")  # per user or IP
+RATELIMIT_VERIFICATION = config("RATELIMIT_VERIFICATION", default="5/h")  # per user
+RATELIMIT_VERIFY_CODE = config("RATELIMIT_VERIFY_CODE", default="10/10m")  # per user
+RATELIMIT_WEBHOOK = config("RATELIMIT_WEBHOOK", default="300/m")  # per IP
+# Only enable behind a proxy that sets X-Forwarded-For, or clients can spoof it
+RATELIMIT_USE_X_FORWARDED_FOR = config(
+    "RATELIMIT_USE_X_FORWARDED_FOR", default=False, cast=bool
+)
+
+# ==============================================================================
+# SEARCH
+# ==============================================================================
+
+# Autocomplete prefix index (apps.antiques.suggest) lives in each process and is
+# updated by signals there; this bounds how stale other processes can be
+SUGGEST_INDEX_MAX_AGE = config("SUGGEST_INDEX_MAX_AGE", default=300, cast=int)  # seconds
+
+# Typo-tolerant search (apps.antiques.search): a trigram index shortlists
+# candidates, then only the shortlist is scored by edit distance
+FUZZY_SEARCH_ENABLED = config("FUZZY_SEARCH_ENABLED", default=True, cast=bool)
+FUZZY_SEARCH_SHORTLIST = config("FUZZY_SEARCH_SHORTLIST", default=50, cast=int)
+FUZZY_SEARCH_MIN_SCORE = config("FUZZY_SEARCH_MIN_SCORE", default=75, cast=int)  # 0-100
+# Share of the query's trigrams a candidate needs (pg_trgm word similarity)
+FUZZY_SEARCH_MIN_OVERLAP = config("FUZZY_SEARCH_MIN_OVERLAP", default=0.3, cast=float)
+# Without pg_trgm: antiques read per query trigram, which bounds each keystroke
+FUZZY_SEARCH_MAX_POSTINGS = config("FUZZY_SEARCH_MAX_POSTINGS", default=1000, cast=int)
+
+# Saved-search alerts (apps.antiques.alerts): new listings are matched by the
+# process_saved_searches worker and batched into one digest per user
+SAVED_SEARCH_DIGEST_INTERVAL = config(
+    "SAVED_SEARCH_DIGEST_INTERVAL", default=3600, cast=int
+)  # seconds a user's first unsent match waits for others to join its digest
+SAVED_SEARCH_POLL_INTERVAL = config(
+    "SAVED_SEARCH_POLL_INTERVAL", default=10, cast=float
+)  # seconds
+
+# Price histogram on the antique list (apps.antiques.prices): lower bounds of
+# the buckets, in whole currency units; the last bucket is open-ended
+PRICE_HISTOGRAM_EDGES = config(
+    "PRICE_HISTOGRAM_EDGES",
+    default="0,25,50,100,250,500,1000,2500,5000,10000",
+    cast=Csv(cast=int),
+)
+
+# ==============================================================================
+# RECOMMENDATIONS
+# ==============================================================================
+
+# Popularity counters (apps.antiques.popularity): detail views and wishlist
+# adds are buffered per process and written in batches
+POPULARITY_FLUSH_INTERVAL = config(
+    "POPULARITY_FLUSH_INTERVAL", default=30, cast=float
+)  # seconds
+POPULARITY_BUFFER_MAX = config(
+    "POPULARITY_BUFFER_MAX", default=1000, cast=int
+)  # pending antiques that force an early flush
+TRENDING_HALF_LIFE = config(
+    "TRENDING_HALF_LIFE", default=24 * 3600, cast=int
+)  # seconds for an event's weight in the trending score to halve
+TRENDING_WISHLIST_WEIGHT = config(
+    "TRENDING_WISHLIST_WEIGHT", default=5, cast=int
+)  # a wishlist add counts as this many views
+
+# Delta-sync API (apps.antiques.sync): changes per response, and how old a
+# change must be before it is returned. The lag must exceed the longest
+# transaction that saves an antique: the create view calls Stripe twice inside
+# one (2 calls x 3 attempts x STRIPE_TIMEOUT = 120s by default) and uploads
+# images, so keep it well above that
+CATALOG_SYNC_PAGE_SIZE = config("CATALOG_SYNC_PAGE_SIZE", default=500, cast=int)
+CATALOG_SYNC_LAG = config("CATALOG_SYNC_LAG", default=300, cast=float)  # seconds
+
+# Recently viewed antiques (apps.antiques.history): detail views are buffered
+# per process and merged into each user's cached list in batches
+RECENTLY_VIEWED_MAX = config("RECENTLY_VIEWED_MAX", default=12, cast=int)
+RECENTLY_VIEWED_FLUSH_INTERVAL = config(
+    "RECENTLY_VIEWED_FLUSH_INTERVAL", default=5, cast=float
+)  # seconds
+RECENTLY_VIEWED_BUFFER_MAX = config(
+    "RECENTLY_VIEWED_BUFFER_MAX", default=500, cast=int
+)  # pending users that force an early flush
+RECENTLY_VIEWED_CACHE_TIMEOUT = config(
+    "RECENTLY_VIEWED_CACHE_TIMEOUT", default=7 * 24 * 3600, cast=int
+)  # seconds; the table restores lists the cache has dropped
+
+# "Similar antiques" (apps.antiques.similarity), precomputed from TF-IDF
+# vectors by: python manage.py build_similar_antiques
+SIMILAR_ANTIQUES_COUNT = config("SIMILAR_ANTIQUES_COUNT", default=6, cast=int)
+# Rows per sparse matrix product; bounds the job's memory use
+SIMILAR_ANTIQUES_BLOCK_SIZE = config(
+    "SIMILAR_ANTIQUES_BLOCK_SIZE", default=512, cast=int
+)
+SIMILAR_ANTIQUES_MIN_SCORE = config(
+    "SIMILAR_ANTIQUES_MIN_SCORE", default=0.1, cast=float
+)  # cosine similarity, 0-1
+
+# "Collectors who saved this also saved" (apps.antiques.cosaved), from wishlist
+# co-occurrence, precomputed by: python manage.py build_cosaved_antiques
+WISHLIST_COSAVED_COUNT = config("WISHLIST_COSAVED_COUNT", default=12, cast=int)
+WISHLIST_COSAVED_MIN_COUNT = config(
+    "WISHLIST_COSAVED_MIN_COUNT", default=2, cast=int
+)  # users who must have saved both antiques
+WISHLIST_COSAVED_MAX_USER_ITEMS = config(
+    "WISHLIST_COSAVED_MAX_USER_ITEMS", default=500, cast=int
+)  # larger collections (dealers, bots) are ignored
+WISHLIST_COSAVED_CHUNK_SIZE = config(
+    "WISHLIST_COSAVED_CHUNK_SIZE", default=50000, cast=int
+)  # wishlist rows read per query
+WISHLIST_COSAVED_BLOCK_SIZE = config(
+    "WISHLIST_COSAVED_BLOCK_SIZE", default=1024, cast=int
+)  # antiques per sparse matrix product
 
 # ==============================================================================
 # SESSION CONFIGURATION
@@ -354,6 +681,19 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = config(
 # Make cookies only accessible via HTTP(S), not JavaScript (recommended)
 SESSION_COOKIE_HTTPONLY = config("SESSION_COOKIE_HTTPONLY", default=True, cast=bool)
 
+# Sessions are read from the cache and written through to the database, so an
+# authenticated request normally skips the session SELECT. Expired rows are
+# removed in batches by: python manage.py purge_expired_sessions
+SESSION_ENGINE = config(
+    "SESSION_ENGINE", default="django.contrib.sessions.backends.cached_db"
+)
+
+# Flash messages live in a signed cookie rather than the session, so rendering
+# them never loads or creates a session. Together with cookie-based CSRF this
+# keeps anonymous catalog/blog browsing session-free (see apps/core/tests.py).
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+CSRF_USE_SESSIONS = False
+
 PROJECT_NAME = config(
     "PROJECT_NAME", default="edwards_emporium"
 )  # change to whatever you want, this is mostly used for frontend
@@ -361,6 +701,28 @@ PROJECT_NAME = config(
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Pre-rendered storefront and blog post pages (apps.core.snapshots), written by
+# `python manage.py publish_snapshots --loop` and served to anonymous visitors
+SNAPSHOTS_ENABLED = config("SNAPSHOTS_ENABLED", default=not DEBUG, cast=bool)
+SNAPSHOT_ROOT = config("SNAPSHOT_ROOT", default=os.path.join(MEDIA_ROOT, "snapshots"))
+SNAPSHOT_DEBOUNCE = config(
+    "SNAPSHOT_DEBOUNCE", default=30, cast=int
+)  # seconds after the first change before a page is re-rendered
+SNAPSHOT_POLL_INTERVAL = config("SNAPSHOT_POLL_INTERVAL", default=5, cast=float)  # seconds
+SNAPSHOT_HOST = config("SNAPSHOT_HOST", default="localhost")  # Host header used to render
+
+# Change outbox (apps.core.changes): saves and deletes of catalog models and
+# orders, fanned out to consumers by `python manage.py dispatch_changes --loop`
+CHANGE_OUTBOX_GAP_TIMEOUT = config(
+    "CHANGE_OUTBOX_GAP_TIMEOUT", default=600, cast=int
+)  # seconds consumers keep waiting for an id a slow transaction may still commit
+CHANGE_OUTBOX_POLL_INTERVAL = config(
+    "CHANGE_OUTBOX_POLL_INTERVAL", default=1, cast=float
+)  # seconds
+CHANGE_OUTBOX_RETENTION = config(
+    "CHANGE_OUTBOX_RETENTION", default=24 * 3600, cast=int
+)  # seconds processed records are kept
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
@@ -368,8 +730,14 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY")
 STRIPE_PUBLISHABLE_KEY = config("STRIPE_PUBLISHABLE_KEY")
 STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET")
+# Seconds per Stripe API attempt (the client retries twice). Antique creation
+# calls Stripe inside its transaction, so this bounds CATALOG_SYNC_LAG below
+STRIPE_TIMEOUT = config("STRIPE_TIMEOUT", default=20, cast=float)
 
 
+# Log file, anchored to the project root rather than the working directory
+# (git-ignored)
+LOG_FILE = config("LOG_FILE", default=str(BASE_DIR.parent / "django.log"))
 
 LOGGING = {
     'version': 1,
@@ -391,7 +759,7 @@ LOGGING = {
         },
         'file': {
             'class': 'logging.FileHandler',
-            'filename': 'django.log',
+            'filename': LOG_FILE,
             'formatter': 'fancy',
         },
     },
@@ -12,6 +12,7 @@ urlpatterns = [
     path("sellers/", include("apps.sellers.urls")),
     path("payments/", include("apps.payments.urls")),
     path("blog/", include("apps.blog.urls")),
+    path("api/", include("apps.antiques.api_urls")),
 ]
 
 if settings.DEBUG:
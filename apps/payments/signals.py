@@ -4,7 +4,17 @@ from django.apps import apps
 import stripe
 from django.conf import settings
 
+from apps.core.changes import track_changes
+from .models import Order
+
 stripe.api_key = settings.STRIPE_SECRET_KEY
+# Calls below run inside the antique's transaction; bound how long they hold it
+stripe.default_http_client = stripe.new_default_http_client(
+    timeout=settings.STRIPE_TIMEOUT
+)
+
+# Orders feed the change outbox (apps.core.changes) like catalog models
+track_changes(Order, fields=['status'])
 
 @receiver(post_save, sender='antiques.Antique')
 def create_stripe_product(sender, instance, created, **kwargs):
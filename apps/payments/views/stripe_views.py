@@ -9,6 +9,7 @@ from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 
 from apps.antiques.models import Antique
+from apps.core.ratelimit import ratelimit
 from ..models import Order, OrderItem
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,7 @@ User = get_user_model()
 
 
 @csrf_exempt
+@ratelimit("stripe_webhook", settings.RATELIMIT_WEBHOOK)
 def stripe_webhook(request):
     logger.info("=" * 80)
     logger.info("WEBHOOK RECEIVED - Starting processing")
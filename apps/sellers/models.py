@@ -43,6 +43,7 @@ class Seller(models.Model):
     )
 
     slug = models.SlugField(max_length=255, unique=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         # create a slug on save based on username
@@ -51,3 +52,8 @@ class Seller(models.Model):
 
     def __str__(self):
         return f"{self.store_name} - {self.user.email}"
+
+    def get_absolute_url(self):
+        from django.urls import reverse
+
+        return reverse("sellers:seller-detail", kwargs={"slug": self.slug})
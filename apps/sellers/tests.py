@@ -1,3 +1,93 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from apps.antiques.models import AntiqueImage
+from apps.antiques.testing import make_antiques
+from apps.core.pagination import encode_cursor
+
+from .models import Seller
+from .views import SellerDetailView
+
+
+class StorefrontTests(TestCase):
+    """Storefront pages cost the same whatever the seller's inventory."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.large = cls.create_seller("large", 60)
+        cls.small = cls.create_seller("small", 3)
+
+    @staticmethod
+    def create_seller(username, count):
+        user = User.objects.create_user(username, f"{username}@example.com", "password")
+        seller = Seller.objects.create(user=user, store_name=username, is_verified=True)
+        antiques = make_antiques(
+            user, count, slug=lambda i: f"{username}-{i}", seller=seller
+        )
+        AntiqueImage.objects.bulk_create(
+            [
+                AntiqueImage(antique=antique, image=f"antiques/{antique.slug}-{n}.jpg")
+                for antique in antiques
+                for n in range(2)
+            ]
+        )
+        return seller
+
+    def get(self, seller, **kwargs):
+        return self.client.get(
+            reverse("sellers:seller-detail", kwargs={"slug": seller.slug}), **kwargs
+        )
+
+    def test_query_count_does_not_grow_with_inventory(self):
+        counts = []
+        for seller in (self.small, self.large):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.get(seller).status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_cards_use_the_first_image(self):
+        response = self.get(self.small)
+        for antique in response.context["antiques"]:
+            self.assertEqual(len(antique.primary_images), 1)
+            self.assertEqual(
+                antique.primary_images[0], antique.images.order_by("pk").first()
+            )
+
+    def test_infinite_scroll_covers_the_storefront_once(self):
+        response = self.get(self.large)
+        seen = [antique.pk for antique in response.context["antiques"]]
+        self.assertEqual(len(seen), SellerDetailView.paginate_by)
+        cursor = response.context["next_cursor"]
+        while cursor:
+            response = self.get(
+                self.large, data={"cursor": cursor}, headers={"HX-Request": "true"}
+            )
+            self.assertTemplateUsed(response, "sellers/partials/storefront_page.html")
+            self.assertTemplateNotUsed(response, "sellers/seller_detail.html")
+            seen.extend(antique.pk for antique in response.context["antiques"])
+            cursor = response.context["next_cursor"]
+        self.assertEqual(
+            seen,
+            list(
+                self.large.antiques.order_by("-created_at", "-id").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+
+    def test_forged_cursors_restart_from_the_first_page(self):
+        first_page = [
+            antique.pk for antique in self.get(self.large).context["antiques"]
+        ]
+        for values in (["not-a-date", 1], [{"a": 1}, 1], [None, None], ["x"]):
+            with self.subTest(values=values):
+                response = self.get(self.large, data={"cursor": encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [antique.pk for antique in response.context["antiques"]],
+                    first_page,
+                )
@@ -2,10 +2,15 @@ from django.shortcuts import render, get_object_or_404
 from django.views.generic import CreateView, UpdateView, DetailView, TemplateView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum, Avg, Count, Q
+from django.db import transaction
+from django.db.models import Sum, Avg, Count, Max, Q
 from .models import Seller
 from .forms import SellerForm
 from django.urls import reverse_lazy
+from django.utils.cache import patch_vary_headers
+from apps.antiques.models import Wishlist, primary_images
+from apps.core.mixins import ConditionalGetMixin, ReplicaReadMixin
+from apps.core.pagination import cursor_page
 
 class SellerCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
     model = Seller
@@ -17,7 +22,8 @@ class SellerCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
     def form_valid(self, form):
         # automatically assign the new user
         form.instance.user = self.request.user
-        return super().form_valid(form)
+        with transaction.atomic():
+            return super().form_valid(form)
 
 class SellerUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     model = Seller
@@ -30,17 +36,93 @@ class SellerUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
         # Ensure that only the owner can update their profile
         return Seller.objects.get(user=self.request.user)
 
-class SellerDetailView(DetailView): # this page is mostly for users looking at the seller
+    def form_valid(self, form):
+        with transaction.atomic():
+            return super().form_valid(form)
+
+class SellerDetailView(ReplicaReadMixin, ConditionalGetMixin, DetailView): # this page is mostly for users looking at the seller
     model = Seller
     template_name = "sellers/seller_detail.html"
 
+    # Storefront cards: newest first, served by antique_seller_newest_idx
+    paginate_by = 24
+    storefront_ordering = ["-created_at", "-id"]
+    storefront_fields = [
+        "id",
+        "slug",
+        "title",
+        "price",
+        "is_sold",
+        "type_of_antique",
+        "created_at",
+        "updated_at",  # fragment cache key
+        "seller",  # the related manager sets antique.seller from seller_id
+    ]
+
+    def get_last_modified(self):
+        versions = (
+            Seller.objects.filter(slug=self.kwargs["slug"])
+            .annotate(
+                latest_antique=Max("antiques__updated_at"),
+                antique_count=Count("antiques"),
+            )
+            .values_list("updated_at", "latest_antique", "antique_count")
+            .first()
+        )
+        if versions is None:
+            return None
+        self.antique_count = versions[2]
+        return max(filter(None, versions[:2]))
+
+    def get_etag_parts(self):
+        return [
+            self.antique_count,
+            Wishlist.last_modified_for(self.request.user),
+            self.is_htmx(),
+        ]
+
+    def is_htmx(self):
+        return bool(self.request.headers.get("HX-Request"))
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        # Full page and infinite-scroll fragment share a URL
+        patch_vary_headers(response, ["HX-Request"])
+        return response
+
     def get_queryset(self):
-        return Seller.objects.select_related('user').prefetch_related('antiques')
+        # Antiques are paginated in get_context_data, not prefetched whole
+        return Seller.objects.select_related('user')
+
+    def get_template_names(self):
+        if self.is_htmx():
+            return ["sellers/partials/storefront_page.html"]
+        return super().get_template_names()
+
+    def get_storefront_queryset(self):
+        return self.object.antiques.only(*self.storefront_fields).prefetch_related(
+            primary_images()
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get all antiques from this seller
-        context['antiques'] = self.object.antiques.all().order_by('-created_at')
+        # One page of this seller's antiques, after ?cursor= (keyset pagination)
+        context['antiques'], context['next_cursor'] = cursor_page(
+            self.get_storefront_queryset(),
+            self.storefront_ordering,
+            self.request.GET.get("cursor"),
+            per_page=self.paginate_by,
+        )
+        # Wishlist hearts are rendered outside the cached cards, from one query
+        context['wishlist_antique_ids'] = (
+            set(
+                Wishlist.objects.filter(
+                    user=self.request.user, antiques__seller=self.object
+                ).values_list("antiques__slug", flat=True)
+            )
+            if self.request.user.is_authenticated
+            else set()
+        )
         return context
 
 class SellerDashboardView(LoginRequiredMixin, TemplateView):
@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+from allauth.account.auth_backends import AuthenticationBackend
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+SellerCapabilities = namedtuple(
+    "SellerCapabilities", ["is_seller", "is_verified", "seller_id"]
+)
+
+NO_SELLER = SellerCapabilities(is_seller=False, is_verified=False, seller_id=None)
+
+
+class RelatedUserLoaderMixin:
+    """
+    Load the session user together with its seller and profile in one query.
+    Templates and mixins read ``user.seller`` / ``user.profile`` on most pages,
+    so this saves a lazy one-to-one lookup for each on every request.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related("seller", "profile").get(
+                pk=user_id
+            )
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+class SelectRelatedModelBackend(RelatedUserLoaderMixin, ModelBackend):
+    pass
+
+
+class SelectRelatedAuthenticationBackend(RelatedUserLoaderMixin, AuthenticationBackend):
+    pass
+
+
+# Backend paths stored by sessions that logged in before the backends above
+# -> their replacement (see apps.users.middleware)
+LEGACY_BACKENDS = {
+    "django.contrib.auth.backends.ModelBackend": (
+        "apps.users.backends.SelectRelatedModelBackend"
+    ),
+    "allauth.account.auth_backends.AuthenticationBackend": (
+        "apps.users.backends.SelectRelatedAuthenticationBackend"
+    ),
+}
+
+
+def get_seller_capabilities(user):
+    """
+    Return the user's seller flags, computed once and cached on the user
+    instance (which lives for the request). Cleared by the Seller/Profile
+    save signals in apps.users.signals.
+    """
+    if not user.is_authenticated:
+        return NO_SELLER
+
+    capabilities = getattr(user, "_seller_capabilities", None)
+    if capabilities is None:
+        seller = getattr(user, "seller", None)
+        if seller is None:
+            capabilities = NO_SELLER
+        else:
+            capabilities = SellerCapabilities(
+                is_seller=True, is_verified=seller.is_verified, seller_id=seller.pk
+            )
+        user._seller_capabilities = capabilities
+    return capabilities
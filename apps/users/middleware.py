@@ -0,0 +1,25 @@
+from django.contrib.auth import BACKEND_SESSION_KEY
+
+from .backends import LEGACY_BACKENDS
+
+
+class LegacyBackendSessionMiddleware:
+    """
+    Move sessions logged in under a replaced authentication backend over to
+    its replacement, before AuthenticationMiddleware reads the path.
+
+    Django only loads a session user through a backend that is still listed
+    in AUTHENTICATION_BACKENDS, so without this those sessions would be
+    logged out; listing the old paths again would make every failed login
+    try (and hash) each password twice. Requests without a session cookie
+    don't touch the session store.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        backend = request.session.get(BACKEND_SESSION_KEY)
+        if backend in LEGACY_BACKENDS:
+            request.session[BACKEND_SESSION_KEY] = LEGACY_BACKENDS[backend]
+        return self.get_response(request)
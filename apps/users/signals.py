@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.sellers.models import Seller
+
+from .models import Profile
+
+
+def _refresh_user_cache(instance, value):
+    """
+    Keep the owning user's cached seller/profile relation in step with a save
+    or delete, so the request that made the change doesn't see stale flags.
+    """
+    user_field = instance._meta.get_field("user")
+    if not user_field.is_cached(instance):
+        return
+
+    user = user_field.get_cached_value(instance)
+    user_field.remote_field.set_cached_value(user, value)
+    user.__dict__.pop("_seller_capabilities", None)
+
+
+@receiver(post_save, sender=Seller)
+@receiver(post_save, sender=Profile)
+def refresh_user_on_save(sender, instance, **kwargs):
+    _refresh_user_cache(instance, instance)
+
+
+@receiver(post_delete, sender=Seller)
+@receiver(post_delete, sender=Profile)
+def refresh_user_on_delete(sender, instance, **kwargs):
+    _refresh_user_cache(instance, None)
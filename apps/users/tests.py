@@ -1,3 +1,32 @@
+from unittest import mock
+
+from django.contrib.auth import BACKEND_SESSION_KEY, authenticate
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+
+class LegacyBackendSessionTests(TestCase):
+    """Sessions from the original backends stay logged in."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("buyer", "buyer@example.com", "password")
+
+    def test_legacy_backend_path_is_rewritten(self):
+        self.client.force_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        response = self.client.get(reverse("antiques:antique-list"))
+        self.assertEqual(response.wsgi_request.user, self.user)
+        self.assertEqual(
+            self.client.session[BACKEND_SESSION_KEY],
+            "apps.users.backends.SelectRelatedModelBackend",
+        )
 
-# Create your tests here.
+    def test_failed_login_checks_the_password_once(self):
+        with mock.patch.object(
+            User, "check_password", autospec=True, return_value=False
+        ) as check_password:
+            self.assertIsNone(authenticate(username="buyer", password="wrong"))
+        self.assertEqual(check_password.call_count, 1)
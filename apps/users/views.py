@@ -13,8 +13,11 @@ from django.shortcuts import redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.conf import settings
 from django.views.generic import FormView, UpdateView, View
 
+from apps.core.mixins import RateLimitMixin
+
 from .forms import EmailLoginForm, EmailSignupForm, ProfileForm
 from .models import Profile
 
@@ -52,13 +55,18 @@ class SignupView(RedirectAuthenticatedUserMixin, SuccessMessageMixin, FormView):
 
     def form_valid(self, form):
         user = form.save()
-        login(self.request, user, backend="django.contrib.auth.backends.ModelBackend")
+        login(
+            self.request, user, backend="apps.users.backends.SelectRelatedModelBackend"
+        )
         return super().form_valid(form)
 
 
-class LoginView(RedirectAuthenticatedUserMixin, FormView):
+class LoginView(RateLimitMixin, RedirectAuthenticatedUserMixin, FormView):
     """User login view with email-based authentication."""
 
+    # Per-IP limit on login attempts to slow credential stuffing
+    ratelimit_rate = settings.RATELIMIT_LOGIN
+
     template_name = "users/login.html"
     form_class = EmailLoginForm
     success_url = reverse_lazy("dashboard")
@@ -136,12 +144,13 @@ class DeleteAccountView(LoginRequiredMixin, View):
 # ---------------------------
 
 
-class ResendVerificationEmailView(LoginRequiredMixin, View):
+class ResendVerificationEmailView(LoginRequiredMixin, RateLimitMixin, View):
     """
     Send 6-digit verification code via email with rate limiting.
 
     Security features:
-    - Rate limiting: cooldown between requests (configurable via .env)
+    - Rate limiting: cooldown between requests (configurable via .env), plus a
+      per-user limit shared across sessions and processes
     - User authentication required
     - Only sends if email is unverified
     - 6-digit code stored in session with expiry (configurable via .env)
@@ -154,6 +163,8 @@ class ResendVerificationEmailView(LoginRequiredMixin, View):
     COOLDOWN_SECONDS = settings.EMAIL_VERIFICATION_COOLDOWN
     CODE_EXPIRY_MINUTES = settings.EMAIL_VERIFICATION_CODE_EXPIRY
     success_url = reverse_lazy("users:settings")
+    ratelimit_rate = settings.RATELIMIT_VERIFICATION
+    ratelimit_key = "user"
 
     def post(self, request, *args, **kwargs):
         """Handle POST request to send verification code."""
@@ -220,7 +231,8 @@ class ResendVerificationEmailView(LoginRequiredMixin, View):
                 },
             )
 
-            # Send email
+            # Send email (queued in the outbox when EMAIL_OUTBOX_ENABLED, so the
+            # request doesn't wait on the SMTP handshake)
             send_mail(
                 subject="Email Verification Code",
                 message=f"Your verification code is: {verification_code}",
@@ -251,7 +263,7 @@ class ResendVerificationEmailView(LoginRequiredMixin, View):
             )
 
 
-class VerifyEmailCodeView(LoginRequiredMixin, View):
+class VerifyEmailCodeView(LoginRequiredMixin, RateLimitMixin, View):
     """
     Verify the 6-digit email verification code.
     """
@@ -260,6 +272,9 @@ class VerifyEmailCodeView(LoginRequiredMixin, View):
     from django.conf import settings
 
     CODE_EXPIRY_MINUTES = settings.EMAIL_VERIFICATION_CODE_EXPIRY
+    # Stops brute-forcing the 6-digit code
+    ratelimit_rate = settings.RATELIMIT_VERIFY_CODE
+    ratelimit_key = "user"
 
     def post(self, request, *args, **kwargs):
         """Handle POST request to verify code."""
@@ -0,0 +1,17 @@
+// Copies pinned third-party browser bundles from node_modules into static/vendor
+// so they are served (hashed + precompressed) from our own origin instead of a CDN.
+// Run with: npm run vendor. The list lives in vendor-assets.json, which
+// apps/core/checks.py reads too.
+import { copyFileSync, mkdirSync, readFileSync } from "node:fs";
+import { dirname, join } from "node:path";
+
+const assets = JSON.parse(
+  readFileSync(new URL("./vendor-assets.json", import.meta.url), "utf8"),
+);
+
+for (const [target, source] of Object.entries(assets)) {
+  const destination = join("static", "vendor", target);
+  mkdirSync(dirname(destination), { recursive: true });
+  copyFileSync(join("node_modules", source), destination);
+  console.log(`vendored ${source} -> ${destination}`);
+}
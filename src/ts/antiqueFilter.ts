@@ -1,18 +1,41 @@
 /**
  * Antique Filter Module
- * Handles search, type filtering, and sold item toggle for antique listings
+ * Handles search, category filtering, price range, sorting, and sold item toggle for antique listings.
+ * While typing, suggestions come from the lightweight /antiques/suggest/
+ * endpoint; the list itself only reloads when a search is submitted.
  */
 
 interface FilterElements {
   searchInput: HTMLInputElement;
+  suggestionList: HTMLUListElement;
   typeFilter: HTMLSelectElement;
+  sortSelect: HTMLSelectElement;
   showSoldToggle: HTMLInputElement;
+  minPriceInput: HTMLInputElement;
+  maxPriceInput: HTMLInputElement;
+  priceHistogram: HTMLElement;
 }
 
+interface Suggestion {
+  label: string;
+  kind: 'antique' | 'type' | 'seller';
+  url: string;
+}
+
+const KIND_LABELS: Record<Suggestion['kind'], string> = {
+  antique: 'Antique',
+  type: 'Type',
+  seller: 'Store',
+};
+
 class AntiqueFilter {
   private elements: FilterElements;
-  private searchTimeout: number | null = null;
-  private readonly DEBOUNCE_DELAY = 500; // milliseconds
+  private suggestTimeout: number | null = null;
+  private suggestController: AbortController | null = null;
+  private suggestions: Suggestion[] = [];
+  private activeIndex = -1;
+  private readonly DEBOUNCE_DELAY = 120; // milliseconds
+  private readonly MIN_QUERY_LENGTH = 2;
 
   constructor() {
     this.elements = this.getElements();
@@ -24,14 +47,25 @@ class AntiqueFilter {
    */
   private getElements(): FilterElements {
     const searchInput = document.getElementById('searchInput') as HTMLInputElement;
+    const suggestionList = document.getElementById('searchSuggestions') as HTMLUListElement;
     const typeFilter = document.getElementById('typeFilter') as HTMLSelectElement;
+    const sortSelect = document.getElementById('sortSelect') as HTMLSelectElement;
     const showSoldToggle = document.getElementById('showSoldToggle') as HTMLInputElement;
+    const minPriceInput = document.getElementById('minPriceInput') as HTMLInputElement;
+    const maxPriceInput = document.getElementById('maxPriceInput') as HTMLInputElement;
+    const priceHistogram = document.getElementById('priceHistogram') as HTMLElement;
 
-    if (!searchInput || !typeFilter || !showSoldToggle) {
+    if (
+      !searchInput || !suggestionList || !typeFilter || !sortSelect || !showSoldToggle ||
+      !minPriceInput || !maxPriceInput || !priceHistogram
+    ) {
       throw new Error('Required filter elements not found in DOM');
     }
 
-    return { searchInput, typeFilter, showSoldToggle };
+    return {
+      searchInput, suggestionList, typeFilter, sortSelect, showSoldToggle,
+      minPriceInput, maxPriceInput, priceHistogram,
+    };
   }
 
   /**
@@ -41,26 +75,152 @@ class AntiqueFilter {
     // Type filter - immediate update
     this.elements.typeFilter.addEventListener('change', () => this.updateFilters());
 
+    // Sort - immediate update
+    this.elements.sortSelect.addEventListener('change', () => this.updateFilters());
+
     // Sold toggle - immediate update
     this.elements.showSoldToggle.addEventListener('change', () => this.updateFilters());
 
-    // Search input - debounced update
-    this.elements.searchInput.addEventListener('input', () => this.debouncedSearch());
+    // Price inputs - update once a value is committed (blur or Enter)
+    this.elements.minPriceInput.addEventListener('change', () => this.updateFilters());
+    this.elements.maxPriceInput.addEventListener('change', () => this.updateFilters());
+
+    // Histogram bars - select that bucket's price range
+    this.elements.priceHistogram.addEventListener('click', (event) => {
+      const bar = (event.target as HTMLElement).closest<HTMLButtonElement>('button[data-min]');
+      if (bar) {
+        this.elements.minPriceInput.value = bar.dataset.min ?? '';
+        this.elements.maxPriceInput.value = bar.dataset.max ?? '';
+        this.updateFilters();
+      }
+    });
+
+    // Search input - debounced suggestions, Enter submits
+    this.elements.searchInput.addEventListener('input', () => this.debouncedSuggest());
+    this.elements.searchInput.addEventListener('keydown', (event) => this.onKeyDown(event));
+    this.elements.searchInput.addEventListener('blur', () => {
+      // Let a click on a suggestion land before the list disappears
+      window.setTimeout(() => this.hideSuggestions(), 150);
+    });
   }
 
   /**
-   * Debounced search to avoid excessive requests
+   * Debounced suggestion lookup; cheap enough to run between keystrokes
    */
-  private debouncedSearch(): void {
-    if (this.searchTimeout !== null) {
-      clearTimeout(this.searchTimeout);
+  private debouncedSuggest(): void {
+    if (this.suggestTimeout !== null) {
+      clearTimeout(this.suggestTimeout);
     }
 
-    this.searchTimeout = window.setTimeout(() => {
-      this.updateFilters();
+    this.suggestTimeout = window.setTimeout(() => {
+      this.fetchSuggestions();
     }, this.DEBOUNCE_DELAY);
   }
 
+  /**
+   * Fetch suggestions for the current input, cancelling any request in flight
+   */
+  private async fetchSuggestions(): Promise<void> {
+    const query = this.elements.searchInput.value.trim();
+    if (query.length < this.MIN_QUERY_LENGTH) {
+      this.hideSuggestions();
+      return;
+    }
+
+    this.suggestController?.abort();
+    this.suggestController = new AbortController();
+
+    const url = `${this.elements.searchInput.dataset.suggestUrl}?${new URLSearchParams({ q: query })}`;
+    try {
+      const response = await fetch(url, { signal: this.suggestController.signal });
+      if (!response.ok) {
+        this.hideSuggestions();
+        return;
+      }
+      const data: { suggestions: Suggestion[] } = await response.json();
+      this.renderSuggestions(data.suggestions);
+    } catch (error) {
+      if ((error as Error).name !== 'AbortError') {
+        this.hideSuggestions();
+      }
+    }
+  }
+
+  /**
+   * Render the suggestion dropdown
+   */
+  private renderSuggestions(suggestions: Suggestion[]): void {
+    this.suggestions = suggestions;
+    this.activeIndex = -1;
+
+    const list = this.elements.suggestionList;
+    list.replaceChildren();
+    if (suggestions.length === 0) {
+      this.hideSuggestions();
+      return;
+    }
+
+    suggestions.forEach((suggestion, index) => {
+      const item = document.createElement('li');
+      item.setAttribute('role', 'option');
+
+      const link = document.createElement('a');
+      link.href = suggestion.url;
+      link.className = 'flex justify-between gap-2';
+      link.addEventListener('mouseenter', () => this.setActive(index));
+
+      const label = document.createElement('span');
+      label.textContent = suggestion.label;
+      const kind = document.createElement('span');
+      kind.className = 'badge badge-ghost badge-sm';
+      kind.textContent = KIND_LABELS[suggestion.kind];
+
+      link.append(label, kind);
+      item.append(link);
+      list.append(item);
+    });
+
+    list.classList.remove('hidden');
+    this.elements.searchInput.setAttribute('aria-expanded', 'true');
+  }
+
+  private hideSuggestions(): void {
+    this.suggestions = [];
+    this.activeIndex = -1;
+    this.elements.suggestionList.classList.add('hidden');
+    this.elements.searchInput.setAttribute('aria-expanded', 'false');
+  }
+
+  private setActive(index: number): void {
+    const links = this.elements.suggestionList.querySelectorAll('a');
+    links.forEach((link, i) => link.classList.toggle('active', i === index));
+    this.activeIndex = index;
+  }
+
+  /**
+   * Arrow keys move through suggestions, Enter opens one or submits the search
+   */
+  private onKeyDown(event: KeyboardEvent): void {
+    const count = this.suggestions.length;
+
+    if (event.key === 'ArrowDown' && count > 0) {
+      event.preventDefault();
+      this.setActive((this.activeIndex + 1) % count);
+    } else if (event.key === 'ArrowUp' && count > 0) {
+      event.preventDefault();
+      this.setActive((this.activeIndex - 1 + count) % count);
+    } else if (event.key === 'Escape') {
+      this.hideSuggestions();
+    } else if (event.key === 'Enter') {
+      event.preventDefault();
+      if (this.activeIndex >= 0) {
+        window.location.href = this.suggestions[this.activeIndex].url;
+      } else {
+        this.updateFilters();
+      }
+    }
+  }
+
   /**
    * Update URL parameters and reload page with filters
    */
@@ -75,12 +235,34 @@ class AntiqueFilter {
       params.delete('search');
     }
 
-    // Handle type filter parameter
-    const typeValue = this.elements.typeFilter.value;
-    if (typeValue) {
-      params.set('type', typeValue);
+    // Handle category filter parameter (replaces legacy ?type= links)
+    const categoryValue = this.elements.typeFilter.value;
+    params.delete('type');
+    if (categoryValue) {
+      params.set('category', categoryValue);
+    } else {
+      params.delete('category');
+    }
+
+    // Handle price range parameters
+    for (const [name, input] of [
+      ['min_price', this.elements.minPriceInput],
+      ['max_price', this.elements.maxPriceInput],
+    ] as const) {
+      const value = input.value.trim();
+      if (value) {
+        params.set(name, value);
+      } else {
+        params.delete(name);
+      }
+    }
+
+    // Handle sort parameter
+    const sortValue = this.elements.sortSelect.value;
+    if (sortValue) {
+      params.set('sort', sortValue);
     } else {
-      params.delete('type');
+      params.delete('sort');
     }
 
     // Handle show sold parameter
@@ -90,6 +272,9 @@ class AntiqueFilter {
       params.delete('show_sold');
     }
 
+    // Reset to page 1 when filters change
+    params.delete('page');
+
     // Update URL and reload
     window.location.search = params.toString();
   }
@@ -1,28 +1,258 @@
 "use strict";
 /**
  * Antique Filter Module
- * Handles search, type filtering, and sold item toggle for antique listings
- * Uses the reusable ListFilter class
+ * Handles search, category filtering, price range, sorting, and sold item toggle for antique listings.
+ * While typing, suggestions come from the lightweight /antiques/suggest/
+ * endpoint; the list itself only reloads when a search is submitted.
  */
-import ListFilter from './listFilter.js';
-
+var __awaiter = (this && this.__awaiter) || function (thisArg, _arguments, P, generator) {
+    function adopt(value) { return value instanceof P ? value : new P(function (resolve) { resolve(value); }); }
+    return new (P || (P = Promise))(function (resolve, reject) {
+        function fulfilled(value) { try { step(generator.next(value)); } catch (e) { reject(e); } }
+        function rejected(value) { try { step(generator["throw"](value)); } catch (e) { reject(e); } }
+        function step(result) { result.done ? resolve(result.value) : adopt(result.value).then(fulfilled, rejected); }
+        step((generator = generator.apply(thisArg, _arguments || [])).next());
+    });
+};
+const KIND_LABELS = {
+    antique: 'Antique',
+    type: 'Type',
+    seller: 'Store',
+};
+class AntiqueFilter {
+    constructor() {
+        this.suggestTimeout = null;
+        this.suggestController = null;
+        this.suggestions = [];
+        this.activeIndex = -1;
+        this.DEBOUNCE_DELAY = 120; // milliseconds
+        this.MIN_QUERY_LENGTH = 2;
+        this.elements = this.getElements();
+        this.init();
+    }
+    /**
+     * Get DOM elements
+     */
+    getElements() {
+        const searchInput = document.getElementById('searchInput');
+        const suggestionList = document.getElementById('searchSuggestions');
+        const typeFilter = document.getElementById('typeFilter');
+        const sortSelect = document.getElementById('sortSelect');
+        const showSoldToggle = document.getElementById('showSoldToggle');
+        const minPriceInput = document.getElementById('minPriceInput');
+        const maxPriceInput = document.getElementById('maxPriceInput');
+        const priceHistogram = document.getElementById('priceHistogram');
+        if (!searchInput || !suggestionList || !typeFilter || !sortSelect || !showSoldToggle ||
+            !minPriceInput || !maxPriceInput || !priceHistogram) {
+            throw new Error('Required filter elements not found in DOM');
+        }
+        return {
+            searchInput, suggestionList, typeFilter, sortSelect, showSoldToggle,
+            minPriceInput, maxPriceInput, priceHistogram,
+        };
+    }
+    /**
+     * Initialize event listeners
+     */
+    init() {
+        // Type filter - immediate update
+        this.elements.typeFilter.addEventListener('change', () => this.updateFilters());
+        // Sort - immediate update
+        this.elements.sortSelect.addEventListener('change', () => this.updateFilters());
+        // Sold toggle - immediate update
+        this.elements.showSoldToggle.addEventListener('change', () => this.updateFilters());
+        // Price inputs - update once a value is committed (blur or Enter)
+        this.elements.minPriceInput.addEventListener('change', () => this.updateFilters());
+        this.elements.maxPriceInput.addEventListener('change', () => this.updateFilters());
+        // Histogram bars - select that bucket's price range
+        this.elements.priceHistogram.addEventListener('click', (event) => {
+            var _a, _b;
+            const bar = event.target.closest('button[data-min]');
+            if (bar) {
+                this.elements.minPriceInput.value = (_a = bar.dataset.min) !== null && _a !== void 0 ? _a : '';
+                this.elements.maxPriceInput.value = (_b = bar.dataset.max) !== null && _b !== void 0 ? _b : '';
+                this.updateFilters();
+            }
+        });
+        // Search input - debounced suggestions, Enter submits
+        this.elements.searchInput.addEventListener('input', () => this.debouncedSuggest());
+        this.elements.searchInput.addEventListener('keydown', (event) => this.onKeyDown(event));
+        this.elements.searchInput.addEventListener('blur', () => {
+            // Let a click on a suggestion land before the list disappears
+            window.setTimeout(() => this.hideSuggestions(), 150);
+        });
+    }
+    /**
+     * Debounced suggestion lookup; cheap enough to run between keystrokes
+     */
+    debouncedSuggest() {
+        if (this.suggestTimeout !== null) {
+            clearTimeout(this.suggestTimeout);
+        }
+        this.suggestTimeout = window.setTimeout(() => {
+            this.fetchSuggestions();
+        }, this.DEBOUNCE_DELAY);
+    }
+    /**
+     * Fetch suggestions for the current input, cancelling any request in flight
+     */
+    fetchSuggestions() {
+        return __awaiter(this, void 0, void 0, function* () {
+            var _a;
+            const query = this.elements.searchInput.value.trim();
+            if (query.length < this.MIN_QUERY_LENGTH) {
+                this.hideSuggestions();
+                return;
+            }
+            (_a = this.suggestController) === null || _a === void 0 ? void 0 : _a.abort();
+            this.suggestController = new AbortController();
+            const url = `${this.elements.searchInput.dataset.suggestUrl}?${new URLSearchParams({ q: query })}`;
+            try {
+                const response = yield fetch(url, { signal: this.suggestController.signal });
+                if (!response.ok) {
+                    this.hideSuggestions();
+                    return;
+                }
+                const data = yield response.json();
+                this.renderSuggestions(data.suggestions);
+            }
+            catch (error) {
+                if (error.name !== 'AbortError') {
+                    this.hideSuggestions();
+                }
+            }
+        });
+    }
+    /**
+     * Render the suggestion dropdown
+     */
+    renderSuggestions(suggestions) {
+        this.suggestions = suggestions;
+        this.activeIndex = -1;
+        const list = this.elements.suggestionList;
+        list.replaceChildren();
+        if (suggestions.length === 0) {
+            this.hideSuggestions();
+            return;
+        }
+        suggestions.forEach((suggestion, index) => {
+            const item = document.createElement('li');
+            item.setAttribute('role', 'option');
+            const link = document.createElement('a');
+            link.href = suggestion.url;
+            link.className = 'flex justify-between gap-2';
+            link.addEventListener('mouseenter', () => this.setActive(index));
+            const label = document.createElement('span');
+            label.textContent = suggestion.label;
+            const kind = document.createElement('span');
+            kind.className = 'badge badge-ghost badge-sm';
+            kind.textContent = KIND_LABELS[suggestion.kind];
+            link.append(label, kind);
+            item.append(link);
+            list.append(item);
+        });
+        list.classList.remove('hidden');
+        this.elements.searchInput.setAttribute('aria-expanded', 'true');
+    }
+    hideSuggestions() {
+        this.suggestions = [];
+        this.activeIndex = -1;
+        this.elements.suggestionList.classList.add('hidden');
+        this.elements.searchInput.setAttribute('aria-expanded', 'false');
+    }
+    setActive(index) {
+        const links = this.elements.suggestionList.querySelectorAll('a');
+        links.forEach((link, i) => link.classList.toggle('active', i === index));
+        this.activeIndex = index;
+    }
+    /**
+     * Arrow keys move through suggestions, Enter opens one or submits the search
+     */
+    onKeyDown(event) {
+        const count = this.suggestions.length;
+        if (event.key === 'ArrowDown' && count > 0) {
+            event.preventDefault();
+            this.setActive((this.activeIndex + 1) % count);
+        }
+        else if (event.key === 'ArrowUp' && count > 0) {
+            event.preventDefault();
+            this.setActive((this.activeIndex - 1 + count) % count);
+        }
+        else if (event.key === 'Escape') {
+            this.hideSuggestions();
+        }
+        else if (event.key === 'Enter') {
+            event.preventDefault();
+            if (this.activeIndex >= 0) {
+                window.location.href = this.suggestions[this.activeIndex].url;
+            }
+            else {
+                this.updateFilters();
+            }
+        }
+    }
+    /**
+     * Update URL parameters and reload page with filters
+     */
+    updateFilters() {
+        const params = new URLSearchParams(window.location.search);
+        // Handle search parameter
+        const searchValue = this.elements.searchInput.value.trim();
+        if (searchValue) {
+            params.set('search', searchValue);
+        }
+        else {
+            params.delete('search');
+        }
+        // Handle category filter parameter (replaces legacy ?type= links)
+        const categoryValue = this.elements.typeFilter.value;
+        params.delete('type');
+        if (categoryValue) {
+            params.set('category', categoryValue);
+        }
+        else {
+            params.delete('category');
+        }
+        // Handle price range parameters
+        for (const [name, input] of [
+            ['min_price', this.elements.minPriceInput],
+            ['max_price', this.elements.maxPriceInput],
+        ]) {
+            const value = input.value.trim();
+            if (value) {
+                params.set(name, value);
+            }
+            else {
+                params.delete(name);
+            }
+        }
+        // Handle sort parameter
+        const sortValue = this.elements.sortSelect.value;
+        if (sortValue) {
+            params.set('sort', sortValue);
+        }
+        else {
+            params.delete('sort');
+        }
+        // Handle show sold parameter
+        if (this.elements.showSoldToggle.checked) {
+            params.set('show_sold', 'true');
+        }
+        else {
+            params.delete('show_sold');
+        }
+        // Reset to page 1 when filters change
+        params.delete('page');
+        // Update URL and reload
+        window.location.search = params.toString();
+    }
+}
 // Initialize when DOM is ready
 if (document.readyState === 'loading') {
     document.addEventListener('DOMContentLoaded', () => {
-        new ListFilter({
-            searchInputId: 'searchInput',
-            filters: [
-                { id: 'typeFilter', type: 'select', param: 'type' },
-                { id: 'showSoldToggle', type: 'toggle', param: 'show_sold' }
-            ]
-        });
-    });
-} else {
-    new ListFilter({
-        searchInputId: 'searchInput',
-        filters: [
-            { id: 'typeFilter', type: 'select', param: 'type' },
-            { id: 'showSoldToggle', type: 'toggle', param: 'show_sold' }
-        ]
+        new AntiqueFilter();
     });
-}
\ No newline at end of file
+}
+else {
+    new AntiqueFilter();
+}